@@ -1,6 +1,6 @@
 import sys
 import asyncio
-from os import getenv, listdir, remove
+from os import getenv
 
 from discord import Interaction, Intents, app_commands
 from discord.ext import commands
@@ -8,8 +8,16 @@ from discord.ext.commands import Context
 
 from global_utils import global_utils
 
-bot = commands.Bot(command_prefix='!',
-                   intents=Intents.all(), help_command=None)
+class Bot(commands.Bot):
+    async def close(self) -> None:
+        """Writes any pending state changes before shutting down the bot
+        """
+        await global_utils.flush_state()
+        await super().close()
+
+
+bot = Bot(command_prefix='!',
+          intents=Intents.all(), help_command=None)
 
 bot_token = getenv("DISCORD_BOT_TOKEN")
 
@@ -22,8 +30,6 @@ if not bot_token:
 async def on_ready() -> None:
     """[event] Executes when the bot is ready
     """
-    sys.stderr = open(f'./logs/{global_utils.log_date}_stderr.log', 'a')
-
     global_utils.log(
         f'Bot "{bot.user.name}" has connected to Discord. Starting log')
 
@@ -81,16 +87,18 @@ async def on_command_error(ctx: Context, error: commands.CommandError) -> None:
 async def main() -> None:
     """Loads all cogs and starts the bot
     """
-    sys.stdout = open(global_utils.log_filepath, 'a')
+    global_utils.capture_logging()
+    await global_utils.open_storage()
     await global_utils.load_cogs(bot)
-    await bot.start(bot_token)
+    try:
+        await bot.start(bot_token)
+    finally:
+        await global_utils.close_storage()
 
 if __name__ == '__main__':
     try:
         asyncio.run(main())
-    except KeyboardInterrupt:
-        for file in listdir('./local_storage/temp_music'): # honestly, needs to be taken care of better. maybe later :p
-            remove(f'./local_storage/temp_music/{file}')
+    except KeyboardInterrupt: # downloaded songs are kept in the audio cache for next time
         asyncio.run(bot.close())
     # bot.run(bot_token)
 else:
@@ -2,12 +2,12 @@ import discord
 from discord.ext import commands
 from discord.ext.commands import Context
 from discord import app_commands, Object
-import asyncio
 
-from datetime import datetime, time, timedelta
+from datetime import datetime, timedelta
 from pytz import utc
 
 from global_utils import global_utils
+from utils.reconciler import season_events, practice_events, reconcile
 
 
 class AdminPremierCommands(commands.Cog):
@@ -28,7 +28,18 @@ class AdminPremierCommands(commands.Cog):
         """[event] Executes when the AdminPremierCommands cog is ready
         """
         # global_utils.log("AdminPremier cog loaded")
-        pass
+        global_utils.event_jobs.start(self.bot)
+
+    async def cog_load(self) -> None:
+        """Restarts the event job worker when the cog is reloaded (on_ready doesn't fire again after a reload)
+        """
+        if self.bot.is_ready():
+            global_utils.event_jobs.start(self.bot)
+
+    async def cog_unload(self) -> None:
+        """Stops the event job worker when the cog is unloaded (unfinished jobs resume when it is loaded again)
+        """
+        global_utils.event_jobs.stop()
 
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
         """A global check for all app commands in this cog to ensure the user is an admin
@@ -79,12 +90,7 @@ class AdminPremierCommands(commands.Cog):
             await interaction.response.send_message(f'Map "{map_display_name}" is already in the game.', ephemeral=True)
             return
 
-        global_utils.map_preferences = {
-            map_name: {}} | global_utils.map_preferences
-        global_utils.map_weights = {map_name: 0} | global_utils.map_weights
-
-        # note: this function also calls save_weights
-        global_utils.save_preferences()
+        global_utils.add_map(map_name)
 
         await interaction.response.send_message(f'Map "{map_display_name}" has been added to the game', ephemeral=True)
 
@@ -107,29 +113,24 @@ class AdminPremierCommands(commands.Cog):
             await interaction.response.send_message(f'No map named "{map_display_name}" in the game.', ephemeral=True)
             return
 
-        # if its in the mappool, remove it
-        try:
-            where = global_utils.map_pool.index(map_name)
-            global_utils.map_pool.pop(where)
-        except ValueError:
-            pass
-
-        global_utils.map_preferences.pop(map_name)
-        global_utils.map_weights.pop(map_name)
-
-        global_utils.save_pool()
-        # note: this function also calls save_weights
-        global_utils.save_preferences()
+        # also removes it from the map pool (if it's there)
+        global_utils.remove_map(map_name)
 
         await interaction.response.send_message(f'Map "{map_display_name}" removed from the game', ephemeral=True)
 
     @app_commands.command(name="add-events", description=global_utils.command_descriptions["add-events"])
+    @app_commands.choices(
+        dry_run=[
+            app_commands.Choice(name="Yes", value=1),
+        ]
+    )
     @app_commands.describe(
         map_list="The map order separated by commas (whitespace between maps does not matter). Ex: 'map1, map2, map3'",
-        date="The date (mm/dd) of the Thursday that starts the first event. Events will be added for Thursday, Saturday, and Sunday."
+        date="The date (mm/dd) of the Thursday that starts the first event. Events will be added for Thursday, Saturday, and Sunday.",
+        dry_run="Only show the changes that would be made to the schedule"
     )
-    async def addevents(self, interaction: discord.Interaction, map_list: str, date: str) -> None:
-        """[command] Adds all premier events to the schedule at a rate of 5 events/minute
+    async def addevents(self, interaction: discord.Interaction, map_list: str, date: str, dry_run: int = 0) -> None:
+        """[command] Brings the premier schedule in line with a season plan. Only the differences are applied (by a background job), so re-running it doesn't duplicate events
 
         Parameters
         ----------
@@ -139,17 +140,19 @@ class AdminPremierCommands(commands.Cog):
             The season's map order separated by commas (whitespace between maps does not matter). Ex: 'map1, map2, map3'
         date : str
             The date (mm/dd) of the Thursday that starts the first event. Events will be added for Thursday, Saturday, and Sunday.
+        dry_run : int, optional
+            Treated as a boolean. Only show the changes that would be made, by default 0
         """
-        # THERE IS A RATELIMIT OF 5 EVENTS/MINUTE
+        # THERE IS A RATELIMIT OF 5 EVENTS/MINUTE. the job queue paces the changes, so this only plans them
 
         guild = interaction.guild
-        map_display_name = global_utils.style_text(map_name.title(), 'i')
 
         # split by comma and remove extra whitespace
         new_maps = [m.strip().lower() for m in map_list.split(",")]
 
         for map_name in new_maps:
             if map_name not in global_utils.map_pool:
+                map_display_name = global_utils.style_text(map_name.title(), 'i')
                 map_list = global_utils.style_text('map_list', 'c')
                 map_pool = global_utils.style_text('/mappool', 'c')
                 await interaction.response.send_message(f"{map_display_name} is not in the map pool. I only add premier events. Ensure that {map_list} is formatted properly and that {map_pool} has been updated.", ephemeral=True)
@@ -166,47 +169,29 @@ class AdminPremierCommands(commands.Cog):
             await interaction.response.send_message(f'Date is not a Thursday. Please provide a Thursday date (mm/dd)', ephemeral=True)
             return
 
-        thur_time = datetime(year=datetime.now(
-        ).year, month=input_date.month, day=input_date.day, hour=22, minute=0, second=0)
-        sat_time = (thur_time + timedelta(days=2)).replace(hour=23)
-        sun_time = (thur_time + timedelta(days=3))
-
-        start_times = [global_utils.tz.localize(
-            d) for d in [thur_time, sat_time, sun_time]]
-
         await interaction.response.defer(ephemeral=True, thinking=True)
 
-        output = ""
-
-        now = global_utils.tz.localize(datetime.now())
+        now = datetime.now(utc)
+        desired = season_events(new_maps, input_date, global_utils.tz)
+        existing = global_utils.event_index.events(
+            guild.id, "event") + global_utils.event_index.events(guild.id, "playoffs")
 
-        voice_channel = discord.utils.get(guild.voice_channels, id=self.voice_channel_id) if interaction.guild.id == global_utils.val_server_id else discord.utils.get(
-            guild.voice_channels, id=self.debug_voice_id)
+        operations = reconcile(desired, existing, now)
 
-        for i, map_name in enumerate(new_maps):
-            for j, start_time in enumerate(start_times):
-                if now > start_time:
-                    output = "Detected that input date is in the past. Any maps that are in the past were skipped."
-                    continue
-                event_name = "Premier"
-                event_desc = map_display_name
-
-                # last map and last day is playoffs
-                if i == len(new_maps) - 1 and j == len(start_times) - 1:
-                    event_name = "Premier Playoffs"
-                    event_desc = "Playoffs"
+        output = ""
+        if any(datetime.fromisoformat(spec["start"]) < now for spec in desired):
+            output = "Detected that input date is in the past. Any maps that are in the past were skipped."
 
-                await guild.create_scheduled_event(name=event_name, description=event_desc, channel=voice_channel,
-                                                   start_time=start_time, end_time=start_time +
-                                                   timedelta(hours=1),
-                                                   entity_type=discord.EntityType.voice, privacy_level=discord.PrivacyLevel.guild_only)
+        if dry_run or len(operations) == 0:
+            await interaction.followup.send(f"{self.format_operations(operations)}\n{output}", ephemeral=True)
+            return
 
-            start_times = [start_time + timedelta(days=7)
-                           for start_time in start_times]
+        voice_channel_id = self.voice_channel_id if interaction.guild.id == global_utils.val_server_id else self.debug_voice_id
+        job_id = await self.submit_event_job(interaction, voice_channel_id, f"premier schedule starting on {date}", operations)
 
         global_utils.log(
-            f'{interaction.user.display_name} has posted the premier schedule starting on {date} with maps: {", ".join(new_maps)}')
-        await interaction.followup.send(f'The Premier schedule has been created.\n{output}', ephemeral=True)
+            f'{interaction.user.display_name} has queued the premier schedule starting on {date} with maps: {", ".join(new_maps)} (job {job_id})')
+        await interaction.followup.send(f'The Premier schedule is being updated (job `{job_id}`). Progress is shown in the status message.\n{self.format_operations(operations)}\n{output}', ephemeral=True)
 
     @app_commands.command(name="cancel-event", description=global_utils.command_descriptions["cancel-event"])
     @app_commands.choices(
@@ -248,83 +233,123 @@ class AdminPremierCommands(commands.Cog):
         await interaction.response.defer(ephemeral=ephem, thinking=True)
 
         guild = interaction.guild
-        events = guild.scheduled_events
-
-        message = "Event not found in the schedule."
-
-        for event in events:
-            if "Premier" in event.name and event.description.lower() == map_name:  # map is already lower
-                if event.status == discord.EventStatus.scheduled:
-                    await event.cancel()
-                elif event.status == discord.EventStatus.active:
-                    await event.end()
-                else:
-                    await event.delete()
-
-                if not all_events:
-                    e_name = event.name
-                    e_desc = event.description
-                    e_date = event.start_time.date()
-                    message = f'{e_name} on {e_desc} for {e_date} has been cancelled'
-                    break
-                else:
-                    message = f'All events on {map_display_name} have been cancelled'
-
-        if message != "Event not found in the schedule.":
-            global_utils.log(
-                f'{interaction.user.display_name} cancelled event - {message}')
+        kind = "playoffs" if map_name == "playoffs" else "event"
+        events = global_utils.event_index.events(guild.id, kind, map_name)  # earliest first
+
+        if len(events) == 0:
+            await interaction.followup.send("Event not found in the schedule.", ephemeral=ephem)
+            return
+
+        if not all_events:
+            events = events[:1]
+
+        results = await global_utils.batch.run(events, self.cancel_scheduled_event)
+        message = self.format_results(results)
 
         await interaction.followup.send(message, ephemeral=ephem)
 
         global_utils.log(
-            f"{interaction.user.display_name} cancelled event - {message}")
+            f"{interaction.user.display_name} cancelled event(s) - {message}")
 
     @app_commands.command(name="add-practices", description=global_utils.command_descriptions["add-practices"])
-    async def addpractices(self, interaction: discord.Interaction):
-        """[command] Adds all premier practice events to the schedule at a rate of 5 practices/minute. Ensure that the premier events have been added first using /addevents
+    @app_commands.choices(
+        dry_run=[
+            app_commands.Choice(name="Yes", value=1),
+        ]
+    )
+    @app_commands.describe(
+        dry_run="Only show the changes that would be made to the schedule"
+    )
+    async def addpractices(self, interaction: discord.Interaction, dry_run: int = 0):
+        """[command] Brings the premier practices in line with the premier events (Wednesday before and Friday after every Thursday event). Only the differences are applied (by a background job). Ensure that the premier events have been added first using /addevents
 
         Parameters
         ----------
         interaction : discord.Interaction
             The interaction object that initiated the command
+        dry_run : int, optional
+            Treated as a boolean. Only show the changes that would be made, by default 0
         """
-        # THERE IS A RATELIMIT OF 5 EVENTS/MINUTE
+        # THERE IS A RATELIMIT OF 5 EVENTS/MINUTE. the job queue paces the changes, so this only plans them
 
         await interaction.response.defer(ephemeral=True, thinking=True)
 
         guild = interaction.guild
-        events = guild.scheduled_events
+        events = global_utils.event_index.events(guild.id, "event")
 
-        if len([event for event in events if event.name == "Premier" and event.description != "Playoffs"]) == 0:
+        if len(events) == 0:
             await interaction.followup.send(f'Please add the premier events first using the `/addevents` command', ephemeral=True)
             return
 
-        wed_hour = global_utils.est_to_utc(time(hour=22)).hour
-        fri_hour = wed_hour + 1
+        desired = practice_events(events, global_utils.tz)
+        operations = reconcile(desired, global_utils.event_index.events(
+            guild.id, "practice"), datetime.now(utc))
 
-        for event in events:
-            if event.start_time.astimezone(global_utils.tz).weekday() != 3 or "Premier" not in event.name:
-                continue
+        if dry_run or len(operations) == 0:
+            await interaction.followup.send(self.format_operations(operations), ephemeral=True)
+            return
 
-            wed_time = fri_time = event.start_time.astimezone(utc)
-            wed_time = wed_time.replace(hour=wed_hour) - timedelta(days=1)
-            fri_time = fri_time.replace(hour=fri_hour) + timedelta(days=1)
+        job_id = await self.submit_event_job(interaction, events[0].channel_id, "premier practice schedule", operations)
 
-            for start_time in [wed_time, fri_time]:
-                if start_time < global_utils.tz.localize(datetime.now()):
-                    continue
+        global_utils.log(
+            f'{interaction.user.display_name} has queued the premier practice schedule (job {job_id})')
+        await interaction.followup.send(f'Premier practices are being updated (job `{job_id}`). Progress is shown in the status message.\n{self.format_operations(operations)}', ephemeral=True)
 
-                event_name = "Premier Practice"
-                event_desc = event.description
+    def format_operations(self, operations: list[dict]) -> str:
+        """Formats the changes a reconcile would make to the schedule for display in Discord
 
-                await guild.create_scheduled_event(name=event_name, description=event_desc, channel=event.channel,
-                                                   start_time=start_time, end_time=start_time +
-                                                   timedelta(hours=1),
-                                                   entity_type=discord.EntityType.voice, privacy_level=discord.PrivacyLevel.guild_only)
+        Parameters
+        ----------
+        operations : list[dict]
+            The operations, with the structure [{"op": "create" | "edit" | "cancel", "name": str, "description": str, "start": iso_time, ...}, ...]
 
-        global_utils.log(
-            f'{interaction.user.display_name} has posted the premier practice schedule')
-        await interaction.followup.send(f'Added premier practice events to the schedule', ephemeral=True)
+        Returns
+        -------
+        str
+            The formatted changes
+        """
+        if len(operations) == 0:
+            return global_utils.style_text("The schedule is already up to date", 'b')
+
+        symbols = {"create": "+", "edit": "~", "cancel": "-"}
+        lines = []
+
+        for spec in operations:
+            start_time = global_utils.discord_local_time(
+                datetime.fromisoformat(spec["start"]), with_date=True)
+            lines.append(
+                f"{symbols[spec['op']]} {spec['op']} {spec['name']} on {global_utils.style_text(spec['description'], 'i')} at {start_time}")
+
+        counts = ", ".join(f"{sum(spec['op'] == op for spec in operations)} {op}"
+                           for op in symbols if any(spec['op'] == op for spec in operations))
+
+        # keep it within discord's message limit
+        shown = "\n".join(lines[:25]) + (f"\n... and {len(lines) - 25} more" if len(lines) > 25 else "")
+        return f"{global_utils.style_text('Schedule changes', 'b')} ({counts}):\n{shown}"
+
+    async def submit_event_job(self, interaction: discord.Interaction, voice_channel_id: int, description: str, new_events: list[dict]) -> str:
+        """Posts a status message in the channel the command was used in and queues a job to create the events
+
+        Parameters
+        ----------
+        interaction : discord.Interaction
+            The interaction object that initiated the command
+        voice_channel_id : int
+            The ID of the voice channel the events take place in
+        description : str
+            What the job does (shown in the status message)
+        new_events : list[dict]
+            The operations to run, with the structure [{"op": str, "name": str, "description": str, "start": iso_time, "end": iso_time, ...}, ...]
+
+        Returns
+        -------
+        str
+            The ID of the job
+        """
+        status = await global_utils.rest.call("interaction", f"channel_send:{interaction.channel.id}", interaction.channel.send,
+                                              f"Queued {description} ({len(new_events)} operations)")
+
+        return global_utils.event_jobs.submit(interaction.guild.id, voice_channel_id, status.channel.id, status.id, description, new_events)
 
     @app_commands.command(name="cancel-practice", description=global_utils.command_descriptions["cancel-practice"])
     @app_commands.choices(
@@ -367,30 +392,17 @@ class AdminPremierCommands(commands.Cog):
         await interaction.response.defer(ephemeral=ephem, thinking=True)
 
         guild = interaction.guild
-        events = guild.scheduled_events
-
-        message = f"No practices found for {map_display_name} in the schedule."
-
-        for event in events:
-            if event.name == "Premier Practice" and event.description.lower() == map_name:
-                if event.status == discord.EventStatus.scheduled:
-                    await event.cancel()
-                elif event.status == discord.EventStatus.active:
-                    await event.end()
-                else:
-                    await event.delete()
-
-                if not all_practices:
-                    e_name = event.name
-                    e_date = event.start_time.date()
-                    message = f'{e_name} on {map_display_name} for {e_date} has been cancelled'
-                    break
-                else:
-                    message = f'All practices on {map_display_name} have been cancelled'
-
-        if message != f"No practices found for {map_display_name} in the schedule.":
-            global_utils.log(
-                f'{interaction.user.display_name} cancelled practice: {message}')
+        events = global_utils.event_index.events(guild.id, "practice", map_name)  # earliest first
+
+        if len(events) == 0:
+            await interaction.followup.send(f"No practices found for {map_display_name} in the schedule.", ephemeral=ephem)
+            return
+
+        if not all_practices:
+            events = events[:1]
+
+        results = await global_utils.batch.run(events, self.cancel_scheduled_event)
+        message = self.format_results(results)
 
         await interaction.followup.send(message, ephemeral=ephem)
 
@@ -430,20 +442,71 @@ class AdminPremierCommands(commands.Cog):
         await interaction.response.defer(ephemeral=ephem, thinking=True)
 
         guild = interaction.guild
-        events = guild.scheduled_events
+        events = global_utils.event_index.events(guild.id)
+
+        if len(events) == 0:
+            await interaction.followup.send(f'The premier schedule is already empty', ephemeral=ephem)
+            return
 
-        for event in events:
-            if "Premier" in event.name:
-                if event.status == discord.EventStatus.scheduled:
-                    await event.cancel()
-                elif event.status == discord.EventStatus.active:
-                    await event.end()
-                else:
-                    await event.delete()
+        results = await global_utils.batch.run(events, self.cancel_scheduled_event)
 
         global_utils.log(
-            f'{interaction.user.display_name} has cleared the premier schedule')
-        await interaction.followup.send(f'Cleared the premier schedule', ephemeral=ephem)
+            f'{interaction.user.display_name} has cleared the premier schedule - {sum(r["ok"] for r in results)}/{len(results)} events cancelled')
+        await interaction.followup.send(f'Cleared the premier schedule\n{self.format_results(results)}', ephemeral=ephem)
+
+    async def cancel_scheduled_event(self, event: discord.ScheduledEvent) -> str:
+        """Takes an event off the schedule: cancels it if it hasn't started, ends it if it is running, and deletes it otherwise
+
+        Parameters
+        ----------
+        event : discord.ScheduledEvent
+            The event to take off the schedule
+
+        Returns
+        -------
+        str
+            What was done to the event ("cancelled", "ended" or "deleted")
+        """
+        route = f"event:{event.id}"
+
+        if event.status == discord.EventStatus.scheduled:
+            await global_utils.rest.call("schedule", route, event.cancel)
+            return "cancelled"
+        if event.status == discord.EventStatus.active:
+            await global_utils.rest.call("schedule", route, event.end)
+            return "ended"
+
+        await global_utils.rest.call("schedule", route, event.delete)
+        return "deleted"
+
+    def format_results(self, results: list[dict]) -> str:
+        """Formats the per-event results of a batch of event operations for display in Discord
+
+        Parameters
+        ----------
+        results : list[dict]
+            The results, with the structure [{"item": discord.ScheduledEvent, "ok": bool, "result": str, "error": str}, ...]
+
+        Returns
+        -------
+        str
+            The formatted results
+        """
+        lines = []
+        for r in results:
+            event = r["item"]
+            outcome = r["result"] if r["ok"] else f"failed ({r['error']})"
+            lines.append(
+                f"- {event.name} on {global_utils.style_text(event.description, 'i')} for {event.start_time.astimezone(global_utils.tz).date()}: {outcome}")
+
+        failed = sum(not r["ok"] for r in results)
+        summary = f"{len(results) - failed}/{len(results)} event(s) taken off the schedule"
+        if failed:
+            summary += f", {failed} failed"
+
+        # keep it within discord's message limit
+        shown = "\n".join(lines[:25]) + (f"\n... and {len(lines) - 25} more" if len(lines) > 25 else "")
+        return f"{global_utils.style_text(summary, 'b')}\n{shown}"
 
     @app_commands.command(name="add-note", description=global_utils.command_descriptions["add-note"])
     @app_commands.choices(
@@ -481,12 +544,7 @@ class AdminPremierCommands(commands.Cog):
             await interaction.response.send_message(f'Invalid message ID. The message must be in the notes channel.', ephemeral=True)
             return
 
-        if map_name not in global_utils.practice_notes:
-            global_utils.practice_notes[map_name] = {}
-
-        global_utils.practice_notes[map_name][note_id] = description
-
-        global_utils.save_notes()
+        global_utils.add_note(map_name, note_id, description)
 
         global_utils.log(
             f'{interaction.user.display_name} has added a practice note. Note ID: {note_id}')
@@ -518,17 +576,17 @@ class AdminPremierCommands(commands.Cog):
             The note number to remove (1-indexed). Leave empty/0 to see options, by default 0
         """
         map_display_name = global_utils.style_text(map_name.title(), 'i')
+        notes_list = await global_utils.notes_for_map(map_name)
 
-        if map_name not in global_utils.practice_notes or len(global_utils.practice_notes[map_name]) == 0:
+        if len(notes_list) == 0:
             await interaction.response.send_message(f'No notes found for {map_display_name}', ephemeral=True)
             return
 
-        if note_number < 0 or note_number > len(global_utils.practice_notes[map_name]):
+        if note_number < 0 or note_number > len(notes_list):
             await interaction.response.send_message(f'Invalid note number. Leave blank to see all options.', ephemeral=True)
             return
 
         if note_number == 0:
-            notes_list = global_utils.practice_notes[map_name]
             output = global_utils.style_text("Practice notes for ", 'b')
             output += global_utils.style_text(map_display_name, 'b') + ":\n"
             for i, note_id in enumerate(notes_list.keys()):
@@ -538,13 +596,11 @@ class AdminPremierCommands(commands.Cog):
             await interaction.response.send_message(output, ephemeral=True)
             return
 
-        note_id = list(global_utils.practice_notes[map_name].keys())[
-            note_number - 1]
-        global_utils.practice_notes[map_name].pop(note_id)
+        note_id = list(notes_list.keys())[note_number - 1]
+        global_utils.remove_note(map_name, note_id)
 
         await interaction.response.send_message(f"Removed a practice note for {map_display_name}", ephemeral=True)
 
-        global_utils.save_notes()
         global_utils.log(
             f'{interaction.user.display_name} has removed a practice note. Note ID: {note_id}')
 
@@ -633,14 +689,7 @@ class AdminMessageCommands(commands.Cog):
         current_time = datetime.now()
 
         g = interaction.guild
-        if g.id == global_utils.val_server_id:
-            role_name = global_utils.prem_role_name
-            reminder_channel = self.bot.get_channel(
-                global_utils.prem_channel_id)
-        else:
-            role_name = global_utils.debug_role_name
-            reminder_channel = self.bot.get_channel(
-                global_utils.debug_channel_id)
+        role_name = global_utils.prem_role_name if g.id == global_utils.val_server_id else global_utils.debug_role_name
 
         role = discord.utils.get(g.roles, name=role_name)
 
@@ -653,32 +702,96 @@ class AdminMessageCommands(commands.Cog):
         elif unit == "minutes":
             when = current_time + timedelta(minutes=interval)
             output = f'(reminder) I will remind {role} in {interval} minute(s) with the message: "{message}"'
-            interval *= 60
         elif unit == "hours":
             when = current_time + timedelta(hours=interval)
             output = f'(reminder) I will remind {role} in {interval} hour(s) with the message: "{message}"'
-            interval *= 3600
 
         await interaction.response.send_message(output, ephemeral=True)
 
         dt_when = datetime.fromtimestamp(when.timestamp()).isoformat()
 
-        global_utils.reminders[str(g.id)].update(
-            {dt_when: message})
-
-        global_utils.save_reminders()
+        # the scheduler posts it (and survives restarts), no need to keep this interaction waiting
+        global_utils.schedule_reminder(g.id, dt_when, message)
 
         global_utils.log(
             f"Saved a reminder from {interaction.user.display_name}: {output}")
 
-        await asyncio.sleep(interval)
+    @app_commands.command(name="reminders", description=global_utils.command_descriptions["reminders"])
+    @app_commands.choices(
+        action=[
+            app_commands.Choice(name="List", value="list"),
+            app_commands.Choice(name="Cancel", value="cancel"),
+            app_commands.Choice(name="Reschedule", value="reschedule"),
+        ],
+        unit=[
+            app_commands.Choice(name="hours", value="hours"),
+            app_commands.Choice(name="minutes", value="minutes"),
+            app_commands.Choice(name="seconds", value="seconds"),
+        ]
+    )
+    @app_commands.describe(
+        action="What to do with the reminders",
+        reminder_number="The reminder to cancel/reschedule (1-indexed, see the list)",
+        interval="Reschedule only. The number of units from now to move the reminder to",
+        unit="Reschedule only. The unit of time associated with the interval"
+    )
+    async def reminders(self, interaction: discord.Interaction, action: str = "list", reminder_number: int = 0, interval: int = 0, unit: str = "minutes") -> None:
+        """[command] Lists, cancels, or reschedules the pending reminders in this server
 
-        await reminder_channel.send(message)
-        global_utils.log(
-            f"Posted a reminder from {interaction.user.display_name} for {role.name}: {message}")
+        Parameters
+        ----------
+        interaction : discord.Interaction
+            The interaction object that initiated the command
+        action : str, optional
+            The action to take ("list", "cancel", or "reschedule"), by default "list"
+        reminder_number : int, optional
+            The reminder to cancel/reschedule (1-indexed), by default 0
+        interval : int, optional
+            The number of units from now to move the reminder to (reschedule only), by default 0
+        unit : str, optional
+            The unit of time associated with the interval (reschedule only), by default "minutes"
+        """
+        g = interaction.guild
+        pending = await global_utils.list_reminders(g.id)
+
+        if action == "list" or reminder_number == 0:
+            if len(pending) == 0:
+                await interaction.response.send_message("There are no pending reminders", ephemeral=True)
+                return
+
+            output = global_utils.style_text("Pending reminders:", 'b') + "\n"
+            for i, (when, message) in enumerate(pending, start=1):
+                output += f"{i}. {global_utils.discord_local_time(datetime.fromisoformat(when), with_date=True)}: {message}\n"
 
-        global_utils.reminders[str(g.id)].pop(dt_when)
-        global_utils.save_reminders()
+            await interaction.response.send_message(output, ephemeral=True)
+            return
+
+        if reminder_number < 0 or reminder_number > len(pending):
+            await interaction.response.send_message("Invalid reminder number. Leave blank to see all options.", ephemeral=True)
+            return
+
+        when, message = pending[reminder_number - 1]
+
+        if action == "cancel":
+            global_utils.cancel_reminder(g.id, when)
+            output = f'Cancelled the reminder: "{message}"'
+            log_action = "cancelled"
+        else:
+            if interval <= 0:
+                await interaction.response.send_message(f'Please provide a valid interval greater than 0', ephemeral=True)
+                return
+
+            new_when = datetime.now() + timedelta(**{unit: interval})
+            new_when = new_when.replace(microsecond=0).isoformat()
+
+            global_utils.reschedule_reminder(g.id, when, new_when)
+            log_action = "rescheduled"
+            output = f'Rescheduled the reminder to {global_utils.discord_local_time(datetime.fromisoformat(new_when), with_date=True)}: "{message}"'
+
+        await interaction.response.send_message(output, ephemeral=True)
+
+        global_utils.log(
+            f"{interaction.user.display_name} {log_action} a reminder: {message}")
 
     @app_commands.command(name="pin", description=global_utils.command_descriptions["pin"])
     @app_commands.describe(
@@ -696,7 +809,7 @@ class AdminMessageCommands(commands.Cog):
         """
         try:
             message = interaction.channel.get_partial_message(int(message_id))
-            await message.pin()
+            await global_utils.rest.call("interaction", f"pins:{interaction.channel.id}", message.pin)
         except (discord.HTTPException, discord.errors.NotFound):
             await interaction.response.send_message(f'Message not found.', ephemeral=True)
             return
@@ -722,7 +835,7 @@ class AdminMessageCommands(commands.Cog):
         """
         try:
             message = interaction.channel.get_partial_message(int(message_id))
-            await message.unpin()
+            await global_utils.rest.call("interaction", f"pins:{interaction.channel.id}", message.unpin)
         except (discord.HTTPException, discord.errors.NotFound):
             await interaction.response.send_message(f'Message not found.', ephemeral=True)
             return
@@ -747,7 +860,8 @@ class AdminMessageCommands(commands.Cog):
             The ID of the message to delete
         """
         try:
-            await interaction.channel.get_partial_message(int(message_id)).delete()
+            await global_utils.rest.call("interaction", f"message_delete:{interaction.channel.id}",
+                                         interaction.channel.get_partial_message(int(message_id)).delete)
         except (ValueError, discord.errors.NotFound):
             await interaction.response.send_message(f'Message not found.', ephemeral=True)
             return
@@ -776,6 +890,7 @@ class AdminMessageCommands(commands.Cog):
 
         global_utils.log(f"Bot killed. reason: {reason}")
 
+        # Bot.close flushes pending state changes
         await self.bot.close()
 
 
@@ -57,7 +57,7 @@ class BizzyCommands(commands.Cog):
             return
 
         await interaction.response.defer(ephemeral=True, thinking=True)
-        await interaction.channel.purge(limit=None, bulk=True)
+        await global_utils.rest.call("cleanup", f"message_delete:{interaction.channel.id}", interaction.channel.purge, limit=None, bulk=True)
         await interaction.followup.send("Cleared the entire channel", ephemeral=True)
 
     @app_commands.command(name="feature", description=global_utils.command_descriptions["feature"])
@@ -1,6 +1,8 @@
 from discord import Object, Interaction, app_commands
 from discord.ext import commands
 
+from functools import partial
+
 from global_utils import global_utils
 
 
@@ -14,6 +16,8 @@ class BotCog(commands.Cog):
             The bot to add the cog to. Automatically passed with the bot.load_extension method
         """
         self.bot = bot
+        # the command lists may have changed since they were cached (e.g. on reload)
+        global_utils.renders.invalidate("commands")
 
     @commands.Cog.listener()
     async def on_ready(self) -> None:
@@ -22,42 +26,21 @@ class BotCog(commands.Cog):
         # global_utils.log("Bot cog loaded")
         pass
 
-    @app_commands.command(name="commands", description=global_utils.command_descriptions["commands"])
-    @app_commands.choices(
-        list_type=[
-            app_commands.Choice(name="only the bare minimum", value="basic"),
-            app_commands.Choice(name="all non-admin commands", value="user"),
-            app_commands.Choice(
-                name="bare minimum + admin commands", value="basic_admin"),
-            app_commands.Choice(name="only admin commands", value="admin"),
-            app_commands.Choice(
-                name="all commands except Bizzy's", value="user_admin"),
-            app_commands.Choice(name="every command available", value="all"),
-        ],
-        announce=[
-            app_commands.Choice(name="Yes", value=1),
-        ]
-    )
-    @app_commands.describe(
-        list_type="The type of command list to display",
-        announce="Allow others to see the returned command list in the channel (only in bot channel)"
-    )
-    async def commands(self, interaction: Interaction, list_type: str = "all", announce: int = 0) -> None:
-        """[command] Displays all bot commands
+    def render_commands(self, list_type: str, include_mine: bool) -> str:
+        """Renders a command list
 
         Parameters
         ----------
-        interaction : discord.Interaction
-            The interaction object that initiated the command
-        list_type : str, optional
-            The type of command list to display, by default "user"
-        announce : int, optional
-            Treated as a boolean. Announce the output when used in the bot channel, by default 0
+        list_type : str
+            The type of command list to render
+        include_mine : bool
+            Include the Bizzy-only commands in the admin list
+
+        Returns
+        -------
+        str
+            The command list as a string to display in Discord
         """
-        ephem = interaction.channel.id != global_utils.bot_channel_id or not announce
-
-        await interaction.response.defer(ephemeral=ephem, thinking=True)
-
         basic_commands = [f"{global_utils.style_text('Commands', 'b')} (start typing the command to see its description):",
 
                           f"- {global_utils.style_text('HELP', 'b')}:",
@@ -86,6 +69,7 @@ class BotCog(commands.Cog):
                           f" - {global_utils.style_text('/add-note', 'c')}",
                           f" - {global_utils.style_text('/remove-note', 'c')}",
                           f" - {global_utils.style_text('/remind', 'c')}",
+                          f" - {global_utils.style_text('/reminders', 'c')}",
                           f" - {global_utils.style_text('/pin', 'c')}",
                           f" - {global_utils.style_text('/unpin', 'c')}",
                           f" - {global_utils.style_text('/delete-message', 'c')}",
@@ -128,7 +112,7 @@ class BotCog(commands.Cog):
                 output = basic_admin_commands
             case "admin":
                 output = admin_commands
-                if interaction.user.id == global_utils.my_id:
+                if include_mine:
                     output += my_commands
             case "user_admin":
                 output = user_admin_commands
@@ -137,7 +121,47 @@ class BotCog(commands.Cog):
             case _:
                 output = all_commands
 
-        await interaction.followup.send('\n'.join(output), ephemeral=ephem, silent=True)
+        return '\n'.join(output)
+
+    @app_commands.command(name="commands", description=global_utils.command_descriptions["commands"])
+    @app_commands.choices(
+        list_type=[
+            app_commands.Choice(name="only the bare minimum", value="basic"),
+            app_commands.Choice(name="all non-admin commands", value="user"),
+            app_commands.Choice(
+                name="bare minimum + admin commands", value="basic_admin"),
+            app_commands.Choice(name="only admin commands", value="admin"),
+            app_commands.Choice(
+                name="all commands except Bizzy's", value="user_admin"),
+            app_commands.Choice(name="every command available", value="all"),
+        ],
+        announce=[
+            app_commands.Choice(name="Yes", value=1),
+        ]
+    )
+    @app_commands.describe(
+        list_type="The type of command list to display",
+        announce="Allow others to see the returned command list in the channel (only in bot channel)"
+    )
+    async def commands(self, interaction: Interaction, list_type: str = "all", announce: int = 0) -> None:
+        """[command] Displays all bot commands
+
+        Parameters
+        ----------
+        interaction : discord.Interaction
+            The interaction object that initiated the command
+        list_type : str, optional
+            The type of command list to display, by default "user"
+        announce : int, optional
+            Treated as a boolean. Announce the output when used in the bot channel, by default 0
+        """
+        ephem = interaction.channel.id != global_utils.bot_channel_id or not announce
+
+        include_mine = interaction.user.id == global_utils.my_id
+        output = global_utils.renders.get(("commands", list_type, include_mine),
+                                          partial(self.render_commands, list_type, include_mine), ["commands"])
+
+        await interaction.response.send_message(output, ephemeral=ephem, silent=True)
 
     @app_commands.command(name="source-code", description=global_utils.command_descriptions["source-code"])
     async def source(self, interaction: Interaction) -> None:
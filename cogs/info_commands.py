@@ -23,7 +23,10 @@ class InfoCommands(commands.Cog):
         """[event] Executes when the InfoCommands cog is ready
         """
         # global_utils.log("Info cog loaded")
-        pass
+        global_utils.schedule_board.start(self.bot, self.render_schedule, {
+            global_utils.val_server_id: global_utils.prem_channel_id,
+            global_utils.debug_server_id: global_utils.debug_channel_id,
+        })
 
     def format_schedule(self, schedule: list[tuple[str, datetime, str]], header: str = None) -> str:
         """Formats the schedule for display in Discord
@@ -59,31 +62,20 @@ class InfoCommands(commands.Cog):
 
         return f"{header}\n{output}" if header else output
 
-    @app_commands.command(name="schedule", description=global_utils.command_descriptions["schedule"])
-    @app_commands.choices(
-        announce=[
-            app_commands.Choice(name="Yes", value=1),
-        ]
-    )
-    @app_commands.describe(
-        announce="Show the output of the command to everyone (only used in the premier channel)"
-    )
-    async def schedule(self, interaction: Interaction, announce: int = 0) -> None:
-        """[command] Displays the premier schedule from server events
+    def render_schedule(self, guild_id: int) -> str:
+        """Renders the premier event and practice schedules of a guild from the event index
 
         Parameters
         ----------
-        interaction : discord.Interaction
-            The interaction object that initiated the command
-        announce : int, optional
-            Treated as a boolean. Announce the output when used in the premier channel, by default 0
-        """
-        ephem = interaction.channel.id != global_utils.prem_channel_id or not announce
-
-        await interaction.response.defer(ephemeral=ephem, thinking=True)
+        guild_id : int
+            The ID of the guild
 
-        guild = interaction.guild
-        events = guild.scheduled_events
+        Returns
+        -------
+        str
+            The schedules as a string to display in Discord
+        """
+        events = global_utils.event_index.events(guild_id)
 
         event_header = f"{global_utils.style_text('Upcoming Premier Events:', 'b')}"
         practice_header = f"\n\n{global_utils.style_text('Upcoming Premier Practices:', 'b')}"
@@ -91,13 +83,13 @@ class InfoCommands(commands.Cog):
         practice_message = []
 
         for event in events:
-            map_name = event.description if "playoffs" not in event.name.lower(
-            ) else "Playoffs"
+            kind = global_utils.event_index.kind_of(event)
+            map_name = event.description if kind != "playoffs" else "Playoffs"
 
-            if "premier practice" in event.name.lower():
+            if kind == "practice":
                 practice_message.append(
                     (f"{global_utils.discord_local_time(event.start_time, with_date=True)}", event.start_time, map_name))
-            elif "premier" in event.name.lower():
+            else:
                 message.append(
                     (f"{global_utils.discord_local_time(event.start_time, with_date=True)}", event.start_time, map_name))
 
@@ -114,7 +106,33 @@ class InfoCommands(commands.Cog):
 
         message += practice_message
 
-        await interaction.followup.send(message, ephemeral=ephem)
+        return message
+
+    @app_commands.command(name="schedule", description=global_utils.command_descriptions["schedule"])
+    @app_commands.choices(
+        announce=[
+            app_commands.Choice(name="Yes", value=1),
+        ]
+    )
+    @app_commands.describe(
+        announce="Show the output of the command to everyone (only used in the premier channel)"
+    )
+    async def schedule(self, interaction: Interaction, announce: int = 0) -> None:
+        """[command] Displays the premier schedule from server events
+
+        Parameters
+        ----------
+        interaction : discord.Interaction
+            The interaction object that initiated the command
+        announce : int, optional
+            Treated as a boolean. Announce the output when used in the premier channel, by default 0
+        """
+        ephem = interaction.channel.id != global_utils.prem_channel_id or not announce
+
+        # rendered once per change to the guild's events (the pinned schedule board shows the same thing)
+        message = global_utils.schedule_board.get(interaction.guild.id)
+
+        await interaction.response.send_message(message, ephemeral=ephem)
 
     @app_commands.command(name="map-pool", description=global_utils.command_descriptions["map-pool-common"])
     @app_commands.choices(
@@ -177,12 +195,12 @@ class InfoCommands(commands.Cog):
         map_display_name = global_utils.style_text(map_name.title(), 'i')
 
         if action == "clear":
-            global_utils.map_pool.clear()
+            global_utils.clear_pool()
             output = f'The map pool has been cleared'
             log_message = f'{interaction.user.display_name} has cleared the map pool'
         elif action == "add":
             if map_name not in global_utils.map_pool:
-                global_utils.map_pool.append(map_name)
+                global_utils.add_to_pool(map_name)
                 output = f'{map_display_name} has been added to the map pool'
                 log_message = f'{interaction.user.display_name} has added {map_name} to the map pool'
             else:
@@ -190,7 +208,7 @@ class InfoCommands(commands.Cog):
                 return
         elif action == "remove":
             if map_name in global_utils.map_pool:
-                global_utils.map_pool.remove(map_name)
+                global_utils.remove_from_pool(map_name)
                 output = f'{map_display_name} has been removed from the map pool'
                 log_message = f'{interaction.user.display_name} has removed {map_name} from the map pool'
             else:
@@ -201,8 +219,6 @@ class InfoCommands(commands.Cog):
 
         global_utils.log(log_message)
 
-        global_utils.save_pool()
-
     @app_commands.command(name="notes", description=global_utils.command_descriptions["notes"])
     @app_commands.choices(
         map_name=[
@@ -234,17 +250,17 @@ class InfoCommands(commands.Cog):
         ephem = interaction.channel.id != global_utils.notes_channel_id or not announce
 
         map_display_name = global_utils.style_text(map_display_name, 'i')
+        notes_list = await global_utils.notes_for_map(map_name)
 
-        if map_name not in global_utils.practice_notes or len(global_utils.practice_notes[map_name]) == 0:
+        if len(notes_list) == 0:
             await interaction.response.send_message(f'No notes found for {map_display_name}', ephemeral=True)
             return
 
-        if note_number < 0 or note_number > len(global_utils.practice_notes[map_name]):
+        if note_number < 0 or note_number > len(notes_list):
             await interaction.response.send_message(f'Invalid note number. Leave blank to see all options.', ephemeral=True)
             return
 
         if note_number == 0:
-            notes_list = global_utils.practice_notes[map_name]
             output = global_utils.style_text("Practice notes for ", 'b')
             output += global_utils.style_text(map_display_name, 'b') + ":\n"
             for i, note_id in enumerate(notes_list.keys()):
@@ -254,14 +270,12 @@ class InfoCommands(commands.Cog):
             await interaction.response.send_message(output, ephemeral=True)
             return
 
-        note_id = list(global_utils.practice_notes[map_name].keys())[
-            note_number - 1]
+        note_id = list(notes_list.keys())[note_number - 1]
         try:
             note = await interaction.channel.fetch_message(int(note_id))
         except errors.NotFound:
             await interaction.followup.send(f'This note has been deleted by the author. Removing it from the notes list.', ephemeral=True)
-            global_utils.practice_notes[map_name].pop(note_id)
-            global_utils.save_notes()
+            global_utils.remove_note(map_name, note_id)
             return
 
         output = f'Practice note for {map_display_name} (created by {note.author.display_name}):\n\n{note.content}'
@@ -3,14 +3,15 @@ from discord import app_commands
 from discord.ext import commands, tasks
 
 from datetime import datetime
+from functools import partial
 import asyncio
 import os
+import shutil
 
 from urllib.parse import urlparse
 
 from global_utils import global_utils
-
-import yt_dlp
+from utils.audio_session import GuildAudioSession
 
 
 class MusicCommands(commands.Cog):
@@ -23,18 +24,12 @@ class MusicCommands(commands.Cog):
             The bot to add the cog to. Automatically passed with the bot.load_extension method
         """
         self.bot = bot
-        self.vc = None
-        self.owner = None
-        self.last_activity = None
-        # don't dc from vc if downloading a song
-        self.downloading = False
-        # need to hold the current song since it's removed from the playlist when played. used for looping
-        self.current_song = None
-        self.loop_song = False
-        # holds the actual playlist in the form {(title, author): audio_filepath}
-        self.playlist = {}
-        # simply holds the URLs to avoid downloading the same song multiple times
-        self.playlist_urls = {}
+        # one voice session per guild, in the form {guild_id: GuildAudioSession}
+        self.sessions = {}
+        # downloaded songs are cached here, and each session downloads into its own subdirectory first
+        self.temp_music_dir = global_utils.audio_cache.root
+        # "stream" (default) plays songs straight from their audio stream, "download" downloads them to disk first
+        self.music_mode = os.getenv("BOT_MUSIC_MODE", "stream")
 
         # leave the vc after this many seconds if owner leaves
         self.ownerless_timeout_seconds = 60
@@ -51,14 +46,33 @@ class MusicCommands(commands.Cog):
         """
         # global_utils.log("Music commands cog loaded")
         self.timed_checks.start()
-
-        for tmp in os.listdir("./local_storage/temp_music"):
-            loop = asyncio.get_event_loop()
-            loop.run_in_executor(None, self.delete_song,
-                                 f"./local_storage/temp_music/{tmp}")
+        self.log_cache_stats.start()
+        global_utils.prefetcher.start()
+        global_utils.song_metadata.purge()
+
+        # downloaded songs stay cached across restarts, only leftover session directories are deleted
+        global_utils.audio_cache.scan()
+        for tmp in os.listdir(self.temp_music_dir):
+            if os.path.isdir(f"{self.temp_music_dir}/{tmp}"):
+                loop = asyncio.get_event_loop()
+                loop.run_in_executor(None, shutil.rmtree,
+                                     f"{self.temp_music_dir}/{tmp}", True)
 
         # pass
 
+    async def cog_load(self) -> None:
+        """Restarts the prefetcher and the cache stats log when the cog is reloaded (on_ready doesn't fire again after a reload)
+        """
+        if self.bot.is_ready():
+            global_utils.prefetcher.start()
+            self.log_cache_stats.start()
+
+    async def cog_unload(self) -> None:
+        """Stops the prefetcher and the cache stats log when the cog is unloaded
+        """
+        global_utils.prefetcher.stop()
+        self.log_cache_stats.cancel()
+
     @commands.Cog.listener("on_reload_cogs")
     async def on_reload(self) -> None:
         """[event] Executes when the MusicCommands cog is reloaded
@@ -78,20 +92,19 @@ class MusicCommands(commands.Cog):
         after : discord.VoiceState
             The voice state after the change
         """
-        if self.vc is None:
+        session = self.sessions.get(member.guild.id)
+        if session is None:
             return
 
-        if member != self.owner:
+        if member != session.owner:
             return
 
-        if self.owner not in self.vc.channel.members:
+        if session.owner not in session.vc.channel.members:
             await asyncio.sleep(self.ownerless_timeout_seconds)
 
-            if self.owner not in self.vc.channel.members:
-                await self.vc.disconnect()
-                self.vc = None
-                self.owner = None
-                self.last_activity = None
+            # the session may have been closed (or replaced) in the meantime
+            if self.sessions.get(member.guild.id) is session and session.owner not in session.vc.channel.members:
+                await self.close_session(member.guild.id)
 
     @app_commands.command(name="join-voice", description=global_utils.command_descriptions["join-voice"])
     async def join(self, interaction: discord.Interaction) -> None:
@@ -106,26 +119,30 @@ class MusicCommands(commands.Cog):
             await interaction.response.send_message("You must be in a voice channel to use this command", ephemeral=True)
             return
 
-        if self.vc is not None:
-            if interaction.user != self.owner:
-                await interaction.response.send_message(f"I am already in a voice channel with {self.owner.display_name}", ephemeral=True)
+        session = self.sessions.get(interaction.guild.id)
+
+        if session is not None:
+            if interaction.user != session.owner:
+                await interaction.response.send_message(f"I am already in a voice channel with {session.owner.display_name}", ephemeral=True)
                 return
-            if interaction.user.voice.channel == self.vc.channel:
+            if interaction.user.voice.channel == session.vc.channel:
                 await interaction.response.send_message("I am already in the voice channel", ephemeral=True)
                 return
-            await self.vc.move_to(interaction.user.voice.channel)
+            await session.vc.move_to(interaction.user.voice.channel)
         else:
-            self.vc = await interaction.user.voice.channel.connect()
+            vc = await interaction.user.voice.channel.connect()
+            session = GuildAudioSession(interaction.guild.id, vc, interaction.user,
+                                        f"{self.temp_music_dir}/{interaction.guild.id}", global_utils.song_metadata, global_utils.audio_cache, global_utils.prefetcher, mode=self.music_mode)
+            self.sessions[interaction.guild.id] = session
 
-        self.owner = interaction.user
-        self.update_activity()
+        session.update_activity()
 
         disconnect_str = global_utils.style_text('/leave-voice', 'c')
         add_str = global_utils.style_text('/add-song', 'c')
         limit_str = global_utils.style_text(
             f'limit: {self.playlist_limit}', 'bu')
 
-        join_message = f"I have joined {self.vc.channel.mention}. Use {disconnect_str} to disconnect me. Use {add_str} to add a song to the playlist ({limit_str})"
+        join_message = f"I have joined {session.vc.channel.mention}. Use {disconnect_str} to disconnect me. Use {add_str} to add a song to the playlist ({limit_str})"
 
         ownerless_timeout_str = global_utils.style_text(
             f'{self.ownerless_timeout_seconds} seconds', 'iu')
@@ -146,73 +163,29 @@ class MusicCommands(commands.Cog):
         interaction : discord.Interaction
             The interaction object that initiated the command
         """
-        if self.vc is None:
+        session = self.sessions.get(interaction.guild.id)
+        if session is None:
             await interaction.response.send_message("I am not in a voice channel", ephemeral=True)
             return
 
-        if interaction.user != self.owner:
+        if interaction.user != session.owner:
             await interaction.response.send_message("You must be the one who added me to the voice channel to use this command", ephemeral=True)
             return
 
-        if self.current_song is not None:
-            audio = self.current_song["audio"]
-            audio.cleanup()
-
-        for file in os.listdir("./local_storage/temp_music"):
-            loop = asyncio.get_event_loop()
-            loop.run_in_executor(None, self.delete_song,
-                                 f"./local_storage/temp_music/{file}")
-
-        await self.reset_state()
+        await self.close_session(interaction.guild.id)
         await interaction.response.send_message("Left the voice channel", ephemeral=True)
 
-    def download_song(self, url: str) -> tuple[str, str]:
-        """Downloads a song from a YouTube URL and returns the title and author of the song
-
-        Parameters
-        ----------
-        url : str
-            The YouTube URL of the song to download
-
-        Returns
-        -------
-        tuple[str, str]
-            The title and author of the song
-        """
-        self.downloading = True
-
-        ydl_opts = {
-            'format': 'mp3/bestaudio/best',
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
-                # 'preferredquality': '192',
-            }],
-            'outtmpl': './local_storage/temp_music/%(id)s.%(ext)s',
-            'noplaylist': 'True',
-        }
-
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url)
-            title = info['title']
-            author = info['uploader']
-            video_id = info['id']
-            ydl.download([url])
-
-        self.update_activity()
-        self.downloading = False
-        return title, author, video_id
-
-    def delete_song(self, filepath: str) -> None:
-        """Deletes a song file
+    async def close_session(self, guild_id: int) -> None:
+        """Closes a guild's voice session (disconnecting and deleting its songs) and forgets it
 
         Parameters
         ----------
-        filepath : str
-            The file path of the song to delete
+        guild_id : int
+            The ID of the guild
         """
-        if os.path.exists(filepath):
-            os.remove(filepath)
+        session = self.sessions.pop(guild_id, None)
+        if session is not None:
+            await session.close()
 
     @app_commands.command(name="add-song", description=global_utils.command_descriptions["add-song"])
     @app_commands.choices(
@@ -225,7 +198,7 @@ class MusicCommands(commands.Cog):
         bump="Bumps the song to the start of the playlist"
     )
     async def addsong(self, interaction: discord.Interaction, url: str, bump: int = 0) -> None:  # for testing
-        """[command] Adds a song (or any video really) to the playlist via YouTube URL (can take a while!)
+        """[command] Adds a song (or any video really) to the playlist via YouTube URL. The song is fetched in the background
 
         Parameters
         ----------
@@ -236,21 +209,22 @@ class MusicCommands(commands.Cog):
         bump : int, optional
             Treated as a boolean. Bump the song to the top of the playlist, by default 0
         """
-        if self.vc is None:
+        session = self.sessions.get(interaction.guild.id)
+        if session is None:
             await interaction.response.send_message("I am not in a voice channel", ephemeral=True)
             return
 
-        if interaction.user != self.owner:
+        if interaction.user != session.owner:
             await interaction.response.send_message("You must be the one who added me to the voice channel to use this command", ephemeral=True)
             return
 
-        self.update_activity()
+        session.update_activity()
 
-        if len(self.playlist) == self.playlist_limit:
+        if len(session.playlist) == self.playlist_limit:
             await interaction.response.send_message(f"The playlist is currently limited to only {self.playlist_limit} songs. Use {global_utils.style_text('/skip', 'c')} to make space.")
             return
 
-        if url in self.playlist_urls.values():
+        if session.has_url(url):
             await interaction.response.send_message("Song already in playlist. Wait for it to play before adding it again", ephemeral=True)
             return
 
@@ -259,22 +233,27 @@ class MusicCommands(commands.Cog):
             await interaction.response.send_message("Not a YouTube link", ephemeral=True)
             return
 
-        await interaction.response.defer(ephemeral=True)
+        session.add_song(url, bump, on_failed=partial(self.report_failed, interaction, url))
 
-        loop = asyncio.get_event_loop()
-        # this is blocking, so run it in a separate thread
-        title, author, video_id = await loop.run_in_executor(None, self.download_song, url)
-        info = (title, author)
+        await interaction.response.send_message("Added to playlist", ephemeral=True)
 
-        self.playlist_urls.update({info: url})
-        audio_filepath = f"./local_storage/temp_music/{video_id}.mp3"
+    async def report_failed(self, interaction: discord.Interaction, url: str, error: Exception) -> None:
+        """Tells the user who added a song that it failed to fetch. The song is fetched after /add-song has responded, so this is a followup
 
-        if bump:
-            self.playlist = {info: audio_filepath} | self.playlist
-        else:
-            self.playlist.update({info: audio_filepath})
-
-        await interaction.followup.send("Added to playlist", ephemeral=True)
+        Parameters
+        ----------
+        interaction : discord.Interaction
+            The /add-song interaction
+        url : str
+            The URL of the song
+        error : Exception
+            Why the fetch failed (already logged by the prefetcher)
+        """
+        try:
+            await global_utils.rest.call("interaction", f"followup:{interaction.id}", interaction.followup.send,
+                                         f"Couldn't load {url}, so it was removed from the playlist", ephemeral=True)
+        except discord.HTTPException:  # the interaction expired, /playlist still shows the failure
+            pass
 
     @app_commands.command(name="playlist", description=global_utils.command_descriptions["playlist"])
     async def playlist(self, interaction: discord.Interaction) -> None:
@@ -285,28 +264,33 @@ class MusicCommands(commands.Cog):
         interaction : discord.Interaction
             The interaction object that initiated the command
         """
-        if self.vc is None:
+        session = self.sessions.get(interaction.guild.id)
+        if session is None:
             await interaction.response.send_message("I am not in a voice channel", ephemeral=True)
             return
 
-        if interaction.user == self.owner:
-            self.update_activity()
+        if interaction.user == session.owner:
+            session.update_activity()
 
         playlist = ""
-        for i, info in enumerate(self.playlist, start=1):
-            title = info[0]
-            author = info[1]
+        for i, entry in enumerate(session.playlist, start=1):
+            title = entry["info"][0]
+            author = entry["info"][1]
             playlist += f"{i}. {global_utils.style_text(title, 'b')} - {global_utils.style_text(author, 'i')}\n"
 
         current_str = global_utils.style_text("None", 'b')
-        if self.current_song is not None:
-            current_title = self.current_song["info"][0]
-            current_author = self.current_song["info"][1]
+        if session.current_song is not None:
+            current_title = session.current_song["info"][0]
+            current_author = session.current_song["info"][1]
 
             current_str = f"{global_utils.style_text(current_title, 'b')} - {global_utils.style_text(current_author, 'i')}"
 
         playlist = f"Currently playing: {current_str}\n\nNext up:\n{playlist if playlist != '' else global_utils.style_text('Playlist Empty', 'i')}"
 
+        if interaction.user == session.owner and len(session.failed) > 0:
+            playlist += "\n\nCouldn't load (removed from the playlist):\n" + "\n".join(session.failed)
+            session.failed = []
+
         await interaction.response.send_message(playlist, ephemeral=True)
 
     @app_commands.command(name="play-song", description=global_utils.command_descriptions["play-song"])
@@ -318,29 +302,30 @@ class MusicCommands(commands.Cog):
         interaction : discord.Interaction
             The interaction object that initiated the command
         """
-        if self.vc is None:
+        session = self.sessions.get(interaction.guild.id)
+        if session is None:
             await interaction.response.send_message("I am not in a voice channel", ephemeral=True)
             return
 
-        if interaction.user != self.owner:
+        if interaction.user != session.owner:
             await interaction.response.send_message("You must be the one who added me to the voice channel to use this command", ephemeral=True)
             return
 
-        self.update_activity()
+        session.update_activity()
 
-        if self.vc.is_playing():
+        if session.vc.is_playing():
             await interaction.response.send_message("I am already playing audio", ephemeral=True)
             return
 
-        if self.vc.is_paused():
-            self.vc.resume()
-            self.update_activity()
+        if session.vc.is_paused():
+            session.vc.resume()
+            session.update_activity()
             await interaction.response.send_message("Resumed audio", ephemeral=True)
             return
 
         await interaction.response.defer(ephemeral=True)
 
-        title, author = self.play_next_song()
+        title, author = session.play_next_song()
 
         if title is None:
             await interaction.followup.send(f"Playlist is empty. Use {global_utils.style_text('/add-song', 'c')} to add songs", ephemeral=True)
@@ -357,21 +342,22 @@ class MusicCommands(commands.Cog):
         interaction : discord.Interaction
             The interaction object that initiated the command
         """
-        if self.vc is None:
+        session = self.sessions.get(interaction.guild.id)
+        if session is None:
             await interaction.response.send_message("I am not in a voice channel", ephemeral=True)
             return
 
-        if interaction.user != self.owner:
+        if interaction.user != session.owner:
             await interaction.response.send_message("You must be the one who added me to the voice channel to use this command", ephemeral=True)
             return
 
-        self.update_activity()
+        session.update_activity()
 
-        if not self.vc.is_playing():
+        if not session.vc.is_playing():
             await interaction.response.send_message("I am not playing audio", ephemeral=True)
             return
 
-        self.vc.pause()
+        session.vc.pause()
         await interaction.response.send_message("Paused audio", ephemeral=True)
 
     # deprecated, just use /play-song to resume
@@ -410,21 +396,22 @@ class MusicCommands(commands.Cog):
         interaction : discord.Interaction
             The interaction object that initiated the command
         """
-        if self.vc is None:
+        session = self.sessions.get(interaction.guild.id)
+        if session is None:
             await interaction.response.send_message("I am not in a voice channel", ephemeral=True)
             return
 
-        if interaction.user != self.owner:
+        if interaction.user != session.owner:
             await interaction.response.send_message("You must be the one who added me to the voice channel to use this command", ephemeral=True)
             return
 
-        self.update_activity()
+        session.update_activity()
 
-        if not self.vc.is_playing() and not self.vc.is_paused():
+        if not session.vc.is_playing() and not session.vc.is_paused():
             await interaction.response.send_message("I am not playing audio", ephemeral=True)
             return
 
-        self.vc.stop()
+        session.vc.stop()
         await interaction.response.send_message("Stopped audio", ephemeral=True)
 
     @app_commands.command(name="skip-song", description=global_utils.command_descriptions["skip-song"])
@@ -436,80 +423,34 @@ class MusicCommands(commands.Cog):
         interaction : discord.Interaction
             The interaction object that initiated the command
         """
-        if self.vc is None:
+        session = self.sessions.get(interaction.guild.id)
+        if session is None:
             await interaction.response.send_message("I am not in a voice channel", ephemeral=True)
             return
 
-        if interaction.user != self.owner:
+        if interaction.user != session.owner:
             await interaction.response.send_message("You must be the one who added me to the voice channel to use this command", ephemeral=True)
             return
 
-        self.update_activity()
+        session.update_activity()
 
-        if self.vc.is_playing() or self.vc.is_paused():
-            self.vc.stop()
+        # the song playback is waiting on is skipped before it was even fetched
+        session.skip_waiting()
+        if session.vc.is_playing() or session.vc.is_paused():
+            session.vc.stop()
 
-        title, author = self.play_next_song()
+        title, author = session.play_next_song()
         message = "Skipped audio.\n"
 
         if title is None:
             message += "No more audio to play"
+        elif session.waiting:
+            message += f"Up next (still loading): {title} - {author}"
         else:
             message += f"Now playing: {title} - {author}"
 
         await interaction.response.send_message(message, ephemeral=True)
 
-    def play_next_song(self, error: Exception = None) -> str:
-        """Plays the next song in the playlist if there is one
-
-        Parameters
-        ----------
-        error : Exception
-            The error that occurred while playing audio, if any
-
-        Returns
-        -------
-        str
-            The playlist info of the song that was played
-        """
-        # shouldn't be neccessary, since timeout checks for is_playing, but just in case
-        self.update_activity(error)
-        if self.current_song is not None:
-            audio_filepath = self.current_song["audio_filepath"]
-            audio = self.current_song["audio"]
-            audio.cleanup()
-
-            if self.loop_song:
-                if not self.vc.is_playing() and not self.vc.is_paused():
-                    info = self.current_song["info"]
-
-                    audio = discord.FFmpegPCMAudio(source=audio_filepath)
-
-                    self.vc.play(audio, after=self.play_next_song)
-
-                    return info
-            else:
-                loop = asyncio.get_event_loop()
-                loop.run_in_executor(None, self.delete_song, audio_filepath)
-
-                self.current_song = None
-
-        if len(self.playlist) == 0:
-            return None, None
-
-        info = next(iter(self.playlist))
-
-        audio_filepath = self.playlist.pop(info)
-        audio = discord.FFmpegPCMAudio(source=audio_filepath, stderr=open(
-            "./local_storage/debug_log.txt", "w"))
-
-        self.current_song = {"info": info, "audio": audio,
-                             "audio_filepath": audio_filepath}
-
-        self.vc.play(audio, after=self.play_next_song)
-
-        return info
-
     @app_commands.command(name="loop-song", description=global_utils.command_descriptions["loop-song"])
     async def loop(self, interaction: discord.Interaction) -> None:
         """[command] Toggles looping of the current song
@@ -519,63 +460,46 @@ class MusicCommands(commands.Cog):
         interaction : discord.Interaction
             The interaction object that initiated the command
         """
-        if self.vc is None:
+        session = self.sessions.get(interaction.guild.id)
+        if session is None:
             await interaction.response.send_message("I am not in a voice channel", ephemeral=True)
             return
 
-        if interaction.user != self.owner:
+        if interaction.user != session.owner:
             await interaction.response.send_message("You must be the one who added me to the voice channel to use this command", ephemeral=True)
             return
 
-        self.update_activity()
+        session.update_activity()
 
-        self.loop_song = not self.loop_song
-        message = "Looping" + (" enabled" if self.loop_song else " disabled")
+        session.loop_song = not session.loop_song
+        message = "Looping" + (" enabled" if session.loop_song else " disabled")
         await interaction.response.send_message(message, ephemeral=True)
 
     # I don't know the performance impact of this, but it's the only way I can think of to check for inactivity
     @tasks.loop(seconds=5)
     async def timed_checks(self) -> None:
-        """[task] Checks for inactivity and leaves the voice channel if inactive
+        """[task] Checks every session for inactivity and leaves the voice channels of inactive ones
         """
-        if self.vc.is_playing() or self.downloading or self.vc is None:
-            return
+        for guild_id, session in list(self.sessions.items()):
+            if session.vc is None or session.vc.is_playing() or session.is_busy():
+                continue
 
-        if (datetime.now() - self.last_activity).seconds >= self.inactivity_timeout_seconds:
-            await self.reset_state()
+            if session.idle_seconds() >= self.inactivity_timeout_seconds:
+                await self.close_session(guild_id)
 
-    async def reset_state(self) -> None:
-        """Resets the state of the MusicCommands cog (disconnects from voice channel, clears owner, and clears last activity)
+    @tasks.loop(hours=1)
+    async def log_cache_stats(self) -> None:
+        """[task] Logs how well the audio and song metadata caches are doing (hits, misses and bytes served from disk)
         """
-        if self.vc is not None:
-            await self.vc.disconnect()
-
-        if self.current_song is not None:
-            audio = self.current_song["audio"]
-            audio.cleanup()
+        global_utils.debug_log(f"Audio cache stats: {global_utils.audio_cache.stats()}")
+        global_utils.debug_log(f"Song metadata cache stats: {global_utils.song_metadata.stats()}")
+        global_utils.debug_log(f"Prefetcher stats: {global_utils.prefetcher.stats()}")
 
-        loop = asyncio.get_event_loop()
-        for file in os.listdir("./local_storage/temp_music"):
-            loop.run_in_executor(None, self.delete_song,
-                                 f"./local_storage/temp_music/{file}")
-
-        self.vc = None
-        self.owner = None
-        self.last_activity = None
-        self.loop_song = False
-        self.current_song = None
-        self.playlist = {}
-        self.playlist_urls = {}
-
-    def update_activity(self, error: Exception = None) -> None:
-        """Updates the last activity time of the bot to prevent inactivity timeout
-
-        Parameters
-        ----------
-        error : Exception
-            The error that occurred, if any
+    async def reset_state(self) -> None:
+        """Resets the state of the MusicCommands cog (closes every guild's voice session)
         """
-        self.last_activity = datetime.now()
+        for guild_id in list(self.sessions):
+            await self.close_session(guild_id)
 
 
 async def setup(bot: commands.Bot) -> None:
@@ -1,12 +1,8 @@
 import discord
 from discord.ext import commands, tasks
 
-from copy import deepcopy
 from datetime import datetime, time, timedelta
 import pytz
-import asyncio
-import asyncpg
-import sys
 
 from global_utils import global_utils
 
@@ -24,229 +20,537 @@ class TasksCog(commands.Cog):
         self.bot = bot
 
         self.premier_reminder_types = ["start", "prestart", "day"]
+        # how long before an event's start time each reminder goes off
+        self.premier_reminder_offsets = {
+            "start": timedelta(0),
+            "prestart": timedelta(minutes=30),
+            "day": timedelta(hours=3),
+        }
+        # the start reminder is still sent this long after the event has started (e.g. after a restart)
+        self.start_reminder_grace = timedelta(minutes=10)
+        # stored reminders are only armed this long ahead of time (syncreminders runs every hour)
+        self.reminder_horizon = timedelta(hours=2)
+        # failed reminder posts and roster fetches are retried this many times, this long apart
+        self.premier_retries = 3
+        self.premier_retry_delay = timedelta(minutes=1)
+
+        # re-registered on reload, so timers always call the current instance
+        global_utils.scheduler.register("reminder", self.deliver_reminder)
+        global_utils.scheduler.register(
+            "premier_reminder", self.premier_reminder)
+        global_utils.scheduler.register(
+            "premier_roster", self.premier_roster)
 
     @commands.Cog.listener()
     async def on_ready(self) -> None:
         """[event] Executes when the TasksCog cog is ready to start the tasks
         """
         # global_utils.log("Tasks cog loaded")
-        self.eventreminders.add_exception_type(asyncpg.PostgresConnectionError)
-        self.eventreminders.start()
+        global_utils.rest.start()
+        global_utils.scheduler.start()
+        global_utils.status_boards.start(self.bot, self.render_status_board)
+        self.rebuild_timers()
         self.clear_old_reminders.start()
         self.syncreminders.start()
         self.latest_log.start()
+        self.update_cache.start()
 
-    async def get_reminder(self, event: discord.ScheduledEvent) -> tuple[str, str]:
-        """Given an event, returns the type of reminder to send and the message to send
+    @commands.Cog.listener()
+    async def on_resumed(self) -> None:
+        """[event] Rebuilds the event timers after reconnecting, in case any event changes were missed
+        """
+        self.rebuild_timers()
+
+    @commands.Cog.listener()
+    async def on_scheduled_event_create(self, event: discord.ScheduledEvent) -> None:
+        """[event] Indexes a newly created premier event and arms its lifecycle and reminder timers
+
+        Parameters
+        ----------
+        event : discord.ScheduledEvent
+            The event that was created
+        """
+        global_utils.event_index.add(event)
+        global_utils.schedule_board.invalidate(event.guild.id)
+        # nobody can have RSVP'ed yet, so the roster doesn't need to be fetched
+        global_utils.rsvps.finish_seed(event.id, [])
+        global_utils.lifecycle.arm(event)
+        self.schedule_premier_reminders(event)
+
+    @commands.Cog.listener()
+    async def on_scheduled_event_update(self, before: discord.ScheduledEvent, after: discord.ScheduledEvent) -> None:
+        """[event] Reindexes a premier event and re-arms its timers when it changes (e.g. its start time moves or it starts)
+
+        Parameters
+        ----------
+        before : discord.ScheduledEvent
+            The event before the update
+        after : discord.ScheduledEvent
+            The event after the update
+        """
+        global_utils.event_index.add(after)
+        global_utils.schedule_board.invalidate(after.guild.id)
+        if after.status not in [discord.EventStatus.scheduled, discord.EventStatus.active]:
+            global_utils.rsvps.drop(after.id)
+            global_utils.status_boards.close(after.id)
+        else:
+            global_utils.status_boards.refresh(after.id)
+
+        global_utils.lifecycle.arm(after)
+        self.schedule_premier_reminders(after)
+
+    @commands.Cog.listener()
+    async def on_scheduled_event_delete(self, event: discord.ScheduledEvent) -> None:
+        """[event] Drops a deleted premier event from the index, along with its timers
+
+        Parameters
+        ----------
+        event : discord.ScheduledEvent
+            The event that was deleted
+        """
+        global_utils.event_index.remove(event.guild.id, event.id)
+        global_utils.schedule_board.invalidate(event.guild.id)
+        global_utils.rsvps.drop(event.id)
+        global_utils.status_boards.close(event.id)
+        global_utils.lifecycle.disarm(event.id)
+        self.unschedule_premier_reminders(event.id)
+
+    @commands.Cog.listener()
+    async def on_scheduled_event_user_add(self, event: discord.ScheduledEvent, user: discord.User) -> None:
+        """[event] Adds a user to an event's cached RSVP roster and queues an update of the event's status board
+
+        Parameters
+        ----------
+        event : discord.ScheduledEvent
+            The event the user RSVP'ed to
+        user : discord.User
+            The user who RSVP'ed
+        """
+        global_utils.rsvps.add(event.id, user.id)
+        global_utils.status_boards.refresh(event.id)
+
+    @commands.Cog.listener()
+    async def on_scheduled_event_user_remove(self, event: discord.ScheduledEvent, user: discord.User) -> None:
+        """[event] Removes a user from an event's cached RSVP roster and queues an update of the event's status board
+
+        Parameters
+        ----------
+        event : discord.ScheduledEvent
+            The event the user removed their RSVP from
+        user : discord.User
+            The user who removed their RSVP
+        """
+        global_utils.rsvps.remove(event.id, user.id)
+        global_utils.status_boards.refresh(event.id)
+
+    async def seed_rsvps(self, event: discord.ScheduledEvent) -> None:
+        """Fetches an event's RSVP roster into the cache, if it isn't cached yet. After this, the gateway events keep it current
+
+        Parameters
+        ----------
+        event : discord.ScheduledEvent
+            The event to fetch the roster of
+        """
+        if global_utils.rsvps.is_seeded(event.id):
+            return
+
+        global_utils.rsvps.begin_seed(event.id)
+        try:
+            user_ids = [user.id async for user in event.users()]
+        except discord.HTTPException:
+            global_utils.rsvps.drop(event.id)
+            raise
+
+        global_utils.rsvps.finish_seed(event.id, user_ids)
+
+    def premier_reminder_key(self, event_id: int, reminder_type: str) -> str:
+        """Builds the scheduler key of a premier event reminder
 
         Parameters
         ----------
-        event : discord.Event
-            The event to determine the reminder type for
+        event_id : int
+            The ID of the event
+        reminder_type : str
+            The type of reminder
 
         Returns
         -------
-        tuple | None
-            A tuple with the structure (reminder_type, message). If there is no reminder to send, each value is empty string
-
+        str
+            The scheduler key
         """
-        current_time = datetime.now(pytz.utc)
-        start_time = event.start_time
+        return f"premier:{event_id}:{reminder_type}"
 
-        time_remaining = (start_time - current_time).total_seconds()
-
-        reminder_type = ""
-        if time_remaining <= 0:  # allow this reminder until 10 minutes after the event has already started
-            if time_remaining >= -60 * 10:
-                reminder_type = self.premier_reminder_types[0]
-                if event.status == discord.EventStatus.scheduled:
-                    await event.start()
-            elif time_remaining <= -3600:  # remove the event
-                if event.status == discord.EventStatus.active:
-                    await event.end()
-                elif event.status == discord.EventStatus.scheduled:
-                    await event.cancel()
-        elif time_remaining <= 60 * 30:
-            reminder_type = self.premier_reminder_types[1]
-        elif time_remaining <= 3600 * 3:
-            reminder_type = self.premier_reminder_types[2]
-
-        if reminder_type == "":
-            return "", ""
-
-        g = event.guild
-        role_name = global_utils.prem_role_name if g.id == global_utils.val_server_id else global_utils.debug_role_name
-        role = discord.utils.get(g.roles, name=role_name)
-
-        if reminder_type == self.premier_reminder_types[0]:
-            message = f"has started (at {global_utils.discord_local_time(start_time)}). JOIN THE VC!"
-        elif reminder_type == self.premier_reminder_types[1]:
-            message = f"is starting in 30 minutes (at {global_utils.discord_local_time(start_time)})!"
-        elif reminder_type == self.premier_reminder_types[2]:
-            message = f"is today at {global_utils.discord_local_time(start_time)}! Make sure you have RSVP'ed if you're joining!"
-
-        message = f"(reminder) {event.name} on {global_utils.style_text(event.description, 'i')} {message}"
-
-        if reminder_type != self.premier_reminder_types[2]:
-            message = message.split()
-            # need "(reminder)" to be the first word, ping the role after it
-            message.insert(1, f"{role.mention}")
-            message = " ".join(message)
-
-        return reminder_type, message
-
-    @tasks.loop(time=global_utils.premier_reminder_times)
-    async def eventreminders(self) -> None:
-        """[task] Sends reminders for upcoming events near starting times of West Coast premier events"""
-        global_utils.log("Checking for event reminders")
-
-        events = []
+    def premier_roster_key(self, event_id: int, reminder_type: str) -> str:
+        """Builds the scheduler key of the roster fetch that follows a premier event reminder
 
+        Parameters
+        ----------
+        event_id : int
+            The ID of the event
+        reminder_type : str
+            The type of reminder
+
+        Returns
+        -------
+        str
+            The scheduler key
+        """
+        return f"premier_roster:{event_id}:{reminder_type}"
+
+    def rebuild_timers(self) -> None:
+        """Rebuilds the premier event index of the premier and debug servers from the cached scheduled events, then re-arms every event's lifecycle and reminder timers
+        """
         for g_id in [global_utils.val_server_id, global_utils.debug_server_id]:
             guild = self.bot.get_guild(g_id)
-            # the more urgent the reminder, the later it should be sent (since it will be closer to the bottom of the chat)
-            events += sorted(guild.scheduled_events,
-                             key=lambda x: x.start_time, reverse=True)
+            if guild is not None:
+                global_utils.event_index.rebuild(g_id, guild.scheduled_events)
+                global_utils.schedule_board.invalidate(g_id)
+                global_utils.lifecycle.rebuild(g_id)
 
-        for event in events:
-            if "premier" not in event.name.lower():
-                continue
+        self.schedule_all_premier_reminders()
 
-            start_time = event.start_time
+    def schedule_all_premier_reminders(self) -> None:
+        """Queues the reminders of every indexed premier event in the premier and debug servers
+        """
+        for g_id in [global_utils.val_server_id, global_utils.debug_server_id]:
+            for event in global_utils.event_index.events(g_id):
+                self.schedule_premier_reminders(event)
 
-            reminder_type, message = await self.get_reminder(event)
-            if reminder_type == "":  # there is no event reminder to send
-                continue
+    def schedule_premier_reminders(self, event: discord.ScheduledEvent) -> None:
+        """Computes an event's reminder deadlines from its start time and queues them, replacing any previously queued ones.
 
-            log_message = f"Posted '{reminder_type}' reminder for event: {event.name} on {event.description} starting at {start_time.astimezone(global_utils.tz).strftime('%Y-%m-%d %H:%M:%S')} EST"
+        Deadlines are absolute (UTC) times, so they stay correct across DST changes
 
-            # if the reminder has already been posted, skip it
-            if global_utils.already_logged(log_message):
-                continue
+        Parameters
+        ----------
+        event : discord.ScheduledEvent
+            The event to queue the reminders for
+        """
+        self.unschedule_premier_reminders(event.id)
 
-            subbed_users = []
-            async for user in event.users():
-                subbed_users.append(user)
+        if global_utils.event_index.kind_of(event) is None or event.status not in [discord.EventStatus.scheduled, discord.EventStatus.active]:
+            return
 
-            channel = self.bot.get_channel(
-                global_utils.prem_channel_id) if event.guild.id == global_utils.val_server_id else self.bot.get_channel(global_utils.debug_channel_id)
+        now = datetime.now(pytz.utc)
+        start_time = event.start_time
+        g_id = event.guild.id
+
+        # of the reminders that are already due (e.g. after a restart), only the most urgent one is still relevant
+        due_type = ""
+        for reminder_type in reversed(self.premier_reminder_types):  # day -> prestart -> start
+            deadline = start_time - self.premier_reminder_offsets[reminder_type]
+            if deadline > now:
+                global_utils.scheduler.schedule(self.premier_reminder_key(
+                    event.id, reminder_type), deadline, "premier_reminder", g_id, event.id, reminder_type)
+            else:
+                due_type = reminder_type
+
+        too_late = due_type == self.premier_reminder_types[0] and now - start_time > self.start_reminder_grace
+        if due_type != "" and not too_late:
+            global_utils.scheduler.schedule(self.premier_reminder_key(
+                event.id, due_type), now, "premier_reminder", g_id, event.id, due_type)
+
+    def unschedule_premier_reminders(self, event_id: int) -> None:
+        """Drops every queued reminder of an event
+
+        Parameters
+        ----------
+        event_id : int
+            The ID of the event
+        """
+        for reminder_type in self.premier_reminder_types:
+            global_utils.scheduler.cancel(
+                self.premier_reminder_key(event_id, reminder_type))
 
-            await self.send_reminder(channel, message, reminder_type, len(subbed_users))
+    def get_event(self, guild_id: int, event_id: int) -> discord.ScheduledEvent | None:
+        """Gets a scheduled event from the cache
 
-            # mark the reminder as posted
-            global_utils.log(log_message)
+        Parameters
+        ----------
+        guild_id : int
+            The ID of the event's guild
+        event_id : int
+            The ID of the event
 
-            # don't show RSVP list for the day reminder
-            if reminder_type == self.premier_reminder_types[2]:
-                continue
+        Returns
+        -------
+        discord.ScheduledEvent | None
+            The event, or None if it (or its guild) no longer exists
+        """
+        guild = self.bot.get_guild(guild_id)
+        return guild.get_scheduled_event(event_id) if guild is not None else None
 
-            # loud ping individual users only for the start reminder
-            is_silent = reminder_type != self.premier_reminder_types[0]
+    def get_role(self, guild: discord.Guild) -> discord.Role | None:
+        """Gets the premier role of a guild
 
-            await self.send_rsvp(channel, is_silent, subbed_users)
+        Parameters
+        ----------
+        guild : discord.Guild
+            The premier or debug server
 
-    async def send_reminder(self, channel: discord.TextChannel, message: str, reminder_type: str = "", rsvp_len: int = 0) -> None:
-        """Sends a reminder message to a channel
+        Returns
+        -------
+        discord.Role | None
+            The role
+        """
+        role_name = global_utils.prem_role_name if guild.id == global_utils.val_server_id else global_utils.debug_role_name
+        return discord.utils.get(guild.roles, name=role_name)
+
+    def render_status_board(self, guild_id: int, event_id: int, stage: str) -> str | None:
+        """Builds the status board of a premier event: where the event is at and who has RSVP'ed
 
         Parameters
         ----------
-        channel : discord.TextChannel
-            The channel to send the reminder message to (not the channel ID)
-        message : str
-            The message to send
+        guild_id : int
+            The ID of the event's guild
+        event_id : int
+            The ID of the event
+        stage : str
+            The last reminder that went off ("start", "prestart", or "day")
+
+        Returns
+        -------
+        str | None
+            The board, or None if the event no longer exists
+        """
+        event = self.get_event(guild_id, event_id)
+        if event is None:
+            return None
+
+        start_time = global_utils.discord_local_time(event.start_time)
+        rsvp_len = global_utils.rsvps.count(event.id)
+
+        if stage == self.premier_reminder_types[0]:
+            status = f"has started (at {start_time}). JOIN THE VC!"
+        elif stage == self.premier_reminder_types[1]:
+            status = f"is starting in 30 minutes (at {start_time})!"
+            if rsvp_len < 5:
+                status += "\nWe don't have enough people RSVP'ed yet! Please RSVP before it's too late!"
+        else:
+            status = f"is today at {start_time}! Make sure you have RSVP'ed if you're joining!"
+
+        message = f"(reminder) {event.name} on {global_utils.style_text(event.description, 'i')} {status}"
+
+        if rsvp_len > 0:
+            message += (f"\n\nRSVP'ed users ({rsvp_len}): \n" +
+                        "- " +
+                        "\n- ".join(global_utils.rsvps.mentions(event.id)))
+        else:
+            message += "\n\nNo one has RSVP'ed."
+
+        return message
+
+    async def premier_reminder(self, guild_id: int, event_id: int, reminder_type: str, attempt: int = 0) -> None:
+        """[timer] Moves a premier event's status board to the next stage once a reminder's deadline is reached (posting the board at the first reminder), then queues the fetch of its RSVP roster.
+        A failed post is retried a few times
+
+        Parameters
+        ----------
+        guild_id : int
+            The ID of the event's guild
+        event_id : int
+            The ID of the event
         reminder_type : str
-            The class of the reminder message
-        rsvp_len : int
-            The number of users who have RSVP'ed to the event
+            The type of reminder ("start", "prestart", or "day")
+        attempt : int, optional
+            How many times posting this reminder has failed, by default 0
         """
-        # who to ping when
-        pings = {"subbed": self.premier_reminder_types[0],
-                 "role": self.premier_reminder_types[1],
-                 "none": self.premier_reminder_types[2]}
+        event = self.get_event(guild_id, event_id)
+
+        # if the reminder has already been posted (or the event is gone), skip it
+        if event is None or global_utils.sent_reminders.seen(event.id, reminder_type):
+            return
+
+        start_time = event.start_time
+        log_message = f"Posted '{reminder_type}' reminder for event: {event.name} on {event.description} starting at {start_time.astimezone(global_utils.tz).strftime('%Y-%m-%d %H:%M:%S')} EST"
 
-        is_silent = reminder_type != pings["role"]
+        channel = self.bot.get_channel(
+            global_utils.prem_channel_id) if event.guild.id == global_utils.val_server_id else self.bot.get_channel(global_utils.debug_channel_id)
 
-        if reminder_type == pings["role"] and rsvp_len < 5:
-            message += f"\nWe don't have enough people RSVP'ed yet!"
-            message += " Please RSVP before it's too late!"
+        try:
+            await global_utils.status_boards.post(channel, guild_id, event.id, reminder_type,
+                                                  on_sent=global_utils.track_reminder_message)
+        except discord.HTTPException as e:
+            global_utils.log(f"Failed to post '{reminder_type}' reminder for event: {event.name} ({e!r})")
+            if attempt < self.premier_retries:
+                global_utils.scheduler.schedule(self.premier_reminder_key(event.id, reminder_type), datetime.now(pytz.utc) + self.premier_retry_delay,
+                                                "premier_reminder", guild_id, event.id, reminder_type, attempt + 1)
+            return
 
-        if is_silent:
-            message += "\n\n(This message was sent silently)"
+        # mark the reminder as posted
+        global_utils.sent_reminders.mark(event.id, reminder_type)
+        global_utils.log(log_message)
 
-        await channel.send(message, silent=is_silent)
+        # the board goes out with whatever roster is cached. Fetching it is its own timer, so a slow (or rate limited) fetch doesn't hold the reminder up
+        global_utils.scheduler.schedule(self.premier_roster_key(event.id, reminder_type), datetime.now(pytz.utc),
+                                        "premier_roster", guild_id, event.id, reminder_type)
 
-    async def send_rsvp(self, channel: discord.TextChannel, is_silent: bool, subbed_users: list[discord.User] = []) -> None:
-        """Sends the list of users who have RSVP'ed to an event (to accompany the reminder message)
+    async def premier_roster(self, guild_id: int, event_id: int, reminder_type: str, attempt: int = 0) -> None:
+        """[timer] Fetches a premier event's RSVP roster (if it isn't cached yet) after a reminder was posted, refreshes the event's status board with it, then pings whoever needs to know.
+        A failed fetch is retried a few times, after which the ping goes out with the cached roster
+
+        Parameters
+        ----------
+        guild_id : int
+            The ID of the event's guild
+        event_id : int
+            The ID of the event
+        reminder_type : str
+            The type of reminder that was posted ("start", "prestart", or "day")
+        attempt : int, optional
+            How many times fetching the roster has failed, by default 0
+        """
+        event = self.get_event(guild_id, event_id)
+        if event is None:
+            return
+
+        try:
+            await self.seed_rsvps(event)
+        except discord.HTTPException as e:
+            global_utils.log(f"Failed to fetch the RSVPs of event: {event.name} ({e!r})")
+            if attempt < self.premier_retries:
+                global_utils.scheduler.schedule(self.premier_roster_key(event.id, reminder_type), datetime.now(pytz.utc) + self.premier_retry_delay,
+                                                "premier_roster", guild_id, event.id, reminder_type, attempt + 1)
+                return
+
+        global_utils.status_boards.refresh(event.id)
+
+        channel = self.bot.get_channel(
+            global_utils.prem_channel_id) if event.guild.id == global_utils.val_server_id else self.bot.get_channel(global_utils.debug_channel_id)
+        self.send_ping(channel, event, reminder_type)
+
+    def send_ping(self, channel: discord.TextChannel, event: discord.ScheduledEvent, reminder_type: str) -> None:
+        """Queues the short ping that goes with a status board update (edits don't notify anyone): the role 30 minutes before, and the RSVP'ed users at the start
 
         Parameters
         ----------
         channel : discord.TextChannel
-            The channel to send the list of users to
-        subbed_users : list[discord.User]
-            The list of users who have RSVP'ed to the event
+            The channel to send the ping to
+        event : discord.ScheduledEvent
+            The event
+        reminder_type : str
+            The type of reminder ("start", "prestart", or "day")
         """
-        if len(subbed_users) > 0:
-            message = ("RSVP'ed users: \n" +
-                       "- " +
-                       "\n- ".join([user.mention for user in subbed_users]))
-        else:
-            message = "No one has RSVP'ed."
+        if reminder_type == self.premier_reminder_types[1]:
+            mentions = [self.get_role(event.guild).mention]
+            status = "is starting in 30 minutes!"
+        elif reminder_type == self.premier_reminder_types[0]:
+            mentions = global_utils.rsvps.mentions(event.id)
+            status = "has started. JOIN THE VC!"
+        else:  # the day reminder doesn't ping anyone
+            return
 
-        message = "(reminder) " + message
+        if len(mentions) == 0:
+            return
 
-        message += "\n\n(This message was sent silently)" if is_silent else ""
+        message = f"(reminder) {' '.join(mentions)} {event.name} on {global_utils.style_text(event.description, 'i')} {status}"
 
-        await channel.send(message, silent=is_silent)
+        global_utils.outbox.send(channel, message,
+                                 on_sent=global_utils.track_reminder_message)
 
     @tasks.loop(hours=1)
     async def clear_old_reminders(self) -> None:
         """[task] Clears old reminder messages from the premier and debug channels"""
-        channels = global_utils.prem_channel_id, global_utils.debug_channel_id
+        global_utils.sent_reminders.purge()
+        global_utils.status_boards.prune(
+            lambda g_id, event_id: global_utils.event_index.get(g_id, event_id) is not None)
+
+        now = datetime.now(pytz.utc).timestamp()
+        day = timedelta(days=1).total_seconds()
+        # bulk deletion only works for messages up to 14 days old (with some leeway for clock skew)
+        bulk_limit = timedelta(days=14).total_seconds() - 60 * 60
+
+        bulk = {}  # {channel_id: [message_id, ...]}
+        single = {}  # {channel_id: [message_id, ...]}, too old to bulk delete
+        for message_id, (channel_id, created) in list(global_utils.reminder_messages.items()):
+            age = now - created
+            if age < day:  # only delete reminders that are at least 1 day old
+                continue
+
+            (bulk if age < bulk_limit else single).setdefault(
+                channel_id, []).append(int(message_id))
 
-        for channel_id in channels:
+        for channel_id in set(bulk) | set(single):
             channel = self.bot.get_channel(channel_id)
-            discord.TextChannel.history
-            now = datetime.now().astimezone(pytz.utc)
-            before_time = now - timedelta(days=1)
-            # bulk deletion only works for messages up to 14 days old. If the bot is offline for over 14 days, oh well
-            after_time = now - timedelta(days=14)
-
-            messages = [message async for message in channel.history(limit=None, before=before_time, after=after_time) if message.author == self.bot.user
-                        # bot prefixes all reminder messages with this
-                        and message.content.startswith("(reminder)")
-                        and now - message.created_at > timedelta(days=1)]  # only delete reminders that are at least 1 day old
-
-            if len(messages) == 0:
+            if channel is None:  # channel is gone, so are the messages
+                for message_id in bulk.get(channel_id, []) + single.get(channel_id, []):
+                    global_utils.untrack_reminder_message(message_id)
                 continue
 
-            await channel.delete_messages(messages)
-            global_utils.log(
-                f"Deleted {len(messages)} old reminder messages from {channel.name}")
+            deleted = 0
+            message_ids = bulk.get(channel_id, [])
+
+            # bulk delete is capped at 100 messages per request
+            for i in range(0, len(message_ids), 100):
+                chunk = message_ids[i:i + 100]
+                try:
+                    await global_utils.rest.call("cleanup", f"message_delete:{channel.id}", channel.delete_messages,
+                                                 [channel.get_partial_message(m) for m in chunk])
+                except discord.HTTPException:  # e.g. one of them was already deleted, fall back to deleting them one by one
+                    single.setdefault(channel_id, []).extend(chunk)
+                    continue
+
+                for message_id in chunk:
+                    global_utils.untrack_reminder_message(message_id)
+                deleted += len(chunk)
+
+            for message_id in single.get(channel_id, []):
+                try:
+                    await global_utils.rest.call("cleanup", f"message_delete:{channel.id}",
+                                                 channel.get_partial_message(message_id).delete)
+                    deleted += 1
+                except discord.NotFound:
+                    pass
+                except discord.HTTPException:  # try again next time
+                    continue
+
+                global_utils.untrack_reminder_message(message_id)
+
+            if deleted > 0:
+                global_utils.log(
+                    f"Deleted {deleted} old reminder messages from {channel.name}")
 
-    @tasks.loop(count=1)
+    @tasks.loop(hours=1)
     async def syncreminders(self) -> None:
-        """[task] Resyncs reminder timers in case the bot went offline with reminders still in the queue"""
-        iterable = deepcopy(global_utils.reminders)
+        """[task] Arms the timers of the stored reminders that go off within the next window (reminders set with /remind are armed right away).
+        Missed reminders (e.g. from while the bot was offline) go off right away, in the order they were supposed to"""
+        horizon = (datetime.now() + self.reminder_horizon).isoformat()
 
-        for server in iterable.keys():
-            for time, message in iterable[server].items():
-                channel = self.bot.get_channel(
-                    global_utils.prem_channel_id) if server == str(global_utils.val_server_id) else self.bot.get_channel(global_utils.debug_channel_id)
+        for server, when, message in await global_utils.reminders_due_before(horizon):
+            # skip reminders that went off while the query ran
+            if when in global_utils.reminders.get(server, {}):
+                global_utils.schedule_reminder(
+                    server, when, message, store=False)
 
-                time_dt = datetime.fromisoformat(time)
+    async def deliver_reminder(self, server: str, when: str, message: str) -> None:
+        """[timer] Posts a reminder set with /remind once it goes off
 
-                if time_dt < datetime.now():
-                    await channel.send(message + "\n(bot was offline when this reminder was supposed to go off at " + global_utils.discord_local_time(time_dt) + ".")
-                    global_utils.log(
-                        "Bot missed a reminder during its downtime, but sent it now. Message: " + message)
-                    global_utils.reminders[server].pop(time)
-                else:
-                    await asyncio.sleep((time_dt - datetime.now()).total_seconds())
-                    await channel.send(message)
-                    global_utils.log("Posted reminder: " + message)
-                    global_utils.reminders[server].pop(time)
+        Parameters
+        ----------
+        server : str
+            The ID of the guild the reminder is for
+        when : str
+            The ISO formatted time that the reminder was supposed to go off
+        message : str
+            The reminder message
+        """
+        channel = self.bot.get_channel(
+            global_utils.prem_channel_id) if server == str(global_utils.val_server_id) else self.bot.get_channel(global_utils.debug_channel_id)
 
-            global_utils.save_reminders()
+        time_dt = datetime.fromisoformat(when)
+
+        # more than a minute late means the bot was offline when it should have gone off
+        if datetime.now() - time_dt > timedelta(minutes=1):
+            global_utils.outbox.send(channel, message + "\n(bot was offline when this reminder was supposed to go off at " + global_utils.discord_local_time(time_dt) + ".",
+                                     on_sent=global_utils.track_reminder_message)
+            global_utils.log(
+                "Bot missed a reminder during its downtime, but sent it now. Message: " + message)
+        else:
+            global_utils.outbox.send(channel, message,
+                                     on_sent=global_utils.track_reminder_message)
+            global_utils.log("Posted reminder: " + message)
+
+        global_utils.remove_reminder(server, when)
 
     # wait until a few seconds after midnight to start new log in case of some delay/desync issue
     @tasks.loop(time=global_utils.est_to_utc(time(hour=0, minute=0, second=5)))
@@ -256,19 +560,25 @@ class TasksCog(commands.Cog):
 
         if new_date != global_utils.log_date:
             global_utils.log("Starting new log file")
-            global_utils.log_date = new_date
-            global_utils.log_filepath = f"./logs/{global_utils.log_date}_stdout.log"
-            sys.stdout.close()
-            sys.stdout = open(global_utils.log_filepath, 'a')
+            global_utils.set_log_date(new_date)
 
-    @tasks.loop(minutes=5)
+    # the gateway listeners keep the index current, this only catches anything they missed (e.g. during a disconnect)
+    @tasks.loop(minutes=30)
     async def update_cache(self) -> None:
-        """[task] Updates the cache of the bot with whatever this function has been made to update (like scheduled_events)"""
+        """[task] Reconciles the premier event index (and the event timers) with the scheduled events fetched from Discord"""
         guild_ids = [global_utils.val_server_id, global_utils.debug_server_id]
 
         for g_id in guild_ids:
             guild = self.bot.get_guild(g_id)
-            guild.scheduled_events = await guild.fetch_scheduled_events()
+            if guild is None:
+                continue
+
+            events = await global_utils.rest.call("cleanup", f"event_list:{g_id}", guild.fetch_scheduled_events)
+            global_utils.event_index.rebuild(g_id, events)
+            global_utils.schedule_board.invalidate(g_id)
+            global_utils.lifecycle.rebuild(g_id)
+
+        self.schedule_all_premier_reminders()
 
 
 async def setup(bot: commands.bot) -> None:
@@ -2,6 +2,8 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
+from functools import partial
+
 from global_utils import global_utils
 
 
@@ -84,40 +86,55 @@ class VotingCommands(commands.Cog):
         else:
             output = f"You marked {map_display} with a preference of {preference_display}"
 
-        global_utils.map_preferences[map_name][uuid] = preference
-
-
-        global_utils.save_preferences()
+        # also updates the map's weight
+        global_utils.set_preference(map_name, uuid, preference)
 
         await interaction.response.send_message(output, ephemeral=True)
 
         global_utils.log(
             f'{interaction.user.name} marked {map_name.title()} with a preference of "{preference_decoder[preference]}"')
 
-    @app_commands.command(name="map-votes", description=global_utils.command_descriptions["map-votes"])
-    @app_commands.choices(
-        announce=[
-            discord.app_commands.Choice(name="Yes", value=1),
-        ]
-    )
-    @app_commands.describe(
-        announce="Show the output of the command to everyone when used in the premier channel"
-    )
-    async def mapvotes(self, interaction: discord.Interaction, announce: int = 0) -> None:
-        """[command] Displays each user's preferences for each map in the map pool
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member) -> None:
+        """[event] Drops the cached map votes of a guild when someone's roles change (they may have joined or left the premier team)
 
         Parameters
         ----------
-        interaction : discord.Interaction
-            The interaction object that initiated the command
-        announce : int, optional
-            Treated as a boolean. Announce the output when used in the premier channel, by default 0
+        before : discord.Member
+            The member before the update
+        after : discord.Member
+            The member after the update
         """
-        ephem = interaction.channel.id != global_utils.prem_channel_id or not announce
+        if before.roles != after.roles:
+            global_utils.renders.invalidate(f"roster:{after.guild.id}")
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member) -> None:
+        """[event] Drops the cached map votes of a guild when someone leaves it
+
+        Parameters
+        ----------
+        member : discord.Member
+            The member who left
+        """
+        global_utils.renders.invalidate(f"roster:{member.guild.id}")
+
+    def render_map_votes(self, guild: discord.Guild) -> str:
+        """Renders each premier team member's preferences for each map in the map pool
+
+        Parameters
+        ----------
+        guild : discord.Guild
+            The guild to get the premier team from
 
-        role_name = global_utils.prem_role_name if interaction.guild.id == global_utils.val_server_id else global_utils.debug_role_name
+        Returns
+        -------
+        str
+            The votes as a string to display in Discord
+        """
+        role_name = global_utils.prem_role_name if guild.id == global_utils.val_server_id else global_utils.debug_role_name
         premier_team = discord.utils.get(
-            interaction.guild.roles, name=role_name).members
+            guild.roles, name=role_name).members
 
         output = ""
 
@@ -145,6 +162,93 @@ class VotingCommands(commands.Cog):
         if output == "":
             output = "No votes for any maps in the map pool."
 
+        return output
+
+    def render_member_votes(self, member: discord.Member, votes: dict[str, str]) -> str:
+        """Renders one member's preferences for each map in the map pool
+
+        Parameters
+        ----------
+        member : discord.Member
+            The member
+        votes : dict[str, str]
+            The member's votes with the structure {map: preference}
+
+        Returns
+        -------
+        str
+            The votes as a string to display in Discord
+        """
+        like = global_utils.positive_preference
+        neutral = global_utils.neutral_preference
+        dislike = global_utils.negative_preference
+        preference_decoder = {like: "Like", neutral: "Neutral", dislike: "Dislike"}
+
+        output = ""
+        for map_name in global_utils.map_pool:
+            if map_name in votes:
+                output += f"- {global_utils.style_text(map_name.title(), 'i')}: {global_utils.style_text(preference_decoder[votes[map_name]], 'c')}\n"
+
+        if output == "":
+            return f"{member.mention} hasn't voted for any maps in the map pool."
+
+        return f"{member.mention}'s map votes:\n" + output
+
+    def render_map_weights(self) -> str:
+        """Renders the weights of each map in the map pool, highest first
+
+        Returns
+        -------
+        str
+            The weights as a string to display in Discord
+        """
+        output = ""
+
+        # the ledger keeps the weights ranked in descending order, no need to sort here
+        for map_name, weight in global_utils.weight_ledger.ranked():
+            if map_name not in global_utils.map_pool:
+                continue
+
+            output += f'{map_name.title()}: {weight}\n'
+
+        if output == "":
+            output = "No weights to show for maps in the map pool."
+
+        return output
+
+    @app_commands.command(name="map-votes", description=global_utils.command_descriptions["map-votes"])
+    @app_commands.choices(
+        announce=[
+            discord.app_commands.Choice(name="Yes", value=1),
+        ]
+    )
+    @app_commands.describe(
+        announce="Show the output of the command to everyone when used in the premier channel",
+        member="Only show this member's votes"
+    )
+    async def mapvotes(self, interaction: discord.Interaction, announce: int = 0, member: discord.Member = None) -> None:
+        """[command] Displays each user's preferences for each map in the map pool
+
+        Parameters
+        ----------
+        interaction : discord.Interaction
+            The interaction object that initiated the command
+        announce : int, optional
+            Treated as a boolean. Announce the output when used in the premier channel, by default 0
+        member : discord.Member, optional
+            Only show this member's preferences, by default None (every premier team member)
+        """
+        ephem = interaction.channel.id != global_utils.prem_channel_id or not announce
+
+        if member is not None:
+            output = self.render_member_votes(member, await global_utils.votes_for_user(member.id))
+            await interaction.response.send_message(output, ephemeral=ephem, silent=True)
+            return
+
+        # every role member is walked for every map, so only redo it after a vote, a map pool change or a roster change
+        output = global_utils.renders.get(("map-votes", interaction.guild.id), partial(self.render_map_votes, interaction.guild),
+                                          ["pool", "preferences", "weights", f"roster:{interaction.guild.id}"])
+
         await interaction.response.send_message(output, ephemeral=ephem, silent=True)
 
     @app_commands.command(name="map-weights", description=global_utils.command_descriptions["map-weights"])
@@ -168,19 +272,7 @@ class VotingCommands(commands.Cog):
         """
         ephem = interaction.channel.id != global_utils.prem_channel_id or not announce
 
-        output = ""
-
-        global_utils.map_weights = dict(sorted(global_utils.map_weights.items(
-        ), key=lambda item: item[1], reverse=True))  # sort the weights in descending order
-
-        for map_name in global_utils.map_weights.keys():
-            if map_name not in global_utils.map_pool:
-                continue
-
-            output += f'{map_name.title()}: {global_utils.map_weights[map_name]}\n'
-
-        if output == "":
-            output = "No weights to show for maps in the map pool."
+        output = global_utils.renders.get(("map-weights",), self.render_map_weights, ["pool", "weights"])
 
         await interaction.response.send_message(output, ephemeral=ephem)
 
@@ -1,14 +1,36 @@
 import os
-import sys
-import json
+import atexit
+import logging
 
 from datetime import datetime, time, timedelta
+from functools import partial
 import pytz
 
 # reduce bloat, only for type hints
-from discord import Interaction, Guild, ScheduledEvent
+from discord import Interaction, Guild, ScheduledEvent, Message
 from discord.ext import commands
 
+from utils.audio_cache import AudioCache
+from utils.batch_executor import BatchExecutor
+from utils.dedupe import DedupeIndex
+from utils.event_index import EventIndex
+from utils.event_jobs import EventJobQueue
+from utils.event_lifecycle import EventLifecycle
+from utils.journal import apply_change
+from utils.logger import LogWriter, QueueHandler
+from utils.outbox import Outbox
+from utils.prefetcher import Prefetcher
+from utils.render_cache import RenderCache
+from utils.rest_scheduler import RestScheduler
+from utils.rsvp_cache import RSVPCache
+from utils.storage import create_backend
+from utils.schedule_board import ScheduleBoard
+from utils.scheduler import TimerScheduler
+from utils.song_metadata import SongMetadataCache
+from utils.state_writer import StateWriter
+from utils.status_board import StatusBoard
+from utils.weight_ledger import WeightLedger
+
 
 class Utils:
     def __init__(self) -> None:
@@ -21,8 +43,12 @@ class Utils:
 
         self.source_code = "https://github.com/BizzyChills/bot/"
 
-        self.log_date = datetime.now().strftime("%Y-%m-%d")
-        self.log_filepath = f'./logs/{self.log_date}_stdout.log'
+        # "json" writes structured json lines instead of plain text
+        self.logger = LogWriter(
+            structured=os.getenv("BOT_LOG_FORMAT", "plain") == "json")
+        self.logger.set_destination("debug", "./local_storage/debug_log.txt")
+        self.set_log_date(datetime.now().strftime("%Y-%m-%d"))
+        atexit.register(self.logger.close)
 
         self.debug_server_id = 1217649405759324232
         self.debug_role_name = "southern"
@@ -40,36 +66,92 @@ class Utils:
 
         self.tz = pytz.timezone("US/Eastern")
 
-        right_now = (datetime.now().replace(
-            microsecond=0) + timedelta(seconds=5)).time()
-        self.premier_reminder_times = [  # add 2 seconds to each time to ensure time_remaining logic works
-            right_now,  # debug,
-            time(hour=19, second=2),  # 3 hours before for thur and sun
-            time(hour=20, second=2),  # 3 hours before for sat
-
-            # 30 mins before for thur and sun
-            time(hour=21, minute=30, second=2),
-
-            # right on time for thur and sun
-            time(hour=22, second=2),
-            time(hour=22, minute=30, second=2),  # 30 minutes before for sat
-
-            time(hour=23, second=2)  # right on time for sat
-        ]
-
-        self.premier_reminder_times = [self.est_to_utc(
-            t) for t in self.premier_reminder_times]
-
-        self.map_pool = self.get_pool()
-        self.map_preferences = self.get_preferences()
-        self.map_weights = self.get_weights()
-        self.reminders = self.get_reminders()
-        self.practice_notes = self.get_notes()
-
         self.positive_preference = "+"
         self.neutral_preference = "~"
         self.negative_preference = "-"
 
+        # "journal" (default) keeps these files behind an append-only journal. "sqlite" and "postgres" keep them in a database
+        self.storage = create_backend(os.getenv("BOT_STORAGE", "journal"), "./local_storage", {
+            "pool": "map_pool.txt",  # [map]
+            "preferences": "map_preferences.json",  # {map: {user_id: preference}}
+            "weights": "map_weights.json",  # {map: weight}
+            "reminders": "reminders.json",  # {guild_id: {reminder_time: reminder_message}}
+            "notes": "notes.json",  # {map: {note_message_id: note_description}}
+            "sent_reminders": "sent_reminders.json",  # {"event_id:reminder_type": expiry_timestamp}
+            "reminder_messages": "reminder_messages.json",  # {message_id: [channel_id, created_timestamp]}
+            "event_jobs": "event_jobs.json",  # {job_id: job}
+            "schedule_boards": "schedule_boards.json",  # {guild_id: {"channel_id": int, "message_id": int}}
+            "song_metadata": "song_metadata.json",  # {video_id: metadata}
+            "status_boards": "status_boards.json",  # {event_id: {"guild_id": int, "channel_id": int, "message_id": int, "stage": str}}
+        }, os.getenv("BOT_DATABASE_URL"))
+        self.state = self.storage.load()
+        # changes are written in the background, coalescing everything within this many seconds into one write
+        self.writer = StateWriter(self.storage, window=float(
+            os.getenv("BOT_WRITE_WINDOW", "2")))
+        # rendered command output, dropped whenever the state it was rendered from changes
+        self.renders = RenderCache()
+
+        # these are views into self.state. Never reassign them, use the mutators below (which journal the change)
+        self.map_pool = self.state["pool"]
+        self.map_preferences = self.state["preferences"]
+        self.map_weights = self.state["weights"]
+        self.reminders = self.state["reminders"]
+        self.practice_notes = self.state["notes"]
+        # every "(reminder)" message the bot has posted and not cleaned up yet
+        self.reminder_messages = self.state["reminder_messages"]
+
+        # which premier reminders have already been posted. Entries outlive the reminder windows, then expire
+        self.sent_reminders = DedupeIndex(self.state["sent_reminders"], partial(
+            self.record_change, "sent_reminders"), ttl=60 * 60 * 24 * 2)
+
+        # every bot-initiated discord API call goes through this, most urgent first (replies > reminders > schedule changes > cleanup)
+        self.rest = RestScheduler(workers=int(
+            os.getenv("BOT_REST_WORKERS", "4")), log=self.debug_log)
+
+        # every timed job (reminders, premier event timers, ...) runs off this one scheduler
+        self.scheduler = TimerScheduler(log=self.debug_log)
+
+        # premier scheduled events by kind, map and start time. kept current by the TasksCog's scheduled event listeners
+        self.event_index = EventIndex()
+        # starts and ends the indexed events on time
+        self.lifecycle = EventLifecycle(
+            self.scheduler, self.event_index, self.rest, log=self.log)
+        # bulk event changes run in the background (the rest scheduler paces event creations to discord's limit of 5 per minute)
+        self.event_jobs = EventJobQueue(self.state["event_jobs"], partial(
+            self.record_change, "event_jobs"), self.event_index, self.rest, log=self.log)
+        # the pinned schedule of each guild, edited once its events stop changing
+        self.schedule_board = ScheduleBoard(self.state["schedule_boards"], partial(
+            self.record_change, "schedule_boards"), self.rest, self.renders, self.event_jobs.active, log=self.debug_log)
+        # runs batches of event operations (like cancelling a map's events) a few at a time, backing off on 429s
+        self.batch = BatchExecutor(limit=int(os.getenv(
+            "BOT_BATCH_CONCURRENCY", "4")), log=self.debug_log)
+        # reminder messages go through this, so bursts in the same channel are merged into as few messages as possible
+        self.outbox = Outbox(self.rest, log=self.debug_log)
+
+        # who has RSVP'ed to each event. seeded once per event, then kept current by the TasksCog's RSVP listeners
+        self.rsvps = RSVPCache()
+        # one live message per premier event, edited as the event's reminders go off and as people RSVP
+        self.status_boards = StatusBoard(self.state["status_boards"], partial(
+            self.record_change, "status_boards"), self.rest, log=self.debug_log)
+
+        # yt-dlp metadata of every song played recently, so known songs don't need another extractor pass
+        self.song_metadata = SongMetadataCache(self.state["song_metadata"], partial(
+            self.record_change, "song_metadata"), ttl=60 * 60 * 24 * 7)
+        # downloaded songs, kept (least recently used evicted first) so replayed songs aren't downloaded again
+        self.audio_cache = AudioCache("./local_storage/temp_music", int(
+            os.getenv("BOT_AUDIO_CACHE_MB", "500")) * 1024 * 1024, log=self.debug_log)
+        # fetches the next few songs of every voice session while the current one plays
+        self.prefetcher = Prefetcher(workers=int(
+            os.getenv("BOT_PREFETCH_WORKERS", "2")), log=self.debug_log)
+
+        self.weight_ledger = WeightLedger(self.map_weights, {
+            self.positive_preference: 1,
+            self.neutral_preference: 0,
+            self.negative_preference: -1,
+        })
+        # weights are only ever updated incrementally, so make sure the stored ones actually match the votes
+        self.verify_weights()
+
         self.command_descriptions = {
             # help
             "commands": "Display all bot commands",
@@ -88,7 +170,7 @@ class Utils:
             # music
             "join-voice": "Join your voice channel",
             "leave-voice": "Leave your voice channel",
-            "add-song": "Add a song (or any video really) to the playlist via YouTube URL (can take a while!)",
+            "add-song": "Add a song (or any video really) to the playlist via YouTube URL",
             "play-song": "Begin/resume playback of current song (or next song if current is None)",
             "pause-song": "Pause playback of current song",
             # "resume-song": "Resume playback of current song", # deprecated, just use play-song
@@ -102,14 +184,15 @@ class Utils:
             "map-pool-admin": "Modify the map pool",
             "add-map": "Add a map to the list of all maps in the game",
             "remove-map": "Remove a map from the list of all maps in the game",
-            "add-events": "Add all premier events to the schedule",
+            "add-events": "Sync the premier events with a season plan (only the differences are applied)",
             "cancel-event": "Cancel a premier map for today/all days",
-            "add-practices": "Add all premier practices to the schedule (a map must still have a Thursday event to add practices)",
+            "add-practices": "Sync the premier practices with the premier events (a map must still have a Thursday event to add practices)",
             "cancel-practice": "Cancel a premier practice for today/all days",
             "clear-schedule": "Clear the schedule of all premier events AND practices",
             "add-note": "Add a reference/link to a practice note in the notes channel",
             "remove-note": "Remove a reference/link to practice note in the notes channel (this does not delete the note itself)",
             "remind": "Set a reminder for the premier role",
+            "reminders": "List, cancel, or reschedule the pending reminders",
             "pin": "Pin a message",
             "unpin": "Unpin a message",
             "delete-message": "Delete a message by ID",
@@ -127,130 +210,413 @@ class Utils:
             "trivia": "Play a game of trivia with the bot to earn a prize!",
         }
 
-    def get_pool(self) -> list[str]:
-        """Extracts the map pool from the map_pool.txt file
+    def record_change(self, table: str, op: str, path: list = [], value: any = None) -> None:
+        """Applies a change to the in-memory state, drops the cached renders tagged with the table and marks the change to be written by the background state writer
+
+        Parameters
+        ----------
+        table : str
+            The table to change (any table of self.storage: "pool", "preferences", "weights", "reminders", "notes", "sent_reminders", "reminder_messages", "event_jobs", "schedule_boards", "song_metadata", or "status_boards")
+        op : str
+            The change to make. Dict tables use "set", "delete", or "clear". The map pool uses "add", "remove", or "clear"
+        path : list, optional
+            The keys leading to the value to change, by default []
+        value : any, optional
+            The value to set/add/remove, by default None
+        """
+        change = {"table": table, "op": op, "path": list(path), "value": value}
+        apply_change(self.state, change)
+        self.renders.invalidate(table)
+        self.writer.mark(change)
+
+    async def open_storage(self) -> None:
+        """Opens the storage backend and writes any changes made before the bot's event loop was running
+        """
+        await self.storage.open()
+        await self.writer.flush()
+
+    async def flush_state(self) -> None:
+        """Immediately writes every pending state change (used before shutting down)
+        """
+        await self.writer.flush()
+        self.log(f"Flushed pending state changes. Writer stats: {self.writer.stats()}")
+        self.log(f"Outbox stats: {self.outbox.stats()}")
+        self.log(f"REST scheduler stats: {self.rest.stats()}")
+        self.log(f"Render cache stats: {self.renders.stats()}")
+        self.log(f"Audio cache stats: {self.audio_cache.stats()}")
+        self.log(f"Song metadata cache stats: {self.song_metadata.stats()}")
+        self.log(f"Prefetcher stats: {self.prefetcher.stats()}")
+
+    async def close_storage(self) -> None:
+        """Flushes any pending state changes and closes the storage backend
+        """
+        await self.writer.flush()
+        await self.storage.close()
+
+    def add_to_pool(self, map_name: str) -> None:
+        """Adds a map to the map pool
+
+        Parameters
+        ----------
+        map_name : str
+            The map to add
+        """
+        self.record_change("pool", "add", value=map_name)
+
+    def remove_from_pool(self, map_name: str) -> None:
+        """Removes a map from the map pool
+
+        Parameters
+        ----------
+        map_name : str
+            The map to remove
+        """
+        self.record_change("pool", "remove", value=map_name)
+
+    def clear_pool(self) -> None:
+        """Removes every map from the map pool
+        """
+        self.record_change("pool", "clear")
+
+    def add_map(self, map_name: str) -> None:
+        """Adds a map to the list of all maps in the game (with no votes and a weight of 0)
+
+        Parameters
+        ----------
+        map_name : str
+            The map to add
+        """
+        self.weight_ledger.track(map_name)
+        self.record_change("preferences", "set", [map_name], {})
+        self.record_change("weights", "set", [map_name], 0)
+
+    def remove_map(self, map_name: str) -> None:
+        """Removes a map from the game, along with its votes, weight, and map pool entry
+
+        Parameters
+        ----------
+        map_name : str
+            The map to remove
+        """
+        self.remove_from_pool(map_name)
+        self.weight_ledger.untrack(map_name)
+        self.record_change("preferences", "delete", [map_name])
+        self.record_change("weights", "delete", [map_name])
+
+    def set_preference(self, map_name: str, user_id: str, preference: str) -> None:
+        """Records a user's preference for a map and updates that map's weight
+
+        Parameters
+        ----------
+        map_name : str
+            The map the user voted on
+        user_id : str
+            The ID of the user
+        preference : str
+            The user's preference for the map (positive, neutral, or negative)
+        """
+        old_preference = self.map_preferences.get(map_name, {}).get(user_id)
+
+        # only apply the difference between the old and new vote instead of recounting every vote
+        weight = self.weight_ledger.apply_vote(map_name, old_preference, preference)
+
+        self.record_change("preferences", "set", [map_name, user_id], preference)
+        self.record_change("weights", "set", [map_name], weight)
+
+    def verify_weights(self, repair: bool = True) -> dict:
+        """Checks the incrementally maintained map weights against a full recompute from the votes
+
+        Parameters
+        ----------
+        repair : bool, optional
+            Overwrite any mismatched weights with the recomputed values, by default True
 
         Returns
         -------
-        list
-            A list of strings containing the maps in the current map pool
+        dict
+            Every mismatched map with the structure {map: (stored_weight, expected_weight)}. Empty if the weights are consistent
         """
-        with open("./local_storage/map_pool.txt", "r") as file:
-            return file.read().splitlines()
+        mismatches = self.weight_ledger.verify(self.map_preferences)
+
+        if mismatches:
+            self.log(f"Map weights did not match their votes: {mismatches}")
 
-    def save_pool(self) -> None:
-        """Saves any changes to the map pool during runtime to the map_pool.txt file
+        if repair:
+            for map_name, (stored, expected) in mismatches.items():
+                self.weight_ledger.rerank(map_name, stored, expected)
+                if expected is None:
+                    self.record_change("weights", "delete", [map_name])
+                else:
+                    self.record_change("weights", "set", [map_name], expected)
+
+        return mismatches
+
+    def add_reminder(self, guild_id: int | str, when: str, message: str) -> None:
+        """Stores a reminder so that it can be resynced if the bot goes offline
+
+        Parameters
+        ----------
+        guild_id : int | str
+            The ID of the guild the reminder is for
+        when : str
+            The ISO formatted time that the reminder goes off
+        message : str
+            The reminder message
         """
-        self.map_pool.sort()
-        with open("./local_storage/map_pool.txt", "w") as file:
-            file.write("\n".join(self.map_pool))
+        self.record_change("reminders", "set", [guild_id, when], message)
+
+    def remove_reminder(self, guild_id: int | str, when: str) -> None:
+        """Removes a stored reminder
 
-    def get_preferences(self) -> dict:
-        """Extracts the map preferences from the map_preferences.json file
+        Parameters
+        ----------
+        guild_id : int | str
+            The ID of the guild the reminder is for
+        when : str
+            The ISO formatted time that the reminder goes off
+        """
+        self.record_change("reminders", "delete", [guild_id, when])
+
+    def reminder_key(self, guild_id: int | str, when: str) -> str:
+        """Builds the scheduler key of a stored reminder
+
+        Parameters
+        ----------
+        guild_id : int | str
+            The ID of the guild the reminder is for
+        when : str
+            The ISO formatted time that the reminder goes off
 
         Returns
         -------
-        dict
-            A 2D dictionary containing with the following structure: {map: {user_id: weight}}
+        str
+            The scheduler key
         """
-        with open("./local_storage/map_preferences.json", "r") as file:
-            return json.load(file)
+        return f"reminder:{guild_id}:{when}"
 
-    def save_preferences(self) -> None:
-        """Saves any changes to the map preferences during runtime to the map_preferences.json file and also saves the map weights
+    def schedule_reminder(self, guild_id: int | str, when: str, message: str, store: bool = True) -> None:
+        """Stores a reminder and schedules it to be posted (by the "reminder" timer handler)
+
+        Parameters
+        ----------
+        guild_id : int | str
+            The ID of the guild the reminder is for
+        when : str
+            The ISO formatted (local) time that the reminder goes off
+        message : str
+            The reminder message
+        store : bool, optional
+            Store the reminder. Only False when resyncing already stored reminders, by default True
         """
-        self.map_preferences = {
-            k: self.map_preferences[k] for k in sorted(self.map_preferences)}
-        with open("./local_storage/map_preferences.json", "w") as file:
-            json.dump(self.map_preferences, file)
+        if store:
+            self.add_reminder(guild_id, when, message)
 
-        self.save_weights()
+        self.scheduler.schedule(self.reminder_key(guild_id, when), datetime.fromisoformat(
+            when), "reminder", str(guild_id), when, message)
 
-    def get_weights(self) -> dict:
-        """Extracts the map weights from the map_weights.json file
+    def cancel_reminder(self, guild_id: int | str, when: str) -> bool:
+        """Cancels a scheduled reminder and removes it from storage
+
+        Parameters
+        ----------
+        guild_id : int | str
+            The ID of the guild the reminder is for
+        when : str
+            The ISO formatted time that the reminder goes off
 
         Returns
         -------
-        dict
-            A dictionary containing the weights for each map in the current map pool
+        bool
+            Whether the reminder existed
         """
-        with open("./local_storage/map_weights.json", "r") as file:
-            return json.load(file)
+        existed = self.scheduler.cancel(self.reminder_key(guild_id, when))
+        existed = existed or when in self.reminders.get(str(guild_id), {})
+
+        self.remove_reminder(guild_id, when)
+        return existed
+
+    def reschedule_reminder(self, guild_id: int | str, when: str, new_when: str) -> bool:
+        """Moves a scheduled reminder to a new time
 
-    def save_weights(self) -> None:
-        """Saves any changes to the map weights during runtime to the map_weights.json file
+        Parameters
+        ----------
+        guild_id : int | str
+            The ID of the guild the reminder is for
+        when : str
+            The ISO formatted time that the reminder currently goes off
+        new_when : str
+            The ISO formatted time that the reminder should go off instead
+
+        Returns
+        -------
+        bool
+            Whether the reminder existed
         """
-        for map_name, user_weights in self.map_preferences.items():
-            self.map_weights[map_name] = sum(
-                [1 if user_weights.get(str(user_id)) == "+" else -1 if user_weights.get(str(user_id)) == "-" else 0 for user_id in user_weights])
+        message = self.reminders.get(str(guild_id), {}).get(when)
+        if message is None:
+            return False
 
-        self.map_weights = {k: self.map_weights[k]
-                            for k in sorted(self.map_weights)}
+        self.cancel_reminder(guild_id, when)
+        self.schedule_reminder(guild_id, new_when, message)
+        return True
 
-        with open("./local_storage/map_weights.json", "w") as file:
-            json.dump(self.map_weights, file)
+    async def list_reminders(self, guild_id: int | str) -> list[tuple[str, str]]:
+        """Lists the stored reminders of a guild, earliest first
 
-    def get_reminders(self) -> dict:
-        """Extracts the reminders from the reminders.json file
+        Parameters
+        ----------
+        guild_id : int | str
+            The ID of the guild
 
         Returns
         -------
-        dict
-            A 2D dictionary containing with the following structure: {guild_id: {reminder_time: reminder_message}}
+        list[tuple[str, str]]
+            The reminders with the structure [(reminder_time, reminder_message), ...]
         """
-        with open("./local_storage/reminders.json", "r") as file:
-            return json.load(file)
+        # the backend only sees changes once they are written
+        await self.writer.flush()
+        return await self.storage.reminders_for_guild(guild_id)
+
+    async def reminders_due_before(self, when: str) -> list[tuple[str, str, str]]:
+        """Lists every stored reminder that goes off before a given time, earliest first
+
+        Parameters
+        ----------
+        when : str
+            The ISO formatted cutoff time
 
-    def save_reminders(self) -> None:
-        """Saves any changes to the reminders during runtime to the reminders.json file
+        Returns
+        -------
+        list[tuple[str, str, str]]
+            The reminders with the structure [(guild_id, reminder_time, reminder_message), ...]
         """
-        with open("./local_storage/reminders.json", "w") as file:
-            json.dump(self.reminders, file)
+        await self.writer.flush()
+        return await self.storage.reminders_due_before(when)
+
+    async def votes_for_user(self, user_id: int | str) -> dict[str, str]:
+        """Gets every map vote a user has made
 
-    def get_notes(self) -> dict:
-        """Extracts the practice notes from the notes.json file. This file does not actually contain the notes, but rather the message IDs of the notes in the notes channel.
+        Parameters
+        ----------
+        user_id : int | str
+            The ID of the user
 
         Returns
         -------
-        dict
-            A 2D dictionary containing with the following structure: {map: {note_message_id: note_description}}
+        dict[str, str]
+            The votes with the structure {map: preference}
+        """
+        await self.writer.flush()
+        return await self.storage.votes_for_user(user_id)
+
+    async def notes_for_map(self, map_name: str) -> dict[str, str]:
+        """Gets every practice note reference for a map, oldest first
+
+        Parameters
+        ----------
+        map_name : str
+            The map to get the notes for
+
+        Returns
+        -------
+        dict[str, str]
+            The notes with the structure {note_message_id: note_description}
+        """
+        await self.writer.flush()
+        return await self.storage.notes_for_map(map_name)
+
+    def add_note(self, map_name: str, note_id: int | str, description: str) -> None:
+        """Stores a reference to a practice note in the notes channel
+
+        Parameters
+        ----------
+        map_name : str
+            The map the note is for
+        note_id : int | str
+            The message ID of the note
+        description : str
+            The description of the note
+        """
+        self.record_change("notes", "set", [map_name, note_id], description)
+
+    def remove_note(self, map_name: str, note_id: int | str) -> None:
+        """Removes a reference to a practice note (does not delete the note itself)
+
+        Parameters
+        ----------
+        map_name : str
+            The map the note is for
+        note_id : int | str
+            The message ID of the note
         """
-        with open("./local_storage/notes.json", "r") as file:
-            return json.load(file)
+        self.record_change("notes", "delete", [map_name, note_id])
+
+    def track_reminder_message(self, message: Message) -> None:
+        """Records a posted reminder message so it can be cleaned up later without searching the channel history
 
-    def save_notes(self) -> None:
-        """Saves any changes to the practice notes during runtime to the notes.json file
+        Parameters
+        ----------
+        message : discord.Message
+            The message that was sent
         """
-        with open("./local_storage/notes.json", "w") as file:
-            json.dump(self.notes, file)
+        self.record_change("reminder_messages", "set", [message.id], [
+                           message.channel.id, message.created_at.timestamp()])
+
+    def untrack_reminder_message(self, message_id: int | str) -> None:
+        """Forgets a reminder message (once it has been deleted)
+
+        Parameters
+        ----------
+        message_id : int | str
+            The ID of the message
+        """
+        self.record_change("reminder_messages", "delete", [message_id])
 
     def log(self, message: str) -> None:
-        """Logs a message to the current stdout log file
+        """Logs a message to the current stdout log file (queued, the log writer thread does the actual write)
 
         Parameters
         ----------
         message : str
             The message to log
         """
-        with open(self.log_filepath, 'a+') as file:
-            if ("connected to Discord" in message):
-                prefix = "\n" if file.readline() != "" else ""
-                file.write(f"{prefix}{'-' * 50}\n")
-
-            file.write(
-                f'[{datetime.now().strftime("%Y-%m-%d %H:%M:%S")}] {message}\n')
+        self.logger.write("stdout", message,
+                          separator="connected to Discord" in message)
 
     def debug_log(self, message: str) -> None:
-        """Logs a message to the debug log file
+        """Logs a message to the debug log file (queued, the log writer thread does the actual write)
 
         Parameters
         ----------
         message : str
             The debug message to log
         """
-        with open("./local_storage/debug_log.txt", 'a') as file:
-            file.write(
-                f'[{datetime.now().strftime("%Y-%m-%d %H:%M:%S")}] {message}\n')
+        self.logger.write("debug", message, level="debug")
+
+    def set_log_date(self, log_date: str) -> None:
+        """Points the stdout and stderr logs at the files for a given date
+
+        Parameters
+        ----------
+        log_date : str
+            The date of the log files (YYYY-MM-DD)
+        """
+        self.log_date = log_date
+        self.log_filepath = f'./logs/{self.log_date}_stdout.log'
+
+        self.logger.set_destination("stdout", self.log_filepath)
+        self.logger.set_destination(
+            "stderr", f'./logs/{self.log_date}_stderr.log')
+
+    def capture_logging(self) -> None:
+        """Routes library logs (discord.py, asyncio, uncaught task errors, ...) to the stderr log instead of the terminal
+        """
+        root = logging.getLogger()
+        if any(isinstance(h, QueueHandler) for h in root.handlers):
+            return
+
+        root.addHandler(QueueHandler(self.logger, "stderr"))
+        root.setLevel(logging.INFO)
 
     def est_to_utc(self, t: time) -> time:
         """Converts an EST time to a UTC time
@@ -344,27 +710,6 @@ class Utils:
                 except commands.ExtensionNotLoaded:  # otherwise
                     await bot.load_extension(f)  # load them
 
-    def already_logged(self, log_message: str) -> bool:
-        """Checks if a log message has already been logged in the current stdout log file
-
-        Parameters
-        ----------
-        log_message : str
-            The message to check for in the log file
-
-        Returns
-        -------
-        bool
-            Whether the message has already been logged
-        """
-        if log_message == "":
-            return False
-
-        with open(self.log_filepath, "r") as file:
-            log_contents = file.read()
-
-        return log_message in log_contents if log_contents != "" else False
-
     async def is_admin(self, ctx: commands.Context | Interaction, respond: bool = True) -> bool:
         """Determines if the user is either Sam or Bizzy for use in admin commands
 
@@ -0,0 +1,206 @@
+import os
+import threading
+
+from collections import OrderedDict
+
+
+class AudioCache:
+    def __init__(self, root: str, budget: int, log: callable = print) -> None:
+        """Initializes the on-disk cache of downloaded songs, keyed by video ID and format (so a song is only ever downloaded once while it stays cached).
+
+        The cache is kept under a byte budget by evicting the least recently used songs first.
+        Songs that are queued or playing are pinned (reference counted) when they are looked up or inserted, and never evicted
+
+        Parameters
+        ----------
+        root : str
+            The directory the songs are kept in, as <video_id>.<format>
+        budget : int
+            The most bytes the cached songs can take up (can be exceeded while every cached song is in use)
+        log : callable, optional
+            Logs evictions, by default print
+        """
+        self.root = root
+        self.budget = budget
+        self.log = log
+
+        self.sizes = OrderedDict()  # {key: bytes}, least recently used first
+        self.refs = {}  # {key: count}
+        self.total = 0
+        # songs finish playing on the voice thread, so guard every change
+        self.lock = threading.Lock()
+
+        # stats
+        self.hits = 0
+        self.misses = 0
+        self.bytes_served = 0
+        self.evicted = 0
+
+    def key(self, video_id: str, fmt: str) -> str:
+        """Builds the cache key (and file name) of a song
+
+        Parameters
+        ----------
+        video_id : str
+            The video ID of the song
+        fmt : str
+            The audio format (file extension)
+
+        Returns
+        -------
+        str
+            The cache key
+        """
+        return f"{video_id}.{fmt}"
+
+    def path(self, key: str) -> str:
+        """Gets the file path of a cached song
+
+        Parameters
+        ----------
+        key : str
+            The cache key
+
+        Returns
+        -------
+        str
+            The file path
+        """
+        return f"{self.root}/{key}"
+
+    def scan(self) -> None:
+        """Indexes the songs already on disk (e.g. from before a restart), oldest access first, then evicts down to the budget
+        """
+        os.makedirs(self.root, exist_ok=True)
+
+        found = []
+        for name in os.listdir(self.root):
+            path = self.path(name)
+            if os.path.isfile(path):
+                stat = os.stat(path)
+                found.append((stat.st_atime, name, stat.st_size))
+
+        with self.lock:
+            self.sizes.clear()
+            self.total = 0
+            for _, name, size in sorted(found):
+                self.sizes[name] = size
+                self.total += size
+
+            self.evict()
+
+    def lookup(self, video_id: str, fmt: str) -> str | None:
+        """Gets the path of a cached song, marking it as recently used and pinning it (release it once it's done playing)
+
+        Parameters
+        ----------
+        video_id : str
+            The video ID of the song
+        fmt : str
+            The audio format
+
+        Returns
+        -------
+        str | None
+            The file path (already pinned), or None if the song isn't cached
+        """
+        key = self.key(video_id, fmt)
+
+        with self.lock:
+            if key not in self.sizes or not os.path.exists(self.path(key)):
+                self.misses += 1
+                return None
+
+            self.sizes.move_to_end(key)
+            self.refs[key] = self.refs.get(key, 0) + 1
+            self.hits += 1
+            self.bytes_served += self.sizes[key]
+
+        return self.path(key)
+
+    def insert(self, video_id: str, fmt: str, filepath: str) -> str:
+        """Moves a freshly downloaded song into the cache and pins it (release it once it's done playing)
+
+        Parameters
+        ----------
+        video_id : str
+            The video ID of the song
+        fmt : str
+            The audio format
+        filepath : str
+            Where the song was downloaded to
+
+        Returns
+        -------
+        str
+            The song's path in the cache (already pinned)
+        """
+        key = self.key(video_id, fmt)
+        os.replace(filepath, self.path(key))
+        size = os.path.getsize(self.path(key))
+
+        with self.lock:
+            self.total += size - self.sizes.pop(key, 0)
+            self.sizes[key] = size
+            # pin before evicting, so the new song is never the one evicted
+            self.refs[key] = self.refs.get(key, 0) + 1
+            self.evict()
+
+        return self.path(key)
+
+    def release(self, filepath: str) -> None:
+        """Unpins a cached song once it is done playing (or removed from the queue), evicting songs if the cache is over budget
+
+        Parameters
+        ----------
+        filepath : str
+            The path of the song
+        """
+        key = os.path.basename(filepath)
+
+        with self.lock:
+            if key not in self.refs:
+                return
+
+            self.refs[key] -= 1
+            if self.refs[key] <= 0:
+                del self.refs[key]
+
+            self.evict()
+
+    def evict(self) -> None:
+        """Deletes the least recently used songs that aren't in use until the cache is within its budget. Must hold the lock
+        """
+        for key in list(self.sizes):
+            if self.total <= self.budget:
+                return
+            if self.refs.get(key, 0) > 0:
+                continue
+
+            try:
+                os.remove(self.path(key))
+            except FileNotFoundError:
+                pass
+
+            self.total -= self.sizes.pop(key)
+            self.evicted += 1
+            self.log(f"Evicted {key} from the audio cache")
+
+    def stats(self) -> dict:
+        """Gets the cache's stats
+
+        Returns
+        -------
+        dict
+            The stats: cached songs and bytes, songs in use, hits, misses, bytes served from the cache and songs evicted
+        """
+        return {
+            "songs": len(self.sizes),
+            "bytes": self.total,
+            "budget": self.budget,
+            "in_use": len(self.refs),
+            "hits": self.hits,
+            "misses": self.misses,
+            "bytes_served": self.bytes_served,
+            "evicted": self.evicted,
+        }
@@ -0,0 +1,452 @@
+import asyncio
+import os
+import shutil
+
+from datetime import datetime
+
+import discord
+import yt_dlp
+
+from utils.audio_cache import AudioCache
+from utils.prefetcher import Prefetcher
+from utils.song_metadata import SongMetadataCache
+
+
+class GuildAudioSession:
+    def __init__(self, guild_id: int, vc: discord.VoiceClient, owner: discord.Member, temp_dir: str, metadata: SongMetadataCache, cache: AudioCache, prefetcher: Prefetcher, mode: str = "stream") -> None:
+        """Initializes a guild's voice session: its voice client, owner, playlist, loop flag, activity clock and downloaded songs.
+
+        Every guild gets its own session, so several guilds can play music at once without sharing any state
+
+        Parameters
+        ----------
+        guild_id : int
+            The ID of the guild
+        vc : discord.VoiceClient
+            The connected voice client
+        owner : discord.Member
+            The member who added the bot to the voice channel (the only one who can control it)
+        temp_dir : str
+            The directory to download the session's songs to before they are moved into the audio cache (deleted when the session closes)
+        metadata : SongMetadataCache
+            The cache of song metadata (and stream URLs) shared by every session
+        cache : AudioCache
+            The cache of downloaded songs shared by every session
+        prefetcher : Prefetcher
+            Fetches the session's upcoming songs in the background
+        mode : str, optional
+            "stream" pipes each song's audio stream straight into FFmpeg/Opus, "download" downloads and transcodes each song to an mp3 first, by default "stream"
+        """
+        self.guild_id = guild_id
+        self.vc = vc
+        self.owner = owner
+        self.temp_dir = temp_dir
+        os.makedirs(self.temp_dir, exist_ok=True)
+        self.metadata = metadata
+        self.cache = cache
+        self.prefetcher = prefetcher
+        self.mode = mode
+        # songs finish playing on the voice thread, which has to hop back onto the loop to wake the prefetcher
+        self.loop = asyncio.get_running_loop()
+
+        self.last_activity = datetime.now()
+        # need to hold the current song since it's removed from the playlist when played. used for looping
+        self.current_song = None
+        self.loop_song = False
+        # holds the actual playlist in the form [{"url": str, "info": (title, author), "source": str, "status": str, "task": asyncio.Task, "on_failed": callable}, ...].
+        # the source is a stream URL or an audio file path, and is only set once the prefetcher has fetched the song
+        self.playlist = []
+        # the next song was supposed to play but hadn't been fetched yet, so it plays as soon as it is
+        self.waiting = False
+        # urls of songs that failed to fetch since the playlist was last shown
+        self.failed = []
+        # running failure notices. Holding them keeps the loop from garbage collecting them mid-run
+        self.notices = set()
+
+        self.prefetcher.register(self)
+
+    def update_activity(self, error: Exception = None) -> None:
+        """Updates the last activity time of the session to prevent inactivity timeout
+
+        Parameters
+        ----------
+        error : Exception
+            The error that occurred, if any
+        """
+        self.last_activity = datetime.now()
+
+    def idle_seconds(self) -> int:
+        """Gets how long the session has been inactive
+
+        Returns
+        -------
+        int
+            The number of seconds since the last activity
+        """
+        return (datetime.now() - self.last_activity).seconds
+
+    def is_busy(self) -> bool:
+        """Checks if the session is fetching a song or waiting for one to play (so it shouldn't time out)
+
+        Returns
+        -------
+        bool
+            Whether the session is busy
+        """
+        return self.waiting or any(entry["status"] == "fetching" for entry in self.playlist)
+
+    def has_url(self, url: str) -> bool:
+        """Checks if a song is already in the playlist
+
+        Parameters
+        ----------
+        url : str
+            The URL the song was added with
+
+        Returns
+        -------
+        bool
+            Whether the song is queued
+        """
+        return any(entry["url"] == url for entry in self.playlist)
+
+    def prefetch(self) -> None:
+        """Wakes the prefetcher up after the playlist changed (safe to call from the voice thread)
+        """
+        self.loop.call_soon_threadsafe(self.prefetcher.notify)
+
+    async def fetch_song(self, url: str) -> tuple[str, str, str]:
+        """Gets a song ready to play: resolves its audio stream in stream mode, otherwise downloads it.
+        Falls back to downloading if the song has no direct audio stream. Known songs skip the extractor entirely while their cached file (or stream URL) is still good,
+        and a cached file is never downloaded again (if its metadata expired, only the metadata is re-extracted)
+
+        Parameters
+        ----------
+        url : str
+            The YouTube URL of the song
+
+        Returns
+        -------
+        tuple[str, str, str]
+            The title, author and source (stream URL or audio file path) of the song. Audio files come back pinned in the audio cache
+        """
+        video_id = self.metadata.video_id(url)
+        cached = self.metadata.get(video_id)
+        loop = asyncio.get_running_loop()
+
+        # a song that's already on disk plays from there, whatever the mode (even if its metadata expired)
+        filepath = self.cache.lookup(video_id, "mp3") if video_id is not None else None
+        if filepath is not None:
+            if cached is None:
+                # only the title and uploader are missing, so rebuild them without downloading anything
+                try:
+                    cached = self.metadata.put(await loop.run_in_executor(None, self.resolve_stream, url))
+                except BaseException:  # including the fetch being cancelled, the file was pinned by the lookup
+                    self.cache.release(filepath)
+                    raise
+
+            return cached["title"], cached["uploader"], filepath
+
+        if self.mode == "stream":
+            stream_url = self.metadata.stream_url(video_id)
+            if cached is not None and stream_url is not None:
+                return cached["title"], cached["uploader"], stream_url
+
+            # the extractor is blocking, so run it in a separate thread
+            entry = self.metadata.put(await loop.run_in_executor(None, self.resolve_stream, url))
+            if entry["stream_url"] is not None:
+                return entry["title"], entry["uploader"], entry["stream_url"]
+
+        entry = self.metadata.put(await loop.run_in_executor(None, self.download_song, url))
+        filepath = self.cache.insert(entry["id"], "mp3", self.audio_filepath(entry["id"]))
+        return entry["title"], entry["uploader"], filepath
+
+    def resolve_stream(self, url: str) -> dict:
+        """Resolves a song's best audio-only stream, without downloading anything
+
+        Parameters
+        ----------
+        url : str
+            The YouTube URL of the song
+
+        Returns
+        -------
+        dict
+            The song's info from yt-dlp (its "url" is the stream URL)
+        """
+        ydl_opts = {
+            'format': 'bestaudio/best',
+            'noplaylist': 'True',
+        }
+
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=False)
+
+        self.update_activity()
+        return info
+
+    def is_stream(self, source: str) -> bool:
+        """Checks if a song's source is a stream URL (instead of a downloaded file)
+
+        Parameters
+        ----------
+        source : str
+            The source of the song
+
+        Returns
+        -------
+        bool
+            Whether the source is a stream URL
+        """
+        return source.startswith(("http://", "https://"))
+
+    def make_audio(self, source: str) -> discord.AudioSource:
+        """Builds the audio source that plays a song. Streams are piped straight into FFmpeg and encoded to Opus (reconnecting if the stream drops)
+
+        Parameters
+        ----------
+        source : str
+            The stream URL or audio file path of the song
+
+        Returns
+        -------
+        discord.AudioSource
+            The audio source
+        """
+        if self.is_stream(source):
+            return discord.FFmpegOpusAudio(source, before_options="-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5",
+                                           options="-vn", stderr=open("./local_storage/debug_log.txt", "w"))
+
+        return discord.FFmpegPCMAudio(source=source, stderr=open(
+            "./local_storage/debug_log.txt", "w"))
+
+    def download_song(self, url: str) -> dict:
+        """Downloads a song from a YouTube URL into the session's directory, resolving and fetching it in a single extractor pass
+
+        Parameters
+        ----------
+        url : str
+            The YouTube URL of the song to download
+
+        Returns
+        -------
+        dict
+            The song's info from yt-dlp
+        """
+        ydl_opts = {
+            'format': 'mp3/bestaudio/best',
+            'postprocessors': [{
+                'key': 'FFmpegExtractAudio',
+                'preferredcodec': 'mp3',
+                # 'preferredquality': '192',
+            }],
+            'outtmpl': f'{self.temp_dir}/%(id)s.%(ext)s',
+            'noplaylist': 'True',
+        }
+
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            # extract_info downloads by default, no need for a separate ydl.download
+            info = ydl.extract_info(url, download=True)
+
+        self.update_activity()
+        return info
+
+    def audio_filepath(self, video_id: str) -> str:
+        """Gets the path a song is downloaded to (before it is moved into the audio cache)
+
+        Parameters
+        ----------
+        video_id : str
+            The ID of the song's video
+
+        Returns
+        -------
+        str
+            The file path
+        """
+        return f"{self.temp_dir}/{video_id}.mp3"
+
+    def add_song(self, url: str, bump: bool = False, on_failed: callable = None) -> dict:
+        """Queues a song. It is fetched in the background, so this returns right away
+
+        Parameters
+        ----------
+        url : str
+            The URL of the song
+        bump : bool, optional
+            Add the song to the start of the playlist, by default False
+        on_failed : callable, optional
+            Awaited with the error if the song fails to fetch (it is removed from the playlist), by default None
+
+        Returns
+        -------
+        dict
+            The playlist entry
+        """
+        entry = {"url": url, "info": (url, "loading..."), "source": None, "status": "queued", "task": None, "on_failed": on_failed}
+
+        if bump:
+            self.playlist.insert(0, entry)
+        else:
+            self.playlist.append(entry)
+
+        self.prefetch()
+        return entry
+
+    def on_fetched(self, entry: dict, result: tuple[str, str, str] = None, error: Exception = None) -> None:
+        """Called by the prefetcher once a song is fetched (or failed to be). Plays the song right away if playback was waiting for it
+
+        Parameters
+        ----------
+        entry : dict
+            The playlist entry
+        result : tuple[str, str, str], optional
+            The title, author and source of the song, by default None
+        error : Exception, optional
+            Why the fetch failed, by default None
+        """
+        entry["task"] = None
+
+        if entry not in self.playlist:  # removed while it was being fetched
+            if result is not None:
+                self.cache.release(result[2])
+            return
+
+        if error is not None:
+            entry["status"] = "failed"
+            self.playlist.remove(entry)
+            self.failed.append(entry["url"])
+
+            if entry["on_failed"] is not None:
+                notice = self.loop.create_task(entry["on_failed"](error))
+                self.notices.add(notice)
+                notice.add_done_callback(self.notices.discard)
+        else:
+            title, author, source = result
+            entry["info"] = (title, author)
+            entry["source"] = source
+            entry["status"] = "ready"
+
+        self.prefetch()
+
+        if self.waiting and not self.vc.is_playing() and not self.vc.is_paused():
+            self.play_next_song()
+
+    def drop(self, entry: dict) -> None:
+        """Removes a song from the playlist, cancelling its fetch (or unpinning it in the audio cache if it was already fetched)
+
+        Parameters
+        ----------
+        entry : dict
+            The playlist entry
+        """
+        if entry in self.playlist:
+            self.playlist.remove(entry)
+
+        if entry["task"] is not None and not entry["task"].done():
+            entry["task"].cancel()
+        if entry["status"] == "ready":
+            self.cache.release(entry["source"])
+
+        entry["status"] = "cancelled"
+        self.prefetch()
+
+    def skip_waiting(self) -> bool:
+        """Drops the song that playback is waiting on (it is skipped before it was even fetched)
+
+        Returns
+        -------
+        bool
+            Whether a song was dropped
+        """
+        if not self.waiting or len(self.playlist) == 0:
+            return False
+
+        self.waiting = False
+        self.drop(self.playlist[0])
+        return True
+
+    def play_next_song(self, error: Exception = None) -> tuple[str, str]:
+        """Plays the next song in the playlist if there is one. If the next song hasn't been fetched yet, it plays as soon as it is
+
+        Parameters
+        ----------
+        error : Exception
+            The error that occurred while playing audio, if any
+
+        Returns
+        -------
+        tuple[str, str]
+            The playlist info of the song that was played (or is about to be)
+        """
+        # shouldn't be neccessary, since timeout checks for is_playing, but just in case
+        self.update_activity(error)
+        if self.current_song is not None:
+            source = self.current_song["source"]
+            audio = self.current_song["audio"]
+            audio.cleanup()
+
+            if self.loop_song:
+                if not self.vc.is_playing() and not self.vc.is_paused():
+                    info = self.current_song["info"]
+
+                    audio = self.make_audio(source)
+                    self.current_song["audio"] = audio
+
+                    self.vc.play(audio, after=self.play_next_song)
+
+                    return info
+            else:
+                # the file stays cached for the next time the song is added
+                self.cache.release(source)
+
+                self.current_song = None
+
+        if len(self.playlist) == 0:
+            self.waiting = False
+            return None, None
+
+        entry = self.playlist[0]
+        if entry["status"] != "ready":
+            self.waiting = True
+            self.prefetch()
+            return entry["info"]
+
+        self.waiting = False
+        self.playlist.pop(0)
+        audio = self.make_audio(entry["source"])
+
+        self.current_song = {"info": entry["info"], "audio": audio,
+                             "source": entry["source"]}
+
+        self.vc.play(audio, after=self.play_next_song)
+        # the song after this one may not be within the lookahead yet
+        self.prefetch()
+
+        return entry["info"]
+
+    async def close(self) -> None:
+        """Disconnects from the voice channel, stops playback, cancels the session's fetches, unpins its songs in the audio cache and deletes its download directory
+        """
+        # empty the playlist and forget the current song first, so the player's after callback (which runs when disconnecting) has nothing left to play or release
+        self.loop_song = False
+        self.waiting = False
+        self.prefetcher.unregister(self)
+        for entry in list(self.playlist):
+            self.drop(entry)
+
+        current_song = self.current_song
+        self.current_song = None
+
+        if self.vc is not None:
+            await self.vc.disconnect()
+
+        if current_song is not None:
+            current_song["audio"].cleanup()
+            self.cache.release(current_song["source"])
+
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, shutil.rmtree, self.temp_dir, True)
+
+        self.vc = None
+        self.owner = None
@@ -0,0 +1,109 @@
+import asyncio
+
+from discord import HTTPException
+
+
+class BatchExecutor:
+    def __init__(self, limit: int = 4, max_limit: int = 8, retries: int = 3, log: callable = print) -> None:
+        """Initializes the executor that runs a batch of API operations (like cancelling every event of a season) concurrently.
+
+        The concurrency limit adapts to rate limits: every success raises it a little (up to max_limit), every 429 halves it (down to 1) and the operation is retried after the server's Retry-After
+
+        Parameters
+        ----------
+        limit : int, optional
+            The starting number of operations allowed to run at once, by default 4
+        max_limit : int, optional
+            The most operations allowed to run at once, by default 8
+        retries : int, optional
+            How many times an operation is retried after a 429, by default 3
+        log : callable, optional
+            Logs limit changes, by default print
+        """
+        self.limit = float(limit)
+        self.max_limit = max(max_limit, limit)
+        self.retries = retries
+        self.log = log
+
+        self.active = 0
+        self.condition = None
+
+    async def acquire(self) -> None:
+        """Waits until another operation is allowed to run
+        """
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.active < int(self.limit))
+            self.active += 1
+
+    async def release(self) -> None:
+        """Frees an operation's slot
+        """
+        async with self.condition:
+            self.active -= 1
+            self.condition.notify_all()
+
+    def grow(self) -> None:
+        """Raises the limit by a fraction of a slot (so it grows by about one slot per limit's worth of successes)
+        """
+        self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def shrink(self) -> None:
+        """Halves the limit after a 429
+        """
+        self.limit = max(1.0, self.limit / 2)
+        self.log(f"Rate limited, running at most {int(self.limit)} operations at once")
+
+    async def run(self, items: list[any], operation: callable) -> list[dict]:
+        """Runs an operation on every item
+
+        Parameters
+        ----------
+        items : list[any]
+            The items to run the operation on (like events)
+        operation : callable
+            The coroutine function to run on each item. Whatever it returns is reported as the item's result
+
+        Returns
+        -------
+        list[dict]
+            The results in the order of the items, with the structure [{"item": any, "ok": bool, "result": any, "error": str}, ...]
+        """
+        if self.condition is None:
+            self.condition = asyncio.Condition()
+
+        return list(await asyncio.gather(*[self.run_one(item, operation) for item in items]))
+
+    async def run_one(self, item: any, operation: callable) -> dict:
+        """Runs an operation on an item, retrying it after 429s
+
+        Parameters
+        ----------
+        item : any
+            The item to run the operation on
+        operation : callable
+            The coroutine function to run
+
+        Returns
+        -------
+        dict
+            The result, with the structure {"item": any, "ok": bool, "result": any, "error": str}
+        """
+        for attempt in range(self.retries + 1):
+            await self.acquire()
+            try:
+                result = await operation(item)
+            except HTTPException as e:
+                if e.status != 429 or attempt == self.retries:
+                    return {"item": item, "ok": False, "result": None, "error": f"{e.status} {e.text}"}
+
+                self.shrink()
+                retry_after = float(e.response.headers.get("Retry-After", 1))
+            except Exception as e:
+                return {"item": item, "ok": False, "result": None, "error": repr(e)}
+            else:
+                self.grow()
+                return {"item": item, "ok": True, "result": result, "error": ""}
+            finally:
+                await self.release()
+
+            await asyncio.sleep(retry_after)
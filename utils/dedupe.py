@@ -0,0 +1,87 @@
+from time import time as now
+
+
+class DedupeIndex:
+    def __init__(self, entries: dict[str, float], record: callable, ttl: float) -> None:
+        """Initializes a persistent index of things that have already been done (like posting a reminder), keyed by (id, kind).
+
+        Each entry expires after a TTL, so the index only ever holds recent entries and checks are a single dict lookup
+
+        Parameters
+        ----------
+        entries : dict[str, float]
+            The live table backing the index, with the structure {"id:kind": expiry_timestamp}
+        record : callable
+            Persists a change to the table. Called as record(op, path, value)
+        ttl : float
+            The default number of seconds an entry is kept for
+        """
+        self.entries = entries
+        self.record = record
+        self.ttl = ttl
+
+    def key(self, item_id: int | str, kind: str) -> str:
+        """Builds the index key for an item
+
+        Parameters
+        ----------
+        item_id : int | str
+            The ID of the item (like an event ID)
+        kind : str
+            The kind of action (like a reminder type)
+
+        Returns
+        -------
+        str
+            The index key
+        """
+        return f"{item_id}:{kind}"
+
+    def seen(self, item_id: int | str, kind: str) -> bool:
+        """Checks if an item has already been marked (and hasn't expired)
+
+        Parameters
+        ----------
+        item_id : int | str
+            The ID of the item
+        kind : str
+            The kind of action
+
+        Returns
+        -------
+        bool
+            Whether the item is in the index
+        """
+        expires = self.entries.get(self.key(item_id, kind))
+        return expires is not None and expires > now()
+
+    def mark(self, item_id: int | str, kind: str, ttl: float = None) -> None:
+        """Adds an item to the index
+
+        Parameters
+        ----------
+        item_id : int | str
+            The ID of the item
+        kind : str
+            The kind of action
+        ttl : float, optional
+            The number of seconds to keep the entry for, by default the index's TTL
+        """
+        self.record("set", [self.key(item_id, kind)],
+                    now() + (ttl if ttl is not None else self.ttl))
+
+    def purge(self) -> int:
+        """Removes every expired entry
+
+        Returns
+        -------
+        int
+            The number of entries removed
+        """
+        expired = [k for k, expires in self.entries.items()
+                   if expires <= now()]
+
+        for key in expired:
+            self.record("delete", [key])
+
+        return len(expired)
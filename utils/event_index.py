@@ -0,0 +1,169 @@
+from bisect import bisect_left, insort
+from datetime import datetime
+
+from discord import ScheduledEvent, EventStatus
+
+
+class EventIndex:
+    def __init__(self) -> None:
+        """Initializes the in-memory index of premier scheduled events, per guild.
+
+        Events are bucketed by (kind, map), (kind, any map) and (any kind, any map), and each bucket is a list sorted by start time,
+        so lookups like "next Bind practice" are a bisect instead of a scan over every event in the guild.
+        The index is kept current by the scheduled event gateway listeners
+        """
+        self.kinds = ["event", "practice", "playoffs"]
+
+        self.buckets = {}  # {guild_id: {(kind, map): [(start_timestamp, event_id), ...]}}
+        self.entries = {}  # {guild_id: {event_id: (event, (start_timestamp, event_id), keys)}}
+
+    def kind_of(self, event: ScheduledEvent) -> str | None:
+        """Gets the kind of a premier event from its name
+
+        Parameters
+        ----------
+        event : discord.ScheduledEvent
+            The event to classify
+
+        Returns
+        -------
+        str | None
+            "event", "practice" or "playoffs", or None if the event isn't a premier event
+        """
+        name = event.name.lower()
+
+        if "premier" not in name:
+            return None
+        if "practice" in name:
+            return "practice"
+        if "playoffs" in name:
+            return "playoffs"
+        return "event"
+
+    def add(self, event: ScheduledEvent) -> None:
+        """Adds (or updates) an event in the index. Events that aren't premier events, or that are over, are removed instead
+
+        Parameters
+        ----------
+        event : discord.ScheduledEvent
+            The event to add
+        """
+        self.remove(event.guild.id, event.id)
+
+        kind = self.kind_of(event)
+        if kind is None or event.status not in [EventStatus.scheduled, EventStatus.active]:
+            return
+
+        map_name = (event.description or "").lower()
+        entry = (event.start_time.timestamp(), event.id)
+        keys = [(kind, map_name), (kind, None), (None, None)]
+
+        buckets = self.buckets.setdefault(event.guild.id, {})
+        for key in keys:
+            insort(buckets.setdefault(key, []), entry)
+
+        self.entries.setdefault(event.guild.id, {})[event.id] = (event, entry, keys)
+
+    def remove(self, guild_id: int, event_id: int) -> None:
+        """Removes an event from the index (if it is there)
+
+        Parameters
+        ----------
+        guild_id : int
+            The ID of the event's guild
+        event_id : int
+            The ID of the event
+        """
+        stored = self.entries.get(guild_id, {}).pop(event_id, None)
+        if stored is None:
+            return
+
+        _, entry, keys = stored
+        for key in keys:
+            bucket = self.buckets[guild_id][key]
+            del bucket[bisect_left(bucket, entry)]
+
+    def rebuild(self, guild_id: int, events: list[ScheduledEvent]) -> None:
+        """Replaces everything indexed for a guild (used on startup and for periodic reconciles)
+
+        Parameters
+        ----------
+        guild_id : int
+            The ID of the guild
+        events : list[discord.ScheduledEvent]
+            Every scheduled event in the guild
+        """
+        self.buckets[guild_id] = {}
+        self.entries[guild_id] = {}
+
+        for event in events:
+            self.add(event)
+
+    def get(self, guild_id: int, event_id: int) -> ScheduledEvent | None:
+        """Gets an indexed event
+
+        Parameters
+        ----------
+        guild_id : int
+            The ID of the event's guild
+        event_id : int
+            The ID of the event
+
+        Returns
+        -------
+        discord.ScheduledEvent | None
+            The event, or None if it isn't indexed
+        """
+        stored = self.entries.get(guild_id, {}).get(event_id)
+        return stored[0] if stored is not None else None
+
+    def events(self, guild_id: int, kind: str = None, map_name: str = None, after: datetime = None) -> list[ScheduledEvent]:
+        """Lists the indexed events, earliest first
+
+        Parameters
+        ----------
+        guild_id : int
+            The ID of the guild
+        kind : str, optional
+            Only list events of this kind, by default None (all kinds)
+        map_name : str, optional
+            Only list events on this map (requires kind), by default None (all maps)
+        after : datetime, optional
+            Only list events starting at or after this time, by default None (all events)
+
+        Returns
+        -------
+        list[discord.ScheduledEvent]
+            The events, sorted by start time
+        """
+        bucket = self.buckets.get(guild_id, {}).get(
+            (kind, map_name.lower() if map_name is not None else None), [])
+        start = bisect_left(bucket, (after.timestamp(),)) if after is not None else 0
+
+        entries = self.entries[guild_id] if bucket else {}
+        return [entries[event_id][0] for _, event_id in bucket[start:]]
+
+    def next(self, guild_id: int, kind: str = None, map_name: str = None, after: datetime = None) -> ScheduledEvent | None:
+        """Gets the earliest indexed event
+
+        Parameters
+        ----------
+        guild_id : int
+            The ID of the guild
+        kind : str, optional
+            The kind of event, by default None (any kind)
+        map_name : str, optional
+            The map of the event (requires kind), by default None (any map)
+        after : datetime, optional
+            Only consider events starting at or after this time, by default None
+
+        Returns
+        -------
+        discord.ScheduledEvent | None
+            The event, or None if there isn't one
+        """
+        bucket = self.buckets.get(guild_id, {}).get(
+            (kind, map_name.lower() if map_name is not None else None), [])
+        start = bisect_left(bucket, (after.timestamp(),)) if after is not None else 0
+
+        return self.entries[guild_id][bucket[start][1]][0] if start < len(bucket) else None
@@ -0,0 +1,314 @@
+import asyncio
+
+from datetime import datetime, timedelta
+from time import time as now
+from uuid import uuid4
+
+import discord
+
+from utils.event_index import EventIndex
+from utils.rest_scheduler import RestScheduler
+
+
+class EventJobQueue:
+    def __init__(self, jobs: dict[str, dict], record: callable, index: EventIndex, rest: RestScheduler, log: callable = print) -> None:
+        """Initializes the background queue that creates, edits and cancels scheduled events in bulk (a season of premier events, the practices, ...).
+
+        Jobs are persisted with their progress, so a job that is interrupted by a restart picks up where it left off.
+        Event operations go through the REST scheduler as schedule mutations (which paces event creations) and each job reports its progress by editing a single status message
+
+        Parameters
+        ----------
+        jobs : dict[str, dict]
+            The live table backing the queue, with the structure {job_id: job}
+        record : callable
+            Persists a change to the table. Called as record(op, path, value)
+        index : EventIndex
+            The event index, used to look events up and to skip events that were already created before an interruption
+        rest : RestScheduler
+            Makes the API calls
+        log : callable, optional
+            Logs job progress and failures, by default print
+        """
+        self.jobs = jobs
+        self.record = record
+        self.index = index
+        self.rest = rest
+        self.log = log
+
+        self.bot = None
+        self.queue = None
+        self.task = None
+
+    def submit(self, guild_id: int, voice_channel_id: int, status_channel_id: int, status_message_id: int, description: str, events: list[dict]) -> str:
+        """Queues a job
+
+        Parameters
+        ----------
+        guild_id : int
+            The ID of the guild to create the events in
+        voice_channel_id : int
+            The ID of the voice channel the events take place in
+        status_channel_id : int
+            The ID of the channel of the status message
+        status_message_id : int
+            The ID of the message to edit with the job's progress
+        description : str
+            What the job does (shown in the status message)
+        events : list[dict]
+            The operations to run, with the structure [{"op": "create" | "edit" | "cancel", "event_id": int (edit/cancel), "name": str, "description": str, "start": iso_time, "end": iso_time}, ...].
+            Operations without an "op" are creations
+
+        Returns
+        -------
+        str
+            The ID of the job
+        """
+        job_id = uuid4().hex[:8]
+
+        self.record("set", [job_id], {
+            "guild_id": guild_id,
+            "voice_channel_id": voice_channel_id,
+            "status_channel_id": status_channel_id,
+            "status_message_id": status_message_id,
+            "description": description,
+            "events": events,
+            "done": 0,
+            "status": "queued",
+            "error": "",
+            "created": now(),
+            "finished": 0,
+        })
+
+        if self.queue is not None:
+            self.queue.put_nowait(job_id)
+
+        return job_id
+
+    def update(self, job_id: str, **fields: any) -> None:
+        """Updates (and persists) fields of a job
+
+        Parameters
+        ----------
+        job_id : str
+            The ID of the job
+        **fields : any
+            The fields to update
+        """
+        # only the changed fields are written, never the job's (possibly long) list of events
+        for field, value in fields.items():
+            self.record("set", [job_id, field], value)
+
+    def active(self, guild_id: int) -> bool:
+        """Checks if a guild has a job that is queued or running
+
+        Parameters
+        ----------
+        guild_id : int
+            The ID of the guild
+
+        Returns
+        -------
+        bool
+            Whether the guild's events are still being changed
+        """
+        return any(job["guild_id"] == guild_id and job["status"] in ["queued", "running"] for job in self.jobs.values())
+
+    def start(self, bot: discord.Client) -> None:
+        """Starts the worker (if it isn't already running) and resumes every unfinished job, oldest first. Finished jobs older than a day are dropped
+
+        Parameters
+        ----------
+        bot : discord.Client
+            The bot to create the events and edit the status messages with
+        """
+        if self.task is not None and not self.task.done():
+            return
+
+        self.bot = bot
+        self.queue = asyncio.Queue()
+
+        for job_id, job in sorted(list(self.jobs.items()), key=lambda j: j[1]["created"]):
+            if job["status"] in ["queued", "running"]:
+                self.queue.put_nowait(job_id)
+            elif now() - job["finished"] > timedelta(days=1).total_seconds():
+                self.record("delete", [job_id])
+
+        self.task = asyncio.get_running_loop().create_task(self.run())
+
+    def stop(self) -> None:
+        """Stops the worker. Unfinished jobs are resumed on the next start
+        """
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def run(self) -> None:
+        """[task] Runs the queued jobs one at a time
+        """
+        while True:
+            job_id = await self.queue.get()
+            if job_id not in self.jobs:
+                continue
+
+            try:
+                await self.process(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.update(job_id, status="failed", error=repr(e), finished=now())
+                self.log(f"Event job {job_id} failed: {e!r}")
+                await self.report(job_id)
+
+    async def process(self, job_id: str) -> None:
+        """Runs the remaining operations of a job
+
+        Parameters
+        ----------
+        job_id : str
+            The ID of the job
+        """
+        job = self.jobs[job_id]
+        guild = self.bot.get_guild(job["guild_id"])
+        if guild is None:
+            raise RuntimeError("the guild is no longer available")
+
+        voice_channel = guild.get_channel(job["voice_channel_id"])
+
+        self.update(job_id, status="running")
+        await self.report(job_id)
+
+        for i in range(job["done"], len(job["events"])):
+            spec = job["events"][i]
+
+            if self.needed(guild.id, spec):
+                await self.execute(guild, voice_channel, spec)
+
+            self.update(job_id, done=i + 1)
+            await self.report(job_id)
+
+        self.update(job_id, status="done", finished=now())
+        await self.report(job_id)
+        self.log(f"Event job {job_id} finished: {job['description']}")
+
+    def needed(self, guild_id: int, spec: dict) -> bool:
+        """Checks if an operation still has to run (it may have already run right before the bot went down)
+
+        Parameters
+        ----------
+        guild_id : int
+            The ID of the guild
+        spec : dict
+            The operation
+
+        Returns
+        -------
+        bool
+            Whether to run the operation
+        """
+        if spec.get("op", "create") != "create":
+            return self.index.get(guild_id, spec["event_id"]) is not None
+
+        start_time = datetime.fromisoformat(spec["start"])
+        return start_time > datetime.now(start_time.tzinfo) and not self.exists(guild_id, spec)
+
+    async def execute(self, guild: discord.Guild, voice_channel: discord.VoiceChannel, spec: dict) -> None:
+        """Runs an operation from a job
+
+        Parameters
+        ----------
+        guild : discord.Guild
+            The guild of the event
+        voice_channel : discord.VoiceChannel
+            The voice channel new events take place in
+        spec : dict
+            The operation, with the structure {"op": str, "event_id": int (edit/cancel), "name": str, "description": str, "start": iso_time, "end": iso_time}
+        """
+        op = spec.get("op", "create")
+        start_time = datetime.fromisoformat(spec["start"])
+        end_time = datetime.fromisoformat(spec["end"])
+
+        if op == "create":
+            await self.rest.call("schedule", f"event_create:{guild.id}", guild.create_scheduled_event,
+                                 name=spec["name"], description=spec["description"], channel=voice_channel,
+                                 start_time=start_time, end_time=end_time,
+                                 entity_type=discord.EntityType.voice, privacy_level=discord.PrivacyLevel.guild_only)
+            return
+
+        event = self.index.get(guild.id, spec["event_id"])
+        route = f"event:{event.id}"
+
+        if op == "edit":
+            await self.rest.call("schedule", route, event.edit, name=spec["name"], description=spec["description"],
+                                 start_time=start_time, end_time=end_time)
+        elif event.status == discord.EventStatus.scheduled:
+            await self.rest.call("schedule", route, event.cancel)
+        elif event.status == discord.EventStatus.active:
+            await self.rest.call("schedule", route, event.end)
+        else:
+            await self.rest.call("schedule", route, event.delete)
+
+    def exists(self, guild_id: int, spec: dict) -> bool:
+        """Checks if an event from a job has already been created (e.g. right before the bot went down)
+
+        Parameters
+        ----------
+        guild_id : int
+            The ID of the guild
+        spec : dict
+            The event, with the structure {"name": str, "description": str, "start": iso_time, "end": iso_time}
+
+        Returns
+        -------
+        bool
+            Whether a matching event is indexed
+        """
+        start_time = datetime.fromisoformat(spec["start"])
+
+        for event in self.index.events(guild_id, after=start_time):
+            if event.start_time > start_time:
+                break
+            if event.name == spec["name"] and event.description == spec["description"]:
+                return True
+
+        return False
+
+    def progress(self, job_id: str) -> str:
+        """Builds the status line of a job
+
+        Parameters
+        ----------
+        job_id : str
+            The ID of the job
+
+        Returns
+        -------
+        str
+            The status line
+        """
+        job = self.jobs[job_id]
+        line = f"Job `{job_id}` ({job['description']}): {job['status']}, {job['done']}/{len(job['events'])} operations"
+
+        if job["status"] == "failed":
+            line += f". Error: {job['error']}"
+
+        return line
+
+    async def report(self, job_id: str) -> None:
+        """Edits a job's status message with its progress
+
+        Parameters
+        ----------
+        job_id : str
+            The ID of the job
+        """
+        job = self.jobs[job_id]
+        channel = self.bot.get_channel(job["status_channel_id"])
+        if channel is None:
+            return
+
+        try:
+            await self.rest.call("schedule", f"message_edit:{channel.id}", channel.get_partial_message(job["status_message_id"]).edit,
+                                 content=self.progress(job_id))
+        except discord.HTTPException:  # the status message is only informational
+            pass
@@ -0,0 +1,173 @@
+import asyncio
+
+from datetime import timedelta
+
+from discord import ScheduledEvent, EventStatus, HTTPException
+
+from utils.event_index import EventIndex
+from utils.rest_scheduler import RestScheduler
+from utils.scheduler import TimerScheduler
+
+
+class EventLifecycle:
+    def __init__(self, scheduler: TimerScheduler, index: EventIndex, rest: RestScheduler, log: callable = print, window: float = 1.0, spacing: float = 0.5, default_duration: timedelta = timedelta(hours=1)) -> None:
+        """Initializes the service that moves premier events from scheduled to active to completed on time.
+
+        Every indexed event gets a timer for its start and end time. Transitions that come due around the same time are collected for a short window
+        and applied one after another (spaced out, since Discord rate limits event edits per guild), and a newer transition for an event replaces an older one in the same batch
+
+        Parameters
+        ----------
+        scheduler : TimerScheduler
+            The scheduler to arm the timers on
+        index : EventIndex
+            The index to look the events up in when their timers go off
+        rest : RestScheduler
+            Makes the API calls (as reminder priority, since they are just as time sensitive)
+        log : callable, optional
+            Logs transitions and failures, by default print
+        window : float, optional
+            How many seconds to collect due transitions for before applying them, by default 1.0
+        spacing : float, optional
+            How many seconds to wait between transitions in a batch, by default 0.5
+        default_duration : timedelta, optional
+            How long an event without an end time lasts, by default 1 hour
+        """
+        self.scheduler = scheduler
+        self.index = index
+        self.rest = rest
+        self.log = log
+        self.window = window
+        self.spacing = spacing
+        self.default_duration = default_duration
+
+        self.pending = {}  # {(guild_id, event_id): "start" | "end"}
+        self.task = None
+
+        self.scheduler.register("event_transition", self.transition)
+
+    def key(self, event_id: int, target: str) -> str:
+        """Builds the scheduler key of an event's lifecycle timer
+
+        Parameters
+        ----------
+        event_id : int
+            The ID of the event
+        target : str
+            The transition ("start" or "end")
+
+        Returns
+        -------
+        str
+            The scheduler key
+        """
+        return f"lifecycle:{event_id}:{target}"
+
+    def arm(self, event: ScheduledEvent) -> None:
+        """Arms (or re-arms) the start and end timers of a premier event. Timers that are already overdue go off right away
+
+        Parameters
+        ----------
+        event : discord.ScheduledEvent
+            The event to arm the timers for
+        """
+        self.disarm(event.id)
+
+        if self.index.kind_of(event) is None or event.status not in [EventStatus.scheduled, EventStatus.active]:
+            return
+
+        end_time = event.end_time or event.start_time + self.default_duration
+
+        if event.status == EventStatus.scheduled:
+            self.scheduler.schedule(self.key(event.id, "start"), event.start_time,
+                                    "event_transition", event.guild.id, event.id, "start")
+
+        self.scheduler.schedule(self.key(event.id, "end"), end_time,
+                                "event_transition", event.guild.id, event.id, "end")
+
+    def disarm(self, event_id: int) -> None:
+        """Cancels the timers of an event
+
+        Parameters
+        ----------
+        event_id : int
+            The ID of the event
+        """
+        for target in ["start", "end"]:
+            self.scheduler.cancel(self.key(event_id, target))
+
+    def rebuild(self, guild_id: int) -> None:
+        """Re-arms the timers of every indexed event in a guild (on startup and after reconnecting)
+
+        Parameters
+        ----------
+        guild_id : int
+            The ID of the guild
+        """
+        for event in self.index.events(guild_id):
+            self.arm(event)
+
+    async def transition(self, guild_id: int, event_id: int, target: str) -> None:
+        """[timer] Queues a due transition for the next batch
+
+        Parameters
+        ----------
+        guild_id : int
+            The ID of the event's guild
+        event_id : int
+            The ID of the event
+        target : str
+            The transition ("start" or "end")
+        """
+        self.pending[(guild_id, event_id)] = target
+
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def run(self) -> None:
+        """[task] Waits for the batch window, then applies every queued transition (including ones queued while applying)
+        """
+        await asyncio.sleep(self.window)
+
+        while self.pending:
+            batch = self.pending
+            self.pending = {}
+
+            for (guild_id, event_id), target in batch.items():
+                event = self.index.get(guild_id, event_id)
+                if event is None:  # deleted or already over
+                    continue
+
+                await self.apply(event, target)
+                await asyncio.sleep(self.spacing)
+
+    async def apply(self, event: ScheduledEvent, target: str) -> None:
+        """Moves an event to its next state. Events that reach their end without ever starting are cancelled
+
+        Parameters
+        ----------
+        event : discord.ScheduledEvent
+            The event to transition
+        target : str
+            The transition ("start" or "end")
+        """
+        route = f"event:{event.id}"
+
+        try:
+            if target == "start" and event.status == EventStatus.scheduled:
+                await self.rest.call("reminder", route, event.start)
+                action = "Started"
+            elif target == "end" and event.status == EventStatus.active:
+                await self.rest.call("reminder", route, event.end)
+                action = "Ended"
+            elif target == "end" and event.status == EventStatus.scheduled:
+                await self.rest.call("reminder", route, event.cancel)
+                action = "Cancelled"
+            else:
+                return
+        except HTTPException as e:
+            self.log(
+                f"Failed to {target} event {event.name} on {event.description} ({event.id}): {e!r}")
+            return
+
+        self.log(f"{action} event {event.name} on {event.description}")
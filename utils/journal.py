@@ -0,0 +1,322 @@
+import os
+import json
+import shutil
+import threading
+
+from bisect import insort
+from copy import deepcopy
+
+
+def apply_change(state: dict, change: dict) -> None:
+    """Applies a single journaled change to an in-memory state
+
+    Parameters
+    ----------
+    state : dict
+        The state to modify, with the structure {table_name: table_data}
+    change : dict
+        The change to apply, with the structure {"table": str, "op": str, "path": list, "value": any}
+
+        Dict tables support the "set", "delete" and "clear" ops. List tables (like the map pool) support "add", "remove" and "clear"
+    """
+    data = state[change["table"]]
+    op = change["op"]
+    # json turns every key into a string, so do the same in memory to keep replays identical to the live state
+    path = [str(key) for key in change.get("path", [])]
+    # never share a mutable value between states (the journal keeps its own copy)
+    value = deepcopy(change.get("value"))
+
+    if isinstance(data, list):  # list tables are kept sorted and without duplicates
+        if op == "add" and value not in data:
+            insort(data, value)
+        elif op == "remove" and value in data:
+            data.remove(value)
+        elif op == "clear":
+            data.clear()
+        return
+
+    if op == "clear" and len(path) == 0:
+        data.clear()
+        return
+
+    parent = data
+    for key in path[:-1]:
+        parent = parent.setdefault(key, {})
+
+    if op == "set":
+        parent[path[-1]] = value
+    elif op == "delete":
+        parent.pop(path[-1], None)
+    elif op == "clear":
+        parent.get(path[-1], {}).clear()
+
+
+class Journal:
+    def __init__(self, directory: str, tables: dict[str, str], compact_after: int = 250) -> None:
+        """Initializes an append-only journal on top of the snapshot files in local_storage.
+
+        Every change is appended to the journal as one small json line, so a write costs the size of the change instead of the size of the state.
+        Once enough changes pile up, the journal is compacted into the snapshot files in a background thread.
+        Snapshots are only ever replaced atomically, so a crash can never leave a snapshot (like map_preferences.json) truncated
+
+        Parameters
+        ----------
+        directory : str
+            The directory holding the snapshot files and the journal
+        tables : dict[str, str]
+            The tables to keep, with the structure {table_name: snapshot_filename}. Files ending in .txt hold one list entry per line, everything else is json
+        compact_after : int, optional
+            The number of journaled changes that triggers a compaction, by default 250
+        """
+        self.directory = directory
+        self.tables = tables
+        self.compact_after = compact_after
+
+        self.journal_path = os.path.join(directory, "journal.jsonl")
+        # the journal is moved here while its changes are folded into the snapshots
+        self.compacting_path = f"{self.journal_path}.compacting"
+
+        self.state = {}
+        self.dirty = set()  # tables changed since the last compaction
+        self.pending = 0  # number of changes in the live journal
+        self.file = None
+        self.compactor = None
+        self.lock = threading.Lock()
+
+    def snapshot_path(self, table: str) -> str:
+        """Gets the path of a table's snapshot file
+
+        Parameters
+        ----------
+        table : str
+            The name of the table
+
+        Returns
+        -------
+        str
+            The path of the snapshot file
+        """
+        return os.path.join(self.directory, self.tables[table])
+
+    def read_snapshot(self, table: str) -> dict | list:
+        """Reads a table's snapshot file
+
+        Parameters
+        ----------
+        table : str
+            The name of the table to read
+
+        Returns
+        -------
+        dict | list
+            The table's data. Missing snapshot files are treated as empty tables
+        """
+        path = self.snapshot_path(table)
+        is_list = path.endswith(".txt")
+
+        if not os.path.exists(path):
+            return [] if is_list else {}
+
+        with open(path, "r") as file:
+            if is_list:
+                return sorted(file.read().splitlines())
+            return json.load(file)
+
+    def dump_snapshot(self, table: str) -> str:
+        """Serializes a table into the format of its snapshot file
+
+        Parameters
+        ----------
+        table : str
+            The name of the table to serialize
+
+        Returns
+        -------
+        str
+            The serialized table
+        """
+        data = self.state[table]
+        if isinstance(data, list):
+            return "\n".join(sorted(data))
+        return json.dumps(data, sort_keys=True)
+
+    def replay(self, path: str) -> int:
+        """Applies every change in a journal file to the state
+
+        Parameters
+        ----------
+        path : str
+            The path of the journal file to replay
+
+        Returns
+        -------
+        int
+            The number of changes replayed
+        """
+        if not os.path.exists(path):
+            return 0
+
+        replayed = 0
+        with open(path, "r") as file:
+            for line in file:
+                try:
+                    change = json.loads(line)
+                except json.JSONDecodeError:  # a crash mid-append can only tear the last line
+                    break
+
+                if change.get("table") not in self.state:
+                    continue
+
+                apply_change(self.state, change)
+                self.dirty.add(change["table"])
+                replayed += 1
+
+        return replayed
+
+    def load(self) -> dict:
+        """Loads every snapshot and replays the journal on top of them. Leftover changes from the last run are folded into the snapshots
+
+        Returns
+        -------
+        dict
+            A copy of the state with the structure {table_name: table_data}
+        """
+        os.makedirs(self.directory, exist_ok=True)
+
+        for table in self.tables:
+            self.state[table] = self.read_snapshot(table)
+
+        # a leftover compacting journal means the bot died mid-compaction. Changes are idempotent, so replaying both is safe
+        self.replay(self.compacting_path)
+        self.replay(self.journal_path)
+
+        # always start from a fresh journal, so new changes are never appended to a torn last line
+        self.fold()
+
+        self.file = open(self.journal_path, "a")
+        return deepcopy(self.state)
+
+    def fold(self) -> None:
+        """Synchronously writes every dirty table to its snapshot and removes the journal files, including any torn last line (only used at startup, before the journal is opened)
+        """
+        for table in self.dirty:
+            self.write_snapshot(table, self.dump_snapshot(table))
+
+        self.dirty.clear()
+
+        for path in [self.compacting_path, self.journal_path]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def append(self, change: dict) -> None:
+        """Applies a change to the journal's state and appends it to the journal file
+
+        Parameters
+        ----------
+        change : dict
+            The change to journal, with the structure {"table": str, "op": str, "path": list, "value": any}
+        """
+        self.append_many([change])
+
+    def append_many(self, changes: list[dict]) -> None:
+        """Applies a batch of changes to the journal's state and appends them to the journal file in a single write
+
+        Parameters
+        ----------
+        changes : list[dict]
+            The changes to journal, in order
+        """
+        with self.lock:
+            for change in changes:
+                apply_change(self.state, change)
+                self.dirty.add(change["table"])
+
+            self.file.write("".join(json.dumps(c) + "\n" for c in changes))
+            self.file.flush()
+            self.pending += len(changes)
+
+            should_compact = self.pending >= self.compact_after and self.compactor is None
+
+        if should_compact:
+            self.compact()
+
+    def compact(self) -> None:
+        """Rotates the journal and folds the rotated changes into the snapshot files in a background thread
+        """
+        with self.lock:
+            if self.compactor is not None or self.pending == 0:
+                return
+
+            self.file.close()
+            if os.path.exists(self.compacting_path):
+                # a failed compaction left its journal behind, keep its changes until a snapshot covers them
+                with open(self.journal_path, "r") as src, open(self.compacting_path, "a") as dst:
+                    shutil.copyfileobj(src, dst)
+                os.remove(self.journal_path)
+            else:
+                os.replace(self.journal_path, self.compacting_path)
+            self.file = open(self.journal_path, "a")
+            self.pending = 0
+
+            # serialize under the lock so the snapshot matches the rotated journal exactly
+            snapshots = {table: self.dump_snapshot(table)
+                         for table in self.dirty}
+            self.dirty.clear()
+
+            self.compactor = threading.Thread(
+                target=self.write_snapshots, args=(snapshots,), daemon=True)
+
+        self.compactor.start()
+
+    def write_snapshots(self, snapshots: dict[str, str]) -> None:
+        """[thread] Writes serialized tables to their snapshot files and drops the rotated journal once all of them are on disk
+
+        Parameters
+        ----------
+        snapshots : dict[str, str]
+            The serialized tables, with the structure {table_name: contents}
+        """
+        try:
+            for table, contents in snapshots.items():
+                self.write_snapshot(table, contents)
+
+            os.remove(self.compacting_path)
+        except Exception:
+            # the next compaction snapshots these tables again
+            with self.lock:
+                self.dirty.update(snapshots)
+            raise
+        finally:
+            with self.lock:
+                self.compactor = None
+
+    def write_snapshot(self, table: str, contents: str) -> None:
+        """Atomically replaces a table's snapshot file
+
+        Parameters
+        ----------
+        table : str
+            The name of the table
+        contents : str
+            The serialized table
+        """
+        path = self.snapshot_path(table)
+        tmp_path = f"{path}.tmp"
+
+        with open(tmp_path, "w") as file:
+            file.write(contents)
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(tmp_path, path)
+
+    def close(self) -> None:
+        """Waits for any running compaction and closes the journal file
+        """
+        compactor = self.compactor
+        if compactor is not None:
+            compactor.join()
+
+        if self.file is not None:
+            self.file.close()
+            self.file = None
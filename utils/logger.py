@@ -0,0 +1,218 @@
+import os
+import json
+import queue
+import logging
+import threading
+
+from datetime import datetime
+
+
+class LogWriter:
+    def __init__(self, structured: bool = False, flush_interval: float = 1.0, batch_size: int = 200) -> None:
+        """Initializes the log writer. Callers only push records onto an in-memory queue, and a single background thread batches them to disk.
+
+        Records are written to named destinations (like "stdout" or "debug"), so rotating a log file is just pointing a destination at a new path
+
+        Parameters
+        ----------
+        structured : bool, optional
+            Write json lines instead of plain "[time] message" lines, by default False
+        flush_interval : float, optional
+            The maximum number of seconds a record can wait before it is flushed to disk, by default 1.0
+        batch_size : int, optional
+            The maximum number of records to write per batch, by default 200
+        """
+        self.structured = structured
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self.queue = queue.SimpleQueue()
+        self.destinations = {}  # {destination: path}, only touched by the writer thread
+        self.files = {}  # {path: open file}, only touched by the writer thread
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def set_destination(self, destination: str, path: str) -> None:
+        """Points a destination at a file. Queued in order with the records, so earlier records still go to the old file
+
+        Parameters
+        ----------
+        destination : str
+            The name of the destination
+        path : str
+            The path of the log file
+        """
+        self.queue.put(("destination", destination, path))
+
+    def write(self, destination: str, message: str, level: str = "info", separator: bool = False) -> None:
+        """Queues a log record
+
+        Parameters
+        ----------
+        destination : str
+            The name of the destination to write to
+        message : str
+            The message to log
+        level : str, optional
+            The level of the record, by default "info"
+        separator : bool, optional
+            Write a separator line before the record (plain format only), by default False
+        """
+        self.queue.put(("record", destination, (datetime.now(), level, message, separator)))
+
+    def format(self, record: tuple) -> str:
+        """Formats a record into the line(s) to write
+
+        Parameters
+        ----------
+        record : tuple
+            The record with the structure (time, level, message, separator)
+
+        Returns
+        -------
+        str
+            The formatted line(s)
+        """
+        when, level, message, separator = record
+
+        if self.structured:
+            return json.dumps({"time": when.isoformat(timespec="seconds"), "level": level, "message": message}) + "\n"
+
+        line = f'[{when.strftime("%Y-%m-%d %H:%M:%S")}] {message}\n'
+        return f"{'-' * 50}\n{line}" if separator else line
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Blocks until every record queued before this call is on disk
+
+        Parameters
+        ----------
+        timeout : float, optional
+            The maximum number of seconds to wait, by default 5.0
+        """
+        if not self.thread.is_alive():
+            return
+
+        done = threading.Event()
+        self.queue.put(("flush", None, done))
+        done.wait(timeout)
+
+    def close(self) -> None:
+        """Writes everything left in the queue and stops the writer thread
+        """
+        if not self.thread.is_alive():
+            return
+
+        self.queue.put(("close", None, None))
+        self.thread.join(5.0)
+
+    def run(self) -> None:
+        """[thread] Pulls records off the queue and writes them in batches, flushing at least every flush_interval seconds
+        """
+        while True:
+            try:
+                batch = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if not self.write_batch(batch):
+                return
+
+    def write_batch(self, batch: list[tuple]) -> bool:
+        """[thread] Writes a batch of queued items
+
+        Parameters
+        ----------
+        batch : list[tuple]
+            The queued items, in order
+
+        Returns
+        -------
+        bool
+            False if the writer was closed
+        """
+        waiting = []  # flush events to set once the batch is on disk
+        running = True
+
+        for kind, destination, payload in batch:
+            if kind == "record":
+                path = self.destinations.get(destination)
+                if path is not None:
+                    self.open_file(path).write(self.format(payload))
+            elif kind == "destination":
+                old_path = self.destinations.get(destination)
+                self.destinations[destination] = payload
+                if old_path not in self.destinations.values() and old_path in self.files:
+                    self.files.pop(old_path).close()
+            elif kind == "flush":
+                waiting.append(payload)
+            elif kind == "close":
+                running = False
+
+        for file in self.files.values():
+            file.flush()
+
+        for done in waiting:
+            done.set()
+
+        if not running:
+            for file in self.files.values():
+                file.close()
+            self.files.clear()
+
+        return running
+
+    def open_file(self, path: str) -> any:
+        """[thread] Gets the open file for a path, opening it if needed
+
+        Parameters
+        ----------
+        path : str
+            The path of the log file
+
+        Returns
+        -------
+        TextIOWrapper
+            The open file
+        """
+        if path not in self.files:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self.files[path] = open(path, "a")
+        return self.files[path]
+
+
+class QueueHandler(logging.Handler):
+    def __init__(self, writer: LogWriter, destination: str) -> None:
+        """Initializes a logging handler that forwards library logs (discord.py, asyncio, ...) to a LogWriter destination
+
+        Parameters
+        ----------
+        writer : LogWriter
+            The writer to forward records to
+        destination : str
+            The destination to write the records to
+        """
+        super().__init__()
+        self.writer = writer
+        self.destination = destination
+        self.setFormatter(logging.Formatter("%(name)s: %(message)s"))
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Queues a library log record
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            The record to queue
+        """
+        try:
+            self.writer.write(self.destination, self.format(record),
+                              level=record.levelname.lower())
+        except Exception:
+            self.handleError(record)
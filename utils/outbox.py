@@ -0,0 +1,209 @@
+import asyncio
+
+from itertools import count
+from time import perf_counter
+
+import discord
+
+from utils.rest_scheduler import RestScheduler
+
+
+class Outbox:
+    def __init__(self, rest: RestScheduler, window: float = 0.5, limit: int = 2000, silent_suffix: str = "\n\n(This message was sent silently)", log: callable = print) -> None:
+        """Initializes the outbound message queue. Messages for a channel that are queued within a short window are merged into as few messages as possible.
+
+        Loud messages (pings) are sent before silent ones, and loud and silent messages are never merged together (a merged message is either a ping or silent)
+
+        Parameters
+        ----------
+        rest : RestScheduler
+            Sends the messages (as reminder priority)
+        window : float, optional
+            How many seconds to collect a channel's messages for before sending them, by default 0.5
+        limit : int, optional
+            The most characters in a message, by default 2000 (discord's limit)
+        silent_suffix : str, optional
+            Appended once to every silent message, by default "\\n\\n(This message was sent silently)"
+        log : callable, optional
+            Logs failed sends, by default print
+        """
+        self.rest = rest
+        self.window = window
+        self.limit = limit
+        self.silent_suffix = silent_suffix
+        self.log = log
+
+        self.queues = {}  # {channel_id: [(-priority, seq, content, silent, future, on_sent, queued_at), ...]}
+        self.tasks = {}  # {channel_id: flush task}
+        self.seq = count()
+
+        # stats
+        self.queued = 0
+        self.delivered = 0  # queued messages that have been sent (or failed)
+        self.sent = 0  # messages actually sent, after merging
+        self.total_latency = 0.0  # seconds from queueing a message to it being sent, summed over every queued message
+        self.last_latency = 0.0
+
+    def send(self, channel: discord.abc.Messageable, content: str, silent: bool = False, priority: int = None, on_sent: callable = None) -> asyncio.Future:
+        """Queues a message. A message that is too long for one discord message is split into several. The returned future resolves to the message it was sent in (the last one if it was split, None if sending failed)
+
+        Parameters
+        ----------
+        channel : discord.abc.Messageable
+            The channel to send the message to
+        content : str
+            The message (without the silent suffix)
+        silent : bool, optional
+            Send the message without notifying anyone, by default False
+        priority : int, optional
+            Messages with a higher priority are sent first, by default 1 for loud messages and 0 for silent ones
+        on_sent : callable, optional
+            Called with the sent message once it is sent (with each of them if it was split), by default None
+
+        Returns
+        -------
+        asyncio.Future
+            Resolves to the sent discord.Message
+        """
+        if priority is None:
+            priority = 0 if silent else 1
+
+        loop = asyncio.get_running_loop()
+        queue = self.queues.setdefault(channel.id, [])
+        parts = self.split(content, self.limit - (len(self.silent_suffix) if silent else 0))
+
+        # the parts are queued back to back, so they are sent in order
+        for part in parts:
+            future = loop.create_future()
+            queue.append((-priority, next(self.seq), part, silent, future, on_sent, perf_counter()))
+        self.queued += len(parts)
+
+        task = self.tasks.get(channel.id)
+        if task is None or task.done():
+            self.tasks[channel.id] = asyncio.get_running_loop().create_task(
+                self.flush_after_window(channel))
+
+        return future
+
+    def split(self, content: str, limit: int) -> list[str]:
+        """Splits a message into parts that fit in a discord message, preferring to split at line breaks, then at spaces
+
+        Parameters
+        ----------
+        content : str
+            The message
+        limit : int
+            The most characters in a part
+
+        Returns
+        -------
+        list[str]
+            The parts, in order
+        """
+        parts = []
+
+        while len(content) > limit:
+            cut = content.rfind("\n", 0, limit + 1)
+            if cut <= 0:
+                cut = content.rfind(" ", 0, limit + 1)
+            if cut <= 0:
+                cut = limit
+
+            parts.append(content[:cut])
+            content = content[cut:].lstrip("\n ")
+
+        parts.append(content)
+        return parts
+
+    async def flush_after_window(self, channel: discord.abc.Messageable) -> None:
+        """[task] Waits for the window to pass, then sends everything queued for the channel in the meantime (repeating while more messages are queued during the sends)
+
+        Parameters
+        ----------
+        channel : discord.abc.Messageable
+            The channel to flush
+        """
+        while self.queues.get(channel.id):
+            await asyncio.sleep(self.window)
+            await self.flush(channel)
+
+    def merge(self, queued: list[tuple]) -> list[tuple[str, bool, list[tuple]]]:
+        """Merges queued messages into as few messages as possible, highest priority first
+
+        Parameters
+        ----------
+        queued : list[tuple]
+            The queued messages
+
+        Returns
+        -------
+        list[tuple[str, bool, list[tuple]]]
+            The messages to send, with the structure [(content, silent, merged_queue_entries), ...]
+        """
+        merged = []
+
+        for entry in sorted(queued, key=lambda e: (e[0], e[1])):
+            content, silent = entry[2], entry[3]
+
+            if merged:
+                last_content, last_silent, entries = merged[-1]
+                combined = f"{last_content}\n\n{content}"
+                suffix = self.silent_suffix if silent else ""
+
+                if last_silent == silent and len(combined) + len(suffix) <= self.limit:
+                    merged[-1] = (combined, silent, entries + [entry])
+                    continue
+
+            merged.append((content, silent, [entry]))
+
+        return merged
+
+    async def flush(self, channel: discord.abc.Messageable) -> None:
+        """Sends everything queued for a channel right away
+
+        Parameters
+        ----------
+        channel : discord.abc.Messageable
+            The channel to flush
+        """
+        queued = self.queues.pop(channel.id, [])
+
+        for content, silent, entries in self.merge(queued):
+            try:
+                message = await self.rest.call("reminder", f"channel_send:{channel.id}", channel.send,
+                                               content + (self.silent_suffix if silent else ""), silent=silent)
+            except discord.HTTPException as e:
+                self.log(f"Failed to send a message to {channel.id}: {e!r}")
+                message = None
+
+            sent_at = perf_counter()
+            self.sent += 1
+            self.delivered += len(entries)
+
+            for entry in entries:
+                future, on_sent, queued_at = entry[4], entry[5], entry[6]
+
+                self.last_latency = sent_at - queued_at
+                self.total_latency += self.last_latency
+
+                if message is not None and on_sent is not None:
+                    on_sent(message)
+                if not future.done():
+                    future.set_result(message)
+
+    def stats(self) -> dict:
+        """Gets the outbox's stats
+
+        Returns
+        -------
+        dict
+            The stats: messages waiting per channel, messages queued and actually sent, and queue-to-send latencies (in ms)
+        """
+        return {
+            "depth": {channel_id: len(queued) for channel_id, queued in self.queues.items()},
+            "queued": self.queued,
+            "sent": self.sent,
+            "merged": self.delivered - self.sent,
+            "last_latency_ms": round(self.last_latency * 1000, 2),
+            "avg_latency_ms": round(self.total_latency * 1000 / self.delivered, 2) if self.delivered else 0.0,
+        }
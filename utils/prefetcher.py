@@ -0,0 +1,155 @@
+import asyncio
+
+
+class Prefetcher:
+    def __init__(self, workers: int = 2, lookahead: int = 3, log: callable = print) -> None:
+        """Initializes the worker pool that fetches (resolves or downloads) the upcoming songs of every voice session while the current song plays.
+
+        Only the next few songs of each session are fetched ahead of time, and a free worker always takes the song that plays soonest
+
+        Parameters
+        ----------
+        workers : int, optional
+            How many songs can be fetched at once (across every session), by default 2
+        lookahead : int, optional
+            How many upcoming songs of each session to fetch ahead of playback, by default 3
+        log : callable, optional
+            Logs failed fetches, by default print
+        """
+        self.workers = workers
+        self.lookahead = lookahead
+        self.log = log
+
+        self.sessions = set()  # {GuildAudioSession, ...}
+        self.changed = None
+        self.tasks = []
+
+        # stats
+        self.fetched = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    def start(self) -> None:
+        """Starts the workers (if they aren't already running)
+        """
+        if self.tasks:
+            return
+
+        self.changed = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        self.tasks = [loop.create_task(self.work()) for _ in range(self.workers)]
+
+    def stop(self) -> None:
+        """Stops the workers (when the music cog is unloaded). Fetches that are in progress are cancelled and queued again, so they restart with the workers
+        """
+        for task in self.tasks:
+            task.cancel()
+        self.tasks = []
+
+        for session in self.sessions:
+            for entry in session.playlist:
+                if entry["status"] == "fetching":
+                    entry["task"].cancel()
+                    entry["task"] = None
+                    entry["status"] = "queued"
+
+    def register(self, session: any) -> None:
+        """Starts prefetching a session's songs
+
+        Parameters
+        ----------
+        session : GuildAudioSession
+            The session
+        """
+        self.sessions.add(session)
+        self.notify()
+
+    def unregister(self, session: any) -> None:
+        """Stops prefetching a session's songs
+
+        Parameters
+        ----------
+        session : GuildAudioSession
+            The session
+        """
+        self.sessions.discard(session)
+
+    def notify(self) -> None:
+        """Wakes the workers up after a session's playlist changed. Must be called on the event loop
+        """
+        if self.changed is not None:
+            self.changed.set()
+
+    def next_entry(self) -> tuple | None:
+        """Takes the queued song that plays soonest: the lowest playlist position (within the lookahead) across every session
+
+        Returns
+        -------
+        tuple | None
+            The session and the playlist entry, or None if nothing needs fetching
+        """
+        best = None
+
+        for session in self.sessions:
+            for position, entry in enumerate(session.playlist[:self.lookahead]):
+                if entry["status"] == "queued" and (best is None or position < best[0]):
+                    best = (position, session, entry)
+                    break
+
+        return best[1:] if best is not None else None
+
+    async def work(self) -> None:
+        """[task] Fetches queued songs, soonest first
+        """
+        while True:
+            picked = self.next_entry()
+            if picked is None:
+                self.changed.clear()
+                await self.changed.wait()
+                continue
+
+            session, entry = picked
+            entry["status"] = "fetching"
+            # the fetch gets its own task, so skipping the song cancels the fetch without cancelling the worker
+            entry["task"] = asyncio.get_running_loop().create_task(
+                session.fetch_song(entry["url"]))
+
+            await asyncio.wait([entry["task"]])
+
+            if entry["task"].cancelled():
+                self.cancelled += 1
+                continue
+
+            error = entry["task"].exception()
+            if error is not None:
+                self.failed += 1
+                self.log(f"Failed to fetch {entry['url']}: {error!r}")
+            else:
+                self.fetched += 1
+
+            # a song failing to start shouldn't take the worker down with it
+            try:
+                if error is not None:
+                    session.on_fetched(entry, error=error)
+                else:
+                    session.on_fetched(entry, entry["task"].result())
+            except Exception as e:
+                self.log(f"Failed to hand {entry['url']} to its session: {e!r}")
+
+    def stats(self) -> dict:
+        """Gets the prefetcher's stats
+
+        Returns
+        -------
+        dict
+            The stats: songs waiting to be fetched, songs being fetched, and songs fetched, failed and cancelled
+        """
+        entries = [entry for session in self.sessions for entry in session.playlist]
+
+        return {
+            "queued": sum(entry["status"] == "queued" for entry in entries),
+            "fetching": sum(entry["status"] == "fetching" for entry in entries),
+            "fetched": self.fetched,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+        }
@@ -0,0 +1,155 @@
+from datetime import datetime, timedelta
+
+from discord import ScheduledEvent, EventStatus
+
+
+def event_spec(name: str, description: str, start_time: datetime, duration: timedelta = timedelta(hours=1)) -> dict:
+    """Builds the spec of a desired event
+
+    Parameters
+    ----------
+    name : str
+        The name of the event
+    description : str
+        The description of the event (the map)
+    start_time : datetime
+        The timezone-aware start time of the event
+    duration : timedelta, optional
+        How long the event lasts, by default 1 hour
+
+    Returns
+    -------
+    dict
+        The spec, with the structure {"name": str, "description": str, "start": iso_time, "end": iso_time}
+    """
+    return {"name": name, "description": description, "start": start_time.isoformat(), "end": (start_time + duration).isoformat()}
+
+
+def season_events(maps: list[str], first_thursday: datetime, tz: any) -> list[dict]:
+    """Plans a premier season: every map is played on Thursday and Sunday at 10pm and Saturday at 11pm (eastern), one map per week.
+    The last day of the last map is the playoffs
+
+    Parameters
+    ----------
+    maps : list[str]
+        The map order
+    first_thursday : datetime
+        The date of the Thursday that starts the first week
+    tz : pytz.timezone
+        The timezone the start times are in
+
+    Returns
+    -------
+    list[dict]
+        The specs of the season's events
+    """
+    specs = []
+
+    for i, map_name in enumerate(maps):
+        thursday = first_thursday.date() + timedelta(days=7 * i)
+        days = [(thursday, 22), (thursday + timedelta(days=2), 23), (thursday + timedelta(days=3), 22)]
+
+        for j, (day, hour) in enumerate(days):
+            start_time = tz.localize(datetime(day.year, day.month, day.day, hour))
+
+            if i == len(maps) - 1 and j == len(days) - 1:
+                specs.append(event_spec("Premier Playoffs", "Playoffs", start_time))
+            else:
+                specs.append(event_spec("Premier", map_name.title(), start_time))
+
+    return specs
+
+
+def practice_events(events: list[ScheduledEvent], tz: any) -> list[dict]:
+    """Plans the practices for the premier events: the Wednesday (10pm) before and the Friday (11pm) after every Thursday event, on the same map
+
+    Parameters
+    ----------
+    events : list[discord.ScheduledEvent]
+        The premier events (not practices)
+    tz : pytz.timezone
+        The timezone the start times are in
+
+    Returns
+    -------
+    list[dict]
+        The specs of the practices
+    """
+    specs = []
+
+    for event in events:
+        local_start = event.start_time.astimezone(tz)
+        if local_start.weekday() != 3:
+            continue
+
+        for offset, hour in [(-1, 22), (1, 23)]:
+            day = local_start.date() + timedelta(days=offset)
+            start_time = tz.localize(datetime(day.year, day.month, day.day, hour))
+            specs.append(event_spec("Premier Practice", event.description, start_time))
+
+    return specs
+
+
+def reconcile(desired: list[dict], existing: list[ScheduledEvent], now: datetime) -> list[dict]:
+    """Computes the fewest operations that turn the existing upcoming events into the desired ones.
+
+    Events that already match are left alone. An event that is in the right slot with the wrong map, or on the right map in the wrong slot, is edited instead of being cancelled and recreated.
+    Desired events in the past are ignored, and only existing events that haven't started yet are touched
+
+    Parameters
+    ----------
+    desired : list[dict]
+        The specs of the desired events
+    existing : list[discord.ScheduledEvent]
+        The existing events of the same kind(s)
+    now : datetime
+        The current (timezone-aware) time
+
+    Returns
+    -------
+    list[dict]
+        The operations, with the structure [{"op": "create" | "edit" | "cancel", "event_id": int (edit/cancel), **spec}, ...]
+    """
+    def timestamp(iso: str) -> float:
+        return datetime.fromisoformat(iso).timestamp()
+
+    wanted = [spec for spec in desired if timestamp(spec["start"]) > now.timestamp()]
+    leftover = sorted([event for event in existing if event.status == EventStatus.scheduled and event.start_time > now],
+                      key=lambda e: e.start_time)
+
+    operations = []
+
+    # each pass matches what is left by a looser key: exact match (keep), same slot (fix the map), same map (move it)
+    passes = [
+        (lambda s: (s["name"], s["description"], timestamp(s["start"])),
+         lambda e: (e.name, e.description, e.start_time.timestamp()), None),
+        (lambda s: (s["name"], timestamp(s["start"])),
+         lambda e: (e.name, e.start_time.timestamp()), "edit"),
+        (lambda s: (s["name"], s["description"]),
+         lambda e: (e.name, e.description), "edit"),
+    ]
+
+    for spec_key, event_key, op in passes:
+        candidates = {}
+        for event in leftover:
+            candidates.setdefault(event_key(event), []).append(event)
+
+        unmatched = []
+        for spec in wanted:
+            matches = candidates.get(spec_key(spec))
+            if not matches:
+                unmatched.append(spec)
+                continue
+
+            event = matches.pop(0)
+            leftover.remove(event)
+            if op is not None:
+                operations.append({"op": op, "event_id": event.id, **spec})
+
+        wanted = unmatched
+
+    operations += [{"op": "create", **spec} for spec in wanted]
+    operations += [{"op": "cancel", "event_id": event.id, **event_spec(event.name, event.description, event.start_time)}
+                   for event in leftover]
+
+    return operations
@@ -0,0 +1,91 @@
+class RenderCache:
+    def __init__(self) -> None:
+        """Initializes the cache of rendered command output, keyed by (command, guild, arguments).
+
+        Every entry is tagged with the state it was rendered from (like "preferences" or "events:<guild_id>"),
+        so a change only drops the renders that actually depend on it
+        """
+        self.entries = {}  # {key: (text, tags)}
+        self.tagged = {}  # {tag: {key, ...}}
+
+        # stats
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+
+    def get(self, key: tuple, render: callable, tags: list[str] = []) -> str:
+        """Gets a cached render, rendering (and caching) it on a miss
+
+        Parameters
+        ----------
+        key : tuple
+            What was rendered, like ("map-votes", guild_id)
+        render : callable
+            Called with no arguments on a miss. Returns the text
+        tags : list[str], optional
+            The state the render depends on, by default []
+
+        Returns
+        -------
+        str
+            The rendered text
+        """
+        cached = self.entries.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached[0]
+
+        self.misses += 1
+        text = render()
+
+        self.entries[key] = (text, tags)
+        for tag in tags:
+            self.tagged.setdefault(tag, set()).add(key)
+
+        return text
+
+    def invalidate(self, *tags: str) -> int:
+        """Drops every render that depends on any of the tags
+
+        Parameters
+        ----------
+        *tags : str
+            The state that changed
+
+        Returns
+        -------
+        int
+            The number of renders dropped
+        """
+        dropped = 0
+
+        for tag in tags:
+            for key in self.tagged.pop(tag, set()):
+                cached = self.entries.pop(key, None)
+                if cached is None:
+                    continue
+
+                dropped += 1
+                for other in cached[1]:
+                    if other != tag:
+                        self.tagged.get(other, set()).discard(key)
+
+        self.invalidated += dropped
+        return dropped
+
+    def stats(self) -> dict:
+        """Gets the cache's stats
+
+        Returns
+        -------
+        dict
+            The stats: cached renders, hits, misses, hit rate and renders dropped by invalidation
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "invalidated": self.invalidated,
+        }
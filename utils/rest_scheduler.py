@@ -0,0 +1,236 @@
+import asyncio
+
+from collections import deque
+from time import perf_counter
+
+from discord import HTTPException
+
+from utils.token_bucket import TokenBucket
+
+
+class RestScheduler:
+    def __init__(self, workers: int = 4, class_limits: dict[str, int] = None, route_limits: dict[str, tuple[float, float]] = None, max_pending: int = 200, log: callable = print) -> None:
+        """Initializes the scheduler that every bot-initiated Discord API call goes through.
+
+        Calls are queued by priority class (user-facing replies > reminders > schedule mutations > cleanup) and a free worker always takes the most urgent call that can run.
+        Lower classes can only occupy a few workers at once, so a long cleanup sweep always leaves workers free for a reminder ping.
+        Calls on the same route run one at a time, routes with a known limit are paced by a token bucket, and each class only holds so many pending calls (callers wait for room)
+
+        Parameters
+        ----------
+        workers : int, optional
+            How many calls can run at once, by default 4
+        class_limits : dict[str, int], optional
+            The most workers each class can occupy at once, by default 2 for "schedule" and 1 for "cleanup"
+        route_limits : dict[str, tuple[float, float]], optional
+            Token bucket limits per kind of route, with the structure {route_kind: (rate, per_seconds)}. The route kind is the part of the route before the first ":". By default 5/minute for "event_create"
+        max_pending : int, optional
+            The most calls each class can have waiting, by default 200
+        log : callable, optional
+            Logs failed calls, by default print
+        """
+        self.classes = ["interaction", "reminder", "schedule", "cleanup"]  # most urgent first
+
+        self.workers = workers
+        self.class_limits = class_limits if class_limits is not None else {"schedule": 2, "cleanup": 1}
+        self.route_limits = route_limits if route_limits is not None else {"event_create": (5, 60)}
+        self.max_pending = max_pending
+        self.log = log
+
+        self.queues = {c: deque() for c in self.classes}  # {class: deque([(route, func, args, kwargs, future, queued_at), ...])}
+        self.in_flight = {c: 0 for c in self.classes}
+        self.busy_routes = set()
+        self.buckets = {}  # {route: TokenBucket}
+
+        self.condition = None
+        self.room = None  # {class: asyncio.Semaphore}
+        self.tasks = []
+
+        # stats
+        self.completed = {c: 0 for c in self.classes}
+        self.wait_time = {c: 0.0 for c in self.classes}  # seconds spent queued, summed per class
+
+    def start(self) -> None:
+        """Starts the workers (if they aren't already running)
+        """
+        if self.tasks:
+            return
+
+        self.condition = asyncio.Condition()
+        self.room = {c: asyncio.Semaphore(self.max_pending) for c in self.classes}
+
+        loop = asyncio.get_running_loop()
+        self.tasks = [loop.create_task(self.work()) for _ in range(self.workers)]
+
+    def stop(self) -> None:
+        """Stops the workers. Calls that are still queued are left unresolved
+        """
+        for task in self.tasks:
+            task.cancel()
+        self.tasks = []
+
+    async def call(self, priority: str, route: str, func: callable, *args: any, **kwargs: any) -> any:
+        """Queues an API call and waits for its result
+
+        Parameters
+        ----------
+        priority : str
+            The priority class ("interaction", "reminder", "schedule" or "cleanup")
+        route : str
+            What the call hits, like "channel_send:<channel_id>" or "event_create:<guild_id>". Calls on the same route run one at a time
+        func : callable
+            The coroutine function that makes the call
+        *args : any
+            The positional arguments to call func with
+        **kwargs : any
+            The keyword arguments to call func with
+
+        Returns
+        -------
+        any
+            Whatever func returns (its exceptions are raised here)
+        """
+        if not self.tasks:  # not started (like during startup), just make the call
+            return await func(*args, **kwargs)
+
+        await self.room[priority].acquire()
+
+        future = asyncio.get_running_loop().create_future()
+        async with self.condition:
+            self.queues[priority].append(
+                (route, func, args, kwargs, future, perf_counter()))
+            self.condition.notify_all()
+
+        return await future
+
+    def next_call(self) -> tuple | None:
+        """Takes the most urgent call that can run right now: its class has a free worker and its route isn't busy (each class stays first in, first out)
+
+        Returns
+        -------
+        tuple | None
+            The class and the call, or None if nothing can run
+        """
+        for c in self.classes:
+            queue = self.queues[c]
+            if not queue or self.in_flight[c] >= self.class_limits.get(c, self.workers):
+                continue
+            if queue[0][0] in self.busy_routes:
+                continue
+
+            return c, queue.popleft()
+
+        return None
+
+    def bucket(self, route: str) -> TokenBucket | None:
+        """Gets the token bucket of a route (if its kind of route has a known limit)
+
+        Parameters
+        ----------
+        route : str
+            The route
+
+        Returns
+        -------
+        TokenBucket | None
+            The bucket, or None if the route isn't limited
+        """
+        kind = route.split(":")[0]
+        if kind not in self.route_limits:
+            return None
+
+        if route not in self.buckets:
+            self.buckets[route] = TokenBucket(*self.route_limits[kind])
+        return self.buckets[route]
+
+    async def work(self) -> None:
+        """[task] Runs queued calls, most urgent first
+        """
+        picked = None
+
+        def pick() -> bool:
+            nonlocal picked
+            picked = self.next_call()
+            return picked is not None
+
+        while True:
+            async with self.condition:
+                await self.condition.wait_for(pick)
+                c, (route, func, args, kwargs, future, queued_at) = picked
+
+                self.in_flight[c] += 1
+                self.busy_routes.add(route)
+
+            self.room[c].release()
+            self.wait_time[c] += perf_counter() - queued_at
+
+            try:
+                if not future.done():
+                    future.set_result(await self.run(route, func, args, kwargs))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.completed[c] += 1
+
+                async with self.condition:
+                    self.in_flight[c] -= 1
+                    self.busy_routes.discard(route)
+                    self.condition.notify_all()
+
+    async def run(self, route: str, func: callable, args: tuple, kwargs: dict) -> any:
+        """Makes a call, paced by its route's bucket. A 429 blocks the route for Retry-After and the call is retried once
+
+        Parameters
+        ----------
+        route : str
+            The route of the call
+        func : callable
+            The coroutine function that makes the call
+        args : tuple
+            The positional arguments
+        kwargs : dict
+            The keyword arguments
+
+        Returns
+        -------
+        any
+            Whatever func returns
+        """
+        bucket = self.bucket(route)
+        if bucket is not None:
+            await bucket.acquire()
+
+        try:
+            return await func(*args, **kwargs)
+        except HTTPException as e:
+            if e.status != 429:
+                raise
+
+            retry_after = float(e.response.headers.get("Retry-After", 1))
+            self.log(f"Rate limited on {route}, retrying in {retry_after}s")
+
+            if bucket is not None:
+                bucket.penalize(retry_after)
+                await bucket.acquire()
+            else:
+                await asyncio.sleep(retry_after)
+
+            return await func(*args, **kwargs)
+
+    def stats(self) -> dict:
+        """Gets the scheduler's stats
+
+        Returns
+        -------
+        dict
+            The stats per class: calls waiting, calls running, calls completed and average time spent queued (in ms)
+        """
+        return {c: {
+            "pending": len(self.queues[c]),
+            "in_flight": self.in_flight[c],
+            "completed": self.completed[c],
+            "avg_wait_ms": round(self.wait_time[c] * 1000 / self.completed[c], 2) if self.completed[c] else 0.0,
+        } for c in self.classes}
@@ -0,0 +1,154 @@
+class RSVPCache:
+    def __init__(self) -> None:
+        """Initializes the in-memory cache of who has RSVP'ed to each scheduled event.
+
+        Each event's roster is seeded once (from a REST fetch) and then kept current from the gateway's user add/remove events,
+        so counting or mentioning the attendees doesn't need any requests
+        """
+        self.rosters = {}  # {event_id: {user_id: None}}, dicts keep the RSVP order
+        self.seeding = {}  # {event_id: [(op, user_id), ...]}, gateway changes that arrive while a roster is being fetched
+
+    def is_seeded(self, event_id: int) -> bool:
+        """Checks if an event's roster has been seeded
+
+        Parameters
+        ----------
+        event_id : int
+            The ID of the event
+
+        Returns
+        -------
+        bool
+            Whether the roster is cached
+        """
+        return event_id in self.rosters
+
+    def begin_seed(self, event_id: int) -> None:
+        """Starts buffering gateway changes for an event whose roster is about to be fetched
+
+        Parameters
+        ----------
+        event_id : int
+            The ID of the event
+        """
+        self.seeding.setdefault(event_id, [])
+
+    def finish_seed(self, event_id: int, user_ids: list[int]) -> None:
+        """Seeds an event's roster with the fetched users, then applies any gateway changes that arrived during the fetch
+
+        Parameters
+        ----------
+        event_id : int
+            The ID of the event
+        user_ids : list[int]
+            The IDs of the users who have RSVP'ed, according to the fetch
+        """
+        self.rosters[event_id] = dict.fromkeys(user_ids)
+
+        for op, user_id in self.seeding.pop(event_id, []):
+            self.apply(event_id, op, user_id)
+
+    def apply(self, event_id: int, op: str, user_id: int) -> None:
+        """Applies a gateway change to an event's roster. Changes to rosters that haven't been seeded are ignored (the seed fetch will include them)
+
+        Parameters
+        ----------
+        event_id : int
+            The ID of the event
+        op : str
+            "add" or "remove"
+        user_id : int
+            The ID of the user
+        """
+        if event_id in self.seeding:
+            self.seeding[event_id].append((op, user_id))
+            return
+
+        roster = self.rosters.get(event_id)
+        if roster is None:
+            return
+
+        if op == "add":
+            roster[user_id] = None
+        else:
+            roster.pop(user_id, None)
+
+    def add(self, event_id: int, user_id: int) -> None:
+        """Records that a user has RSVP'ed to an event
+
+        Parameters
+        ----------
+        event_id : int
+            The ID of the event
+        user_id : int
+            The ID of the user
+        """
+        self.apply(event_id, "add", user_id)
+
+    def remove(self, event_id: int, user_id: int) -> None:
+        """Records that a user has removed their RSVP from an event
+
+        Parameters
+        ----------
+        event_id : int
+            The ID of the event
+        user_id : int
+            The ID of the user
+        """
+        self.apply(event_id, "remove", user_id)
+
+    def drop(self, event_id: int) -> None:
+        """Forgets an event's roster (when the event is over or deleted)
+
+        Parameters
+        ----------
+        event_id : int
+            The ID of the event
+        """
+        self.rosters.pop(event_id, None)
+        self.seeding.pop(event_id, None)
+
+    def users(self, event_id: int) -> list[int]:
+        """Gets the users who have RSVP'ed to an event
+
+        Parameters
+        ----------
+        event_id : int
+            The ID of the event
+
+        Returns
+        -------
+        list[int]
+            The IDs of the users, in RSVP order (empty if the roster isn't cached)
+        """
+        return list(self.rosters.get(event_id, {}))
+
+    def count(self, event_id: int) -> int:
+        """Gets the number of users who have RSVP'ed to an event
+
+        Parameters
+        ----------
+        event_id : int
+            The ID of the event
+
+        Returns
+        -------
+        int
+            The number of users (0 if the roster isn't cached)
+        """
+        return len(self.rosters.get(event_id, {}))
+
+    def mentions(self, event_id: int) -> list[str]:
+        """Gets the mention strings of the users who have RSVP'ed to an event
+
+        Parameters
+        ----------
+        event_id : int
+            The ID of the event
+
+        Returns
+        -------
+        list[str]
+            The mentions, in RSVP order
+        """
+        return [f"<@{user_id}>" for user_id in self.rosters.get(event_id, {})]
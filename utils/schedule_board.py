@@ -0,0 +1,154 @@
+import asyncio
+
+import discord
+
+from utils.render_cache import RenderCache
+from utils.rest_scheduler import RestScheduler
+
+
+class ScheduleBoard:
+    def __init__(self, boards: dict[str, dict], record: callable, rest: RestScheduler, cache: RenderCache, busy: callable, window: float = 10.0, log: callable = print) -> None:
+        """Initializes the pinned schedule boards: one message per guild listing the upcoming premier events and practices.
+
+        The rendered schedule is cached (tagged "events:<guild_id>") until the guild's events change, so /schedule never renders it twice.
+        Changes are debounced, and held while the guild has an event job running, so a bulk /add-events run causes a single edit
+
+        Parameters
+        ----------
+        boards : dict[str, dict]
+            The live table backing the boards, with the structure {guild_id: {"channel_id": int, "message_id": int}}
+        record : callable
+            Persists a change to the table. Called as record(op, path, value)
+        rest : RestScheduler
+            Posts, pins and edits the messages (as schedule priority)
+        cache : RenderCache
+            Caches the rendered schedules
+        busy : callable
+            Called as busy(guild_id). Returns whether the guild's events are still being changed in bulk
+        window : float, optional
+            How many seconds to collect changes for before editing a board, by default 10.0
+        log : callable, optional
+            Logs failed edits, by default print
+        """
+        self.boards = boards
+        self.record = record
+        self.rest = rest
+        self.cache = cache
+        self.busy = busy
+        self.window = window
+        self.log = log
+
+        self.bot = None
+        self.render = None  # (guild_id) -> str
+        self.channels = {}  # {guild_id: channel_id}, where each guild's board is pinned
+        self.posted = {}  # {guild_id: schedule}, what each board currently shows
+        self.tasks = {}  # {guild_id: debounced update task}
+
+    def start(self, bot: discord.Client, render: callable, channels: dict[int, int]) -> None:
+        """Gives the boards the bot, the function that renders a schedule and the channels to pin them in, then brings every board up to date.
+        Called again on reload, so updates always call the current instance
+
+        Parameters
+        ----------
+        bot : discord.Client
+            The bot
+        render : callable
+            Called as render(guild_id). Returns the guild's schedule
+        channels : dict[int, int]
+            The channel to pin each guild's board in, with the structure {guild_id: channel_id}
+        """
+        self.bot = bot
+        self.render = render
+        self.channels = channels
+
+        for guild_id in channels:
+            self.invalidate(guild_id)
+
+    def get(self, guild_id: int) -> str:
+        """Gets a guild's schedule, rendering it only if it changed since the last time
+
+        Parameters
+        ----------
+        guild_id : int
+            The ID of the guild
+
+        Returns
+        -------
+        str
+            The schedule
+        """
+        return self.cache.get(("schedule", guild_id), lambda: self.render(guild_id), [f"events:{guild_id}"])
+
+    def invalidate(self, guild_id: int) -> None:
+        """Drops a guild's cached schedule (after its events change) and queues an update of its board
+
+        Parameters
+        ----------
+        guild_id : int
+            The ID of the guild
+        """
+        self.cache.invalidate(f"events:{guild_id}")
+
+        if self.render is None or guild_id not in self.channels:
+            return
+
+        task = self.tasks.get(guild_id)
+        if task is None or task.done():
+            self.tasks[guild_id] = asyncio.get_running_loop().create_task(
+                self.update_after_window(guild_id))
+
+    async def update_after_window(self, guild_id: int) -> None:
+        """[task] Waits for the window to pass (and for the guild's event jobs to finish), then updates its board
+
+        Parameters
+        ----------
+        guild_id : int
+            The ID of the guild
+        """
+        await asyncio.sleep(self.window)
+        while self.busy(guild_id):
+            await asyncio.sleep(self.window)
+
+        # changes from here on queue another update
+        self.tasks.pop(guild_id, None)
+
+        try:
+            await self.update(guild_id)
+        except discord.HTTPException as e:
+            self.log(f"Failed to update the schedule board of guild {guild_id}: {e!r}")
+
+    async def update(self, guild_id: int) -> None:
+        """Edits a guild's board with its current schedule, posting and pinning a new board if it doesn't have one (or if it was deleted)
+
+        Parameters
+        ----------
+        guild_id : int
+            The ID of the guild
+        """
+        channel = self.bot.get_channel(self.channels[guild_id])
+        if channel is None:
+            return
+
+        content = self.get(guild_id)
+        board = self.boards.get(str(guild_id))
+
+        if board is not None and board["channel_id"] == channel.id:
+            if self.posted.get(guild_id) == content:
+                return
+
+            try:
+                await self.rest.call("schedule", f"message_edit:{channel.id}", channel.get_partial_message(board["message_id"]).edit,
+                                     content=content)
+                self.posted[guild_id] = content
+                return
+            except discord.NotFound:
+                pass
+
+        message = await self.rest.call("schedule", f"channel_send:{channel.id}", channel.send, content, silent=True)
+        await self.rest.call("schedule", f"pins:{channel.id}", message.pin)
+
+        self.record("set", [str(guild_id)], {
+            "channel_id": channel.id,
+            "message_id": message.id,
+        })
+        self.posted[guild_id] = content
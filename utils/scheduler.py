@@ -0,0 +1,210 @@
+import asyncio
+import heapq
+
+from datetime import datetime
+from itertools import count
+from time import time as now
+
+
+class TimerScheduler:
+    def __init__(self, log: callable = print) -> None:
+        """Initializes the scheduler that runs every timed job in the bot from a single task.
+
+        Timers live in a min-heap of deadlines. The task sleeps until the earliest deadline (or until the heap changes), then starts every due timer in deadline order.
+        Each handler runs in its own task, so a slow handler (like one waiting on a rate limit) never holds up the other timers.
+        Timers are identified by a key and reference their handler by kind, so handlers can be re-registered when cogs are reloaded
+
+        Parameters
+        ----------
+        log : callable, optional
+            Logs handler errors, by default print
+        """
+        self.log = log
+
+        self.heap = []  # [(deadline, seq, key), ...]. Entries whose seq no longer matches self.timers are stale
+        self.timers = {}  # {key: (deadline, seq, kind, args)}
+        self.handlers = {}  # {kind: async handler}
+        self.seq = count()
+
+        self.task = None
+        self.wakeup = None
+        # handlers that are still running. Holding them keeps the loop from garbage collecting them mid-run
+        self.running = set()
+
+    def register(self, kind: str, handler: callable) -> None:
+        """Sets the handler that is awaited when a timer of the given kind goes off
+
+        Parameters
+        ----------
+        kind : str
+            The kind of timer
+        handler : callable
+            The coroutine function to call with the timer's arguments
+        """
+        self.handlers[kind] = handler
+
+    def schedule(self, key: str, deadline: datetime | float, kind: str, *args: any) -> None:
+        """Schedules a timer. A timer with the same key is replaced
+
+        Parameters
+        ----------
+        key : str
+            The unique key of the timer
+        deadline : datetime | float
+            When the timer goes off (naive datetimes are treated as local time, floats as epoch timestamps)
+        kind : str
+            The kind of timer (selects the handler)
+        *args : any
+            The arguments to pass to the handler
+        """
+        if isinstance(deadline, datetime):
+            deadline = deadline.timestamp()
+
+        seq = next(self.seq)
+        self.timers[key] = (deadline, seq, kind, args)
+        heapq.heappush(self.heap, (deadline, seq, key))
+        self.notify()
+
+    def cancel(self, key: str) -> bool:
+        """Cancels a timer
+
+        Parameters
+        ----------
+        key : str
+            The key of the timer
+
+        Returns
+        -------
+        bool
+            Whether the timer existed
+        """
+        # the heap entry is left behind and skipped once it reaches the top
+        return self.timers.pop(key, None) is not None
+
+    def reschedule(self, key: str, deadline: datetime | float) -> bool:
+        """Moves a timer to a new deadline
+
+        Parameters
+        ----------
+        key : str
+            The key of the timer
+        deadline : datetime | float
+            The new deadline
+
+        Returns
+        -------
+        bool
+            Whether the timer existed
+        """
+        if key not in self.timers:
+            return False
+
+        _, _, kind, args = self.timers[key]
+        self.schedule(key, deadline, kind, *args)
+        return True
+
+    def list(self, kind: str = None) -> list[tuple[str, float, tuple]]:
+        """Lists the scheduled timers, earliest first
+
+        Parameters
+        ----------
+        kind : str, optional
+            Only list timers of this kind, by default None (all timers)
+
+        Returns
+        -------
+        list[tuple[str, float, tuple]]
+            The timers with the structure [(key, deadline, args), ...]
+        """
+        timers = [(key, deadline, args) for key, (deadline, _, k, args) in self.timers.items()
+                  if kind is None or k == kind]
+        return sorted(timers, key=lambda t: t[1])
+
+    def deadline(self, key: str) -> float | None:
+        """Gets the deadline of a timer
+
+        Parameters
+        ----------
+        key : str
+            The key of the timer
+
+        Returns
+        -------
+        float | None
+            The deadline as an epoch timestamp, or None if the timer doesn't exist
+        """
+        timer = self.timers.get(key)
+        return timer[0] if timer is not None else None
+
+    def notify(self) -> None:
+        """Wakes the scheduler task up so it can recompute how long to sleep
+        """
+        if self.wakeup is not None:
+            self.wakeup.set()
+
+    def start(self) -> None:
+        """Starts the scheduler task (if it isn't already running). Timers that are already overdue go off right away, in deadline order
+        """
+        if self.task is not None and not self.task.done():
+            return
+
+        self.wakeup = asyncio.Event()
+        self.task = asyncio.get_running_loop().create_task(self.run())
+
+    def stop(self) -> None:
+        """Stops the scheduler task. Scheduled timers are kept
+        """
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def run(self) -> None:
+        """[task] Sleeps until the next deadline and starts every due timer
+        """
+        while True:
+            # drop cancelled/replaced timers from the top of the heap
+            while self.heap and self.timers.get(self.heap[0][2], (None, None))[1] != self.heap[0][1]:
+                heapq.heappop(self.heap)
+
+            self.wakeup.clear()
+
+            if not self.heap:
+                await self.wakeup.wait()
+                continue
+
+            delay = self.heap[0][0] - now()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            _, _, key = heapq.heappop(self.heap)
+            deadline, _, kind, args = self.timers.pop(key)
+
+            handler = asyncio.get_running_loop().create_task(self.fire(key, kind, args))
+            self.running.add(handler)
+            handler.add_done_callback(self.running.discard)
+
+    async def fire(self, key: str, kind: str, args: tuple) -> None:
+        """Runs a timer's handler
+
+        Parameters
+        ----------
+        key : str
+            The key of the timer
+        kind : str
+            The kind of timer
+        args : tuple
+            The arguments to pass to the handler
+        """
+        handler = self.handlers.get(kind)
+        if handler is None:
+            self.log(f"No handler registered for timer {key} ({kind}), dropping it")
+            return
+
+        try:
+            await handler(*args)
+        except Exception as e:
+            self.log(f"Timer {key} ({kind}) failed: {e!r}")
@@ -0,0 +1,157 @@
+from time import time as now
+from urllib.parse import urlparse, parse_qs
+
+
+class SongMetadataCache:
+    def __init__(self, entries: dict[str, dict], record: callable, ttl: float, stream_ttl: float = 60 * 60) -> None:
+        """Initializes the persistent cache of song metadata from yt-dlp, keyed by video ID.
+
+        Re-adding (or looking up) a known song reads its title, uploader and formats from here instead of running the extractor again.
+        A song's resolved stream URL is cached too, until just before YouTube expires it
+
+        Parameters
+        ----------
+        entries : dict[str, dict]
+            The live table backing the cache, with the structure {video_id: metadata}
+        record : callable
+            Persists a change to the table. Called as record(op, path, value)
+        ttl : float
+            The number of seconds metadata is kept for
+        stream_ttl : float, optional
+            The number of seconds a stream URL is kept for if it doesn't say when it expires, by default 1 hour
+        """
+        self.entries = entries
+        self.record = record
+        self.ttl = ttl
+        self.stream_ttl = stream_ttl
+
+        # stats
+        self.hits = 0
+        self.misses = 0
+
+    def video_id(self, url: str) -> str | None:
+        """Gets the video ID from a YouTube URL without running the extractor
+
+        Parameters
+        ----------
+        url : str
+            The YouTube URL (www.youtube.com/watch?v=<id> or youtu.be/<id>)
+
+        Returns
+        -------
+        str | None
+            The video ID, or None if the URL doesn't have one
+        """
+        parsed = urlparse(url)
+
+        if parsed.netloc == "youtu.be":
+            return parsed.path.strip("/") or None
+
+        return parse_qs(parsed.query).get("v", [None])[0]
+
+    def get(self, video_id: str | None) -> dict | None:
+        """Gets a song's cached metadata (if it hasn't expired)
+
+        Parameters
+        ----------
+        video_id : str | None
+            The video ID of the song
+
+        Returns
+        -------
+        dict | None
+            The metadata, with the structure {"id": str, "title": str, "uploader": str, "duration": int, "formats": list[dict], "stream_url": str | None, "stream_expires": float, "expires": float}
+        """
+        entry = self.entries.get(video_id) if video_id is not None else None
+
+        if entry is None or entry["expires"] <= now():
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry
+
+    def stream_url(self, video_id: str | None) -> str | None:
+        """Gets a song's cached stream URL (if it is still valid)
+
+        Parameters
+        ----------
+        video_id : str | None
+            The video ID of the song
+
+        Returns
+        -------
+        str | None
+            The stream URL
+        """
+        entry = self.entries.get(video_id) if video_id is not None else None
+
+        if entry is None or entry["stream_url"] is None or entry["stream_expires"] <= now():
+            return None
+        return entry["stream_url"]
+
+    def put(self, info: dict) -> dict:
+        """Caches the metadata of a song from its yt-dlp info
+
+        Parameters
+        ----------
+        info : dict
+            The info returned by yt-dlp's extract_info (after format selection)
+
+        Returns
+        -------
+        dict
+            The cached metadata
+        """
+        stream_url = info.get("url") if info.get("protocol", "https") in ["http", "https"] else None
+
+        # youtube stream URLs say when they expire, leave a few minutes of leeway
+        stream_expires = now() + self.stream_ttl
+        if stream_url is not None:
+            expire = parse_qs(urlparse(stream_url).query).get("expire", [None])[0]
+            if expire is not None and expire.isdigit():
+                stream_expires = int(expire) - 5 * 60
+
+        entry = {
+            "id": info["id"],
+            "title": info["title"],
+            "uploader": info["uploader"],
+            "duration": info.get("duration"),
+            "formats": [{"format_id": f.get("format_id"), "ext": f.get("ext"), "acodec": f.get("acodec"), "abr": f.get("abr")}
+                        for f in info.get("formats", []) if f.get("vcodec") == "none"],  # audio only
+            "stream_url": stream_url,
+            "stream_expires": stream_expires,
+            "expires": now() + self.ttl,
+        }
+
+        self.record("set", [info["id"]], entry)
+        return entry
+
+    def purge(self) -> int:
+        """Removes every expired entry
+
+        Returns
+        -------
+        int
+            The number of entries removed
+        """
+        expired = [video_id for video_id, entry in list(self.entries.items()) if entry["expires"] <= now()]
+
+        for video_id in expired:
+            self.record("delete", [video_id])
+
+        return len(expired)
+
+    def stats(self) -> dict:
+        """Gets the cache's stats
+
+        Returns
+        -------
+        dict
+            The stats: cached songs, hits and misses
+        """
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,131 @@
+import asyncio
+
+from time import perf_counter
+
+from utils.storage import StorageBackend
+
+
+class StateWriter:
+    def __init__(self, backend: StorageBackend, window: float = 2.0) -> None:
+        """Initializes the background writer that coalesces bursts of state changes into a single write.
+
+        Changes are only marked as pending when they happen. Once the window after the first pending change passes, every change marked in the meantime is handed to the backend in one off-loop batch
+
+        Parameters
+        ----------
+        backend : StorageBackend
+            The backend that the changes are written to
+        window : float, optional
+            How many seconds to collect changes for before writing them, by default 2.0
+        """
+        self.backend = backend
+        self.window = window
+
+        self.pending = []
+        self.task = None
+        self.lock = None
+
+        # stats to see how much I/O the coalescing saves
+        self.marked = 0  # changes marked since startup (each one used to be its own file rewrite)
+        self.written = 0  # changes actually written (superseded changes are dropped)
+        self.flushes = 0  # number of batched writes
+        self.last_latency = 0.0
+        self.total_latency = 0.0
+
+    def mark(self, change: dict) -> None:
+        """Marks a change as pending and makes sure a flush is scheduled
+
+        Parameters
+        ----------
+        change : dict
+            The change, with the structure {"table": str, "op": str, "path": list, "value": any}
+        """
+        self.pending.append(change)
+        self.marked += 1
+
+        if self.task is not None and not self.task.done():
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:  # the bot's loop isn't running yet. Pending changes are written by the first flush
+            return
+
+        self.task = loop.create_task(self.flush_after_window())
+
+    async def flush_after_window(self) -> None:
+        """[task] Waits for the window to pass, then writes everything marked in the meantime. Keeps going until nothing is pending
+        """
+        while True:
+            await asyncio.sleep(self.window)
+            await self.flush()
+
+            # changes marked while the batch was being written saw this task still running, so they're written by it too
+            if len(self.pending) == 0:
+                return
+
+    def coalesce(self, changes: list[dict]) -> list[dict]:
+        """Drops every "set" change that is overwritten by a later "set" of the same value in the batch (like a user re-voting or a map weight changing several times)
+
+        Parameters
+        ----------
+        changes : list[dict]
+            The changes, in order
+
+        Returns
+        -------
+        list[dict]
+            The changes that still need to be written, in order
+        """
+        seen = set()
+        kept = []
+
+        for change in reversed(changes):
+            if change["op"] == "set":
+                key = (change["table"], tuple(str(k) for k in change["path"]))
+                if key in seen:
+                    continue
+                seen.add(key)
+
+            kept.append(change)
+
+        kept.reverse()
+        return kept
+
+    async def flush(self) -> None:
+        """Writes every pending change right away (also used on shutdown)
+        """
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+
+        async with self.lock:
+            if len(self.pending) == 0:
+                return
+
+            changes = self.coalesce(self.pending)
+            self.pending = []
+
+            start = perf_counter()
+            await self.backend.apply(changes)
+
+            self.last_latency = perf_counter() - start
+            self.total_latency += self.last_latency
+            self.written += len(changes)
+            self.flushes += 1
+
+    def stats(self) -> dict:
+        """Gets the writer's stats
+
+        Returns
+        -------
+        dict
+            The stats: changes marked and written, batched writes, writes saved by coalescing, and flush latencies (in ms)
+        """
+        return {
+            "marked": self.marked,
+            "written": self.written,
+            "flushes": self.flushes,
+            "coalesced_writes": self.marked - self.flushes,
+            "last_flush_ms": round(self.last_latency * 1000, 2),
+            "avg_flush_ms": round(self.total_latency * 1000 / self.flushes, 2) if self.flushes else 0.0,
+        }
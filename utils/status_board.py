@@ -0,0 +1,230 @@
+import asyncio
+
+import discord
+
+from utils.rest_scheduler import RestScheduler
+
+
+class StatusBoard:
+    def __init__(self, boards: dict[str, dict], record: callable, rest: RestScheduler, window: float = 5.0, log: callable = print) -> None:
+        """Initializes the live status boards: one message per premier event, posted at its first reminder and edited in place as the event moves through its stages.
+
+        RSVP changes are applied as debounced edits, so a burst of RSVPs costs a single edit
+
+        Parameters
+        ----------
+        boards : dict[str, dict]
+            The live table backing the boards, with the structure {event_id: {"guild_id": int, "channel_id": int, "message_id": int, "stage": str}}
+        record : callable
+            Persists a change to the table. Called as record(op, path, value)
+        rest : RestScheduler
+            Sends and edits the messages (as reminder priority)
+        window : float, optional
+            How many seconds to collect RSVP changes for before editing a board, by default 5.0
+        log : callable, optional
+            Logs failed edits, by default print
+        """
+        self.boards = boards
+        self.record = record
+        self.rest = rest
+        self.window = window
+        self.log = log
+
+        self.bot = None
+        self.render = None  # (guild_id, event_id, stage) -> str | None
+        self.tasks = {}  # {event_id: debounced refresh task}
+
+    def start(self, bot: discord.Client, render: callable) -> None:
+        """Gives the boards the bot to look their channels up with and the function that builds their content.
+        Called again on reload, so refreshes always call the current instance
+
+        Parameters
+        ----------
+        bot : discord.Client
+            The bot
+        render : callable
+            Called as render(guild_id, event_id, stage). Returns the board's content, or None if the event no longer exists
+        """
+        self.bot = bot
+        self.render = render
+
+    def get(self, event_id: int) -> dict | None:
+        """Gets the board of an event
+
+        Parameters
+        ----------
+        event_id : int
+            The ID of the event
+
+        Returns
+        -------
+        dict | None
+            The board, or None if the event doesn't have one
+        """
+        return self.boards.get(str(event_id))
+
+    async def post(self, channel: discord.TextChannel, guild_id: int, event_id: int, stage: str, on_sent: callable = None) -> None:
+        """Moves an event's board to a new stage, posting the board if the event doesn't have one yet (or if it was deleted)
+
+        Parameters
+        ----------
+        channel : discord.TextChannel
+            The channel to post a new board in
+        guild_id : int
+            The ID of the event's guild
+        event_id : int
+            The ID of the event
+        stage : str
+            The stage the event is at (a reminder type)
+        on_sent : callable, optional
+            Called with the message when a new board is posted, by default None
+        """
+        content = self.render(guild_id, event_id, stage)
+        if content is None:
+            return
+
+        self.cancel_refresh(event_id)
+
+        board = self.get(event_id)
+        if board is not None and await self.edit(board, content):
+            self.record("set", [str(event_id)], {**board, "stage": stage})
+            return
+
+        message = await self.rest.call("reminder", f"channel_send:{channel.id}", channel.send, content, silent=True)
+        self.record("set", [str(event_id)], {
+            "guild_id": guild_id,
+            "channel_id": channel.id,
+            "message_id": message.id,
+            "stage": stage,
+        })
+
+        if on_sent is not None:
+            on_sent(message)
+
+    async def edit(self, board: dict, content: str) -> bool:
+        """Edits a board's message
+
+        Parameters
+        ----------
+        board : dict
+            The board
+        content : str
+            The new content
+
+        Returns
+        -------
+        bool
+            Whether the message was edited (False if it no longer exists)
+        """
+        channel = self.channel_of(board)
+        if channel is None:
+            return False
+
+        try:
+            await self.rest.call("reminder", f"message_edit:{channel.id}", channel.get_partial_message(board["message_id"]).edit,
+                                 content=content)
+        except discord.NotFound:
+            return False
+
+        return True
+
+    def channel_of(self, board: dict) -> discord.abc.Messageable | None:
+        """Gets the channel of a board's message
+
+        Parameters
+        ----------
+        board : dict
+            The board
+
+        Returns
+        -------
+        discord.abc.Messageable | None
+            The channel, or None if the bot can't see it
+        """
+        return self.bot.get_channel(board["channel_id"]) if self.bot is not None else None
+
+    def refresh(self, event_id: int) -> None:
+        """Queues an edit of an event's board (e.g. after an RSVP change). Every refresh within the window is applied in the same edit
+
+        Parameters
+        ----------
+        event_id : int
+            The ID of the event
+        """
+        if self.get(event_id) is None or self.render is None:
+            return
+
+        task = self.tasks.get(event_id)
+        if task is None or task.done():
+            self.tasks[event_id] = asyncio.get_running_loop().create_task(
+                self.refresh_after_window(event_id))
+
+    async def refresh_after_window(self, event_id: int) -> None:
+        """[task] Waits for the window to pass, then re-renders and edits an event's board
+
+        Parameters
+        ----------
+        event_id : int
+            The ID of the event
+        """
+        await asyncio.sleep(self.window)
+        self.tasks.pop(event_id, None)
+
+        board = self.get(event_id)
+        if board is None:
+            return
+
+        content = self.render(board["guild_id"], event_id, board["stage"])
+        if content is None:
+            return
+
+        try:
+            if not await self.edit(board, content):
+                self.close(event_id)
+        except discord.HTTPException as e:
+            self.log(f"Failed to refresh the status board of event {event_id}: {e!r}")
+
+    def cancel_refresh(self, event_id: int) -> None:
+        """Drops an event's queued refresh (if any)
+
+        Parameters
+        ----------
+        event_id : int
+            The ID of the event
+        """
+        task = self.tasks.pop(event_id, None)
+        if task is not None and not task.done():
+            task.cancel()
+
+    def close(self, event_id: int) -> None:
+        """Stops tracking an event's board (once the event is over). The message itself is cleaned up with the other reminder messages
+
+        Parameters
+        ----------
+        event_id : int
+            The ID of the event
+        """
+        self.cancel_refresh(event_id)
+        if self.get(event_id) is not None:
+            self.record("delete", [str(event_id)])
+
+    def prune(self, is_live: callable) -> int:
+        """Closes the boards of every event that is over (e.g. it ended while the bot was offline)
+
+        Parameters
+        ----------
+        is_live : callable
+            Called as is_live(guild_id, event_id). Returns whether the event is still scheduled or active
+
+        Returns
+        -------
+        int
+            The number of boards closed
+        """
+        over = [int(event_id) for event_id, board in list(self.boards.items())
+                if not is_live(board["guild_id"], int(event_id))]
+
+        for event_id in over:
+            self.close(event_id)
+
+        return len(over)
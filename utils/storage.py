@@ -0,0 +1,672 @@
+import abc
+import asyncio
+import json
+import sqlite3
+
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.journal import Journal
+
+
+# how each journal table is laid out in the sql backends: (sql_table, key_columns, value_column)
+# the map pool is a plain list, so it gets its own single-column table
+SQL_TABLES = {
+    "preferences": ("map_preferences", ("map_name", "user_id"), "preference"),
+    "weights": ("map_weights", ("map_name",), "weight"),
+    "reminders": ("reminders", ("guild_id", "due_at"), "message"),
+    "notes": ("notes", ("map_name", "note_id"), "description"),
+}
+
+SQL_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS map_pool (map_name TEXT PRIMARY KEY)",
+    # maps with no votes still need to exist, so the list of maps is kept separately from the votes
+    "CREATE TABLE IF NOT EXISTS maps (map_name TEXT PRIMARY KEY)",
+    "CREATE TABLE IF NOT EXISTS map_preferences (map_name TEXT NOT NULL, user_id TEXT NOT NULL, preference TEXT NOT NULL, PRIMARY KEY (map_name, user_id))",
+    "CREATE INDEX IF NOT EXISTS map_preferences_user ON map_preferences (user_id)",
+    "CREATE TABLE IF NOT EXISTS map_weights (map_name TEXT PRIMARY KEY, weight INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS reminders (guild_id TEXT NOT NULL, due_at TEXT NOT NULL, message TEXT NOT NULL, PRIMARY KEY (guild_id, due_at))",
+    "CREATE INDEX IF NOT EXISTS reminders_due ON reminders (due_at)",
+    "CREATE TABLE IF NOT EXISTS notes (map_name TEXT NOT NULL, note_id TEXT NOT NULL, description TEXT NOT NULL, PRIMARY KEY (map_name, note_id))",
+    # every other (flat) table is kept as json values in a generic key-value table
+    "CREATE TABLE IF NOT EXISTS kv_store (table_name TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, PRIMARY KEY (table_name, key))",
+]
+
+
+# note ids are message snowflakes, so shorter ids are older. Sorting by length first keeps the notes in the order they were added
+NOTES_ORDER = "ORDER BY LENGTH(note_id), note_id"
+
+
+# a database is seeded from the local_storage files once, the first time it is used
+SEEDED_TABLE = "__meta__"
+SEEDED_CHECK = f"SELECT COUNT(*) FROM kv_store WHERE table_name = '{SEEDED_TABLE}'"
+
+
+def flatten(value: any, depth: int) -> list[tuple]:
+    """Flattens a nested dict into rows of keys followed by the value
+
+    Parameters
+    ----------
+    value : any
+        The nested dict (or leaf value if depth is 0)
+    depth : int
+        The number of key levels left to flatten
+
+    Returns
+    -------
+    list[tuple]
+        The rows with the structure [(key_1, ..., key_depth, value), ...]
+    """
+    if depth == 0:
+        return [(value,)]
+
+    return [(str(key),) + row for key, sub in value.items() for row in flatten(sub, depth - 1)]
+
+
+def sql_statements(change: dict, dialect: str = "sqlite") -> list[tuple[str, tuple]]:
+    """Translates a journal change into the sql statements that apply it
+
+    Parameters
+    ----------
+    change : dict
+        The change, with the structure {"table": str, "op": str, "path": list, "value": any}
+    dialect : str, optional
+        "sqlite" or "postgres". Only changes inside a key-value entry's json need dialect specific sql, by default "sqlite"
+
+    Returns
+    -------
+    list[tuple[str, tuple]]
+        The statements with "?" placeholders and their arguments, with the structure [(sql, args), ...]
+    """
+    table, op = change["table"], change["op"]
+    path = tuple(str(key) for key in change.get("path", []))
+    value = change.get("value")
+
+    if table == "pool":
+        if op == "add":
+            return [("INSERT INTO map_pool (map_name) VALUES (?) ON CONFLICT DO NOTHING", (value,))]
+        if op == "remove":
+            return [("DELETE FROM map_pool WHERE map_name = ?", (value,))]
+        return [("DELETE FROM map_pool", ())]
+
+    if table not in SQL_TABLES:  # flat table in the key-value store
+        if len(path) > 1 and op in ["set", "delete"]:  # a field inside an entry, so only that field is rewritten
+            return [json_field_statement(table, path, op, value, dialect)]
+        if op == "set":
+            return [("INSERT INTO kv_store (table_name, key, value) VALUES (?, ?, ?) ON CONFLICT (table_name, key) DO UPDATE SET value = excluded.value", (table, path[0], json.dumps(value)))]
+        if op == "delete":
+            return [("DELETE FROM kv_store WHERE table_name = ? AND key = ?", (table, path[0]))]
+        return [("DELETE FROM kv_store WHERE table_name = ?", (table,))]
+
+    sql_table, keys, value_column = SQL_TABLES[table]
+    where = " AND ".join(f"{k} = ?" for k in keys[:len(path)])
+    delete = f"DELETE FROM {sql_table}" + (f" WHERE {where}" if where else "")
+
+    statements = []
+
+    # the votes table needs the map to exist in the maps table (and disappear with it)
+    if table == "preferences":
+        if op == "set":
+            statements.append(
+                ("INSERT INTO maps (map_name) VALUES (?) ON CONFLICT DO NOTHING", path[:1]))
+        elif len(path) <= 1:
+            statements.append(
+                ("DELETE FROM maps" + (" WHERE map_name = ?" if path else ""), path))
+
+    if op in ["delete", "clear"] or len(path) < len(keys):
+        statements.append((delete, path))
+
+    if op == "set":
+        columns = ", ".join(keys + (value_column,))
+        placeholders = ", ".join("?" for _ in range(len(keys) + 1))
+        upsert = f"INSERT INTO {sql_table} ({columns}) VALUES ({placeholders}) ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {value_column} = excluded.{value_column}"
+        statements += [(upsert, path + row)
+                       for row in flatten(value, len(keys) - len(path))]
+
+    return statements
+
+
+def json_field_statement(table: str, path: tuple, op: str, value: any, dialect: str) -> tuple[str, tuple]:
+    """Builds the sql that sets or deletes a field inside a key-value entry's json value
+
+    Parameters
+    ----------
+    table : str
+        The journal table
+    path : tuple
+        The entry's key followed by the keys leading to the field
+    op : str
+        "set" or "delete"
+    value : any
+        The value to set
+    dialect : str
+        "sqlite" or "postgres"
+
+    Returns
+    -------
+    tuple
+        The statement with "?" placeholders and its arguments, with the structure (sql, args)
+    """
+    where = "WHERE table_name = ? AND key = ?"
+
+    if dialect == "postgres":
+        if op == "set":
+            return (f"UPDATE kv_store SET value = jsonb_set(value::jsonb, ?::text[], ?::jsonb)::text {where}", (list(path[1:]), json.dumps(value), table, path[0]))
+        return (f"UPDATE kv_store SET value = (value::jsonb #- ?::text[])::text {where}", (list(path[1:]), table, path[0]))
+
+    field = "$" + "".join(f'."{key}"' for key in path[1:])
+    if op == "set":
+        return (f"UPDATE kv_store SET value = json_set(value, ?, json(?)) {where}", (field, json.dumps(value), table, path[0]))
+    return (f"UPDATE kv_store SET value = json_remove(value, ?) {where}", (field, table, path[0]))
+
+
+def rows_to_state(pool: list, maps: list, rows: dict[str, list[tuple]], kv_rows: list[tuple], tables: list[str]) -> dict:
+    """Builds the in-memory state from sql rows
+
+    Parameters
+    ----------
+    pool : list
+        The rows of the map_pool table
+    maps : list
+        The rows of the maps table
+    rows : dict[str, list[tuple]]
+        The rows of each keyed table, with the structure {journal_table: [(key_1, ..., value), ...]}
+    kv_rows : list[tuple]
+        The rows of the key-value store, with the structure [(table_name, key, json_value), ...]
+    tables : list[str]
+        Every table the bot keeps (so empty key-value tables still exist in the state)
+
+    Returns
+    -------
+    dict
+        The state with the structure {table_name: table_data}
+    """
+    state = {"pool": sorted(r[0] for r in pool)}
+
+    for table, table_rows in rows.items():
+        data = {r[0]: {} for r in maps} if table == "preferences" else {}
+        for row in table_rows:
+            parent = data
+            for key in row[:-2]:
+                parent = parent.setdefault(key, {})
+            parent[row[-2]] = row[-1]
+        state[table] = data
+
+    for table in tables:
+        state.setdefault(table, {})
+
+    for table, key, value in kv_rows:
+        if table in state:
+            state[table][key] = json.loads(value)
+
+    return state
+
+
+class StorageBackend(abc.ABC):
+    def __init__(self, directory: str, tables: dict[str, str]) -> None:
+        """Initializes a persistence backend for the bot's state (map pool, votes, weights, reminders, and notes).
+
+        Besides loading the state at startup, backends answer indexed queries (votes by user, reminders by guild or due time, notes by map).
+        Changes reach the backend in debounced batches, so flush the state writer before querying
+
+        Parameters
+        ----------
+        directory : str
+            The local storage directory (holds the snapshot files that a fresh database is seeded from)
+        tables : dict[str, str]
+            The tables to keep, with the structure {table_name: snapshot_filename}
+        """
+        self.directory = directory
+        self.tables = tables
+
+    @abc.abstractmethod
+    def load(self) -> dict:
+        """Loads the full state (called once at startup, before the event loop is running)
+
+        Returns
+        -------
+        dict
+            The state with the structure {table_name: table_data}
+        """
+        pass
+
+    def seed_state(self) -> dict:
+        """Reads the state from the local snapshot files (and journal), used to seed an empty database
+
+        Returns
+        -------
+        dict
+            The state with the structure {table_name: table_data}
+        """
+        journal = Journal(self.directory, self.tables)
+        state = journal.load()
+        journal.close()
+        return state
+
+    def seed_changes(self, state: dict) -> list[dict]:
+        """Turns a full state into the changes that recreate it
+
+        Parameters
+        ----------
+        state : dict
+            The state with the structure {table_name: table_data}
+
+        Returns
+        -------
+        list[dict]
+            The changes to apply
+        """
+        changes = [{"table": "pool", "op": "add", "value": m}
+                   for m in state.get("pool", [])]
+
+        for table in self.tables:
+            if table == "pool":
+                continue
+            changes += [{"table": table, "op": "set", "path": [key], "value": value}
+                        for key, value in state.get(table, {}).items()]
+
+        # mark the database as seeded so it is never seeded again (even if every table is empty)
+        changes.append({"table": SEEDED_TABLE, "op": "set",
+                       "path": ["seeded"], "value": True})
+
+        return changes
+
+    async def open(self) -> None:
+        """Opens any connections that need the bot's event loop
+        """
+        pass
+
+    @abc.abstractmethod
+    async def apply(self, changes: list[dict]) -> None:
+        """Writes a batch of changes
+
+        Parameters
+        ----------
+        changes : list[dict]
+            The changes to write, in order
+        """
+        pass
+
+    async def close(self) -> None:
+        """Closes the backend (pending changes should be flushed first)
+        """
+        pass
+
+    @abc.abstractmethod
+    async def votes_for_user(self, user_id: int | str) -> dict[str, str]:
+        """Gets every map vote a user has made
+
+        Parameters
+        ----------
+        user_id : int | str
+            The ID of the user
+
+        Returns
+        -------
+        dict[str, str]
+            The votes with the structure {map: preference}
+        """
+        pass
+
+    @abc.abstractmethod
+    async def reminders_due_before(self, when: str) -> list[tuple[str, str, str]]:
+        """Gets every stored reminder that goes off before a given time, earliest first
+
+        Parameters
+        ----------
+        when : str
+            The ISO formatted cutoff time
+
+        Returns
+        -------
+        list[tuple[str, str, str]]
+            The reminders with the structure [(guild_id, reminder_time, reminder_message), ...]
+        """
+        pass
+
+    @abc.abstractmethod
+    async def reminders_for_guild(self, guild_id: int | str) -> list[tuple[str, str]]:
+        """Gets every stored reminder of a guild, earliest first
+
+        Parameters
+        ----------
+        guild_id : int | str
+            The ID of the guild
+
+        Returns
+        -------
+        list[tuple[str, str]]
+            The reminders with the structure [(reminder_time, reminder_message), ...]
+        """
+        pass
+
+    @abc.abstractmethod
+    async def notes_for_map(self, map_name: str) -> dict[str, str]:
+        """Gets every practice note reference for a map, oldest first
+
+        Parameters
+        ----------
+        map_name : str
+            The map to get the notes for
+
+        Returns
+        -------
+        dict[str, str]
+            The notes with the structure {note_message_id: note_description}
+        """
+        pass
+
+
+class JournalBackend(StorageBackend):
+    def __init__(self, directory: str, tables: dict[str, str]) -> None:
+        """Initializes the default backend, which keeps the state in local_storage files behind an append-only journal
+
+        Parameters
+        ----------
+        directory : str
+            The directory holding the snapshot files and the journal
+        tables : dict[str, str]
+            The tables to keep, with the structure {table_name: snapshot_filename}
+        """
+        super().__init__(directory, tables)
+        self.journal = Journal(directory, tables)
+
+    def load(self) -> dict:
+        return self.journal.load()
+
+    async def apply(self, changes: list[dict]) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.journal.append_many, changes)
+
+    async def close(self) -> None:
+        self.journal.close()
+
+    async def votes_for_user(self, user_id: int | str) -> dict[str, str]:
+        with self.journal.lock:
+            return {m: votes[str(user_id)] for m, votes in self.journal.state["preferences"].items() if str(user_id) in votes}
+
+    async def reminders_due_before(self, when: str) -> list[tuple[str, str, str]]:
+        with self.journal.lock:
+            due = [(g, t, m) for g, reminders in self.journal.state["reminders"].items()
+                   for t, m in reminders.items() if t < when]
+
+        return sorted(due, key=lambda r: r[1])
+
+    async def reminders_for_guild(self, guild_id: int | str) -> list[tuple[str, str]]:
+        with self.journal.lock:
+            return sorted(self.journal.state["reminders"].get(str(guild_id), {}).items())
+
+    async def notes_for_map(self, map_name: str) -> dict[str, str]:
+        with self.journal.lock:
+            return dict(self.journal.state["notes"].get(map_name, {}))
+
+
+class SQLiteBackend(StorageBackend):
+    def __init__(self, directory: str, tables: dict[str, str], db_path: str) -> None:
+        """Initializes the embedded sqlite backend. All queries run on a single worker thread so the event loop is never blocked
+
+        Parameters
+        ----------
+        directory : str
+            The local storage directory (used to seed an empty database)
+        tables : dict[str, str]
+            The tables to keep, with the structure {table_name: snapshot_filename}
+        db_path : str
+            The path of the sqlite database file
+        """
+        super().__init__(directory, tables)
+        self.db_path = db_path
+        self.db = None
+        # one thread, so queries never overlap and always run in submission order
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def load(self) -> dict:
+        self.db = sqlite3.connect(self.db_path, check_same_thread=False)
+        for statement in SQL_SCHEMA:
+            self.db.execute(statement)
+
+        if self.db.execute(SEEDED_CHECK).fetchone()[0] == 0:
+            self.execute_changes(self.seed_changes(self.seed_state()))
+
+        return self.fetch_state()
+
+    def fetch_state(self) -> dict:
+        """Reads the full state out of the database
+
+        Returns
+        -------
+        dict
+            The state with the structure {table_name: table_data}
+        """
+        pool = self.db.execute("SELECT map_name FROM map_pool").fetchall()
+        maps = self.db.execute("SELECT map_name FROM maps").fetchall()
+        rows = {table: self.db.execute(f"SELECT {', '.join(keys + (value,))} FROM {sql_table}").fetchall()
+                for table, (sql_table, keys, value) in SQL_TABLES.items()}
+        kv_rows = self.db.execute("SELECT table_name, key, value FROM kv_store").fetchall()
+
+        return rows_to_state(pool, maps, rows, kv_rows, list(self.tables))
+
+    def execute_changes(self, changes: list[dict]) -> None:
+        """Applies a batch of changes in a single transaction
+
+        Parameters
+        ----------
+        changes : list[dict]
+            The changes to apply, in order
+        """
+        with self.db:
+            for change in changes:
+                for sql, args in sql_statements(change):
+                    self.db.execute(sql, args)
+
+    def query(self, sql: str, args: tuple = ()) -> list[tuple]:
+        """Runs a read query
+
+        Parameters
+        ----------
+        sql : str
+            The query
+        args : tuple, optional
+            The query arguments, by default ()
+
+        Returns
+        -------
+        list[tuple]
+            The resulting rows
+        """
+        return self.db.execute(sql, args).fetchall()
+
+    async def run(self, func: callable, *args: any) -> any:
+        """Runs a database function on the worker thread
+
+        Parameters
+        ----------
+        func : callable
+            The function to run
+        *args : any
+            The function's arguments
+
+        Returns
+        -------
+        any
+            Whatever the function returns
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def apply(self, changes: list[dict]) -> None:
+        await self.run(self.execute_changes, changes)
+
+    async def close(self) -> None:
+        await self.run(self.db.close)
+        self.executor.shutdown()
+
+    async def votes_for_user(self, user_id: int | str) -> dict[str, str]:
+        rows = await self.run(self.query, "SELECT map_name, preference FROM map_preferences WHERE user_id = ?", (str(user_id),))
+        return dict(rows)
+
+    async def reminders_due_before(self, when: str) -> list[tuple[str, str, str]]:
+        return await self.run(self.query, "SELECT guild_id, due_at, message FROM reminders WHERE due_at < ? ORDER BY due_at", (when,))
+
+    async def reminders_for_guild(self, guild_id: int | str) -> list[tuple[str, str]]:
+        return await self.run(self.query, "SELECT due_at, message FROM reminders WHERE guild_id = ? ORDER BY due_at", (str(guild_id),))
+
+    async def notes_for_map(self, map_name: str) -> dict[str, str]:
+        rows = await self.run(self.query, f"SELECT note_id, description FROM notes WHERE map_name = ? {NOTES_ORDER}", (map_name,))
+        return dict(rows)
+
+
+def numbered(sql: str) -> str:
+    """Converts "?" placeholders into postgres' "$1, $2, ..." placeholders
+
+    Parameters
+    ----------
+    sql : str
+        The sql with "?" placeholders
+
+    Returns
+    -------
+    str
+        The sql with numbered placeholders
+    """
+    parts = sql.split("?")
+    return "".join(f"{part}${i}" for i, part in enumerate(parts[:-1], start=1)) + parts[-1]
+
+
+class PostgresBackend(StorageBackend):
+    def __init__(self, directory: str, tables: dict[str, str], dsn: str) -> None:
+        """Initializes the postgres backend, which writes through an asyncpg connection pool using prepared statements
+
+        Parameters
+        ----------
+        directory : str
+            The local storage directory (used to seed an empty database)
+        tables : dict[str, str]
+            The tables to keep, with the structure {table_name: snapshot_filename}
+        dsn : str
+            The postgres connection string
+        """
+        super().__init__(directory, tables)
+        self.dsn = dsn
+        self.pool = None
+
+    def load(self) -> dict:
+        # the bot's loop is not running yet (this runs at import), so use a throwaway connection
+        return asyncio.run(self.load_once())
+
+    async def load_once(self) -> dict:
+        """Creates the schema, seeds an empty database, and reads the full state using a single connection
+
+        Returns
+        -------
+        dict
+            The state with the structure {table_name: table_data}
+        """
+        import asyncpg
+
+        conn = await asyncpg.connect(self.dsn)
+        try:
+            for statement in SQL_SCHEMA:
+                await conn.execute(statement)
+
+            if await conn.fetchval(SEEDED_CHECK) == 0:
+                await self.execute_changes(conn, self.seed_changes(self.seed_state()))
+
+            pool = await conn.fetch("SELECT map_name FROM map_pool")
+            maps = await conn.fetch("SELECT map_name FROM maps")
+            rows = {table: [tuple(r) for r in await conn.fetch(f"SELECT {', '.join(keys + (value,))} FROM {sql_table}")]
+                    for table, (sql_table, keys, value) in SQL_TABLES.items()}
+            kv_rows = [tuple(r) for r in await conn.fetch("SELECT table_name, key, value FROM kv_store")]
+        finally:
+            await conn.close()
+
+        return rows_to_state(pool, maps, rows, kv_rows, list(self.tables))
+
+    async def execute_changes(self, conn: any, changes: list[dict]) -> None:
+        """Applies a batch of changes in a single transaction. Consecutive uses of the same statement are sent as one prepared executemany
+
+        Parameters
+        ----------
+        conn : asyncpg.Connection
+            The connection to use
+        changes : list[dict]
+            The changes to apply, in order
+        """
+        batches = []  # [(sql, [args, ...]), ...]
+        for change in changes:
+            for sql, args in sql_statements(change, "postgres"):
+                if batches and batches[-1][0] == sql:
+                    batches[-1][1].append(args)
+                else:
+                    batches.append((sql, [args]))
+
+        async with conn.transaction():
+            for sql, args_list in batches:
+                statement = await conn.prepare(numbered(sql))
+                await statement.executemany(args_list)
+
+    async def open(self) -> None:
+        import asyncpg
+
+        self.pool = await asyncpg.create_pool(self.dsn, min_size=1, max_size=5)
+
+    async def apply(self, changes: list[dict]) -> None:
+        async with self.pool.acquire() as conn:
+            await self.execute_changes(conn, changes)
+
+    async def close(self) -> None:
+        if self.pool is not None:
+            await self.pool.close()
+
+    async def votes_for_user(self, user_id: int | str) -> dict[str, str]:
+        rows = await self.pool.fetch("SELECT map_name, preference FROM map_preferences WHERE user_id = $1", str(user_id))
+        return {r["map_name"]: r["preference"] for r in rows}
+
+    async def reminders_due_before(self, when: str) -> list[tuple[str, str, str]]:
+        rows = await self.pool.fetch("SELECT guild_id, due_at, message FROM reminders WHERE due_at < $1 ORDER BY due_at", when)
+        return [tuple(r) for r in rows]
+
+    async def reminders_for_guild(self, guild_id: int | str) -> list[tuple[str, str]]:
+        rows = await self.pool.fetch("SELECT due_at, message FROM reminders WHERE guild_id = $1 ORDER BY due_at", str(guild_id))
+        return [tuple(r) for r in rows]
+
+    async def notes_for_map(self, map_name: str) -> dict[str, str]:
+        rows = await self.pool.fetch(f"SELECT note_id, description FROM notes WHERE map_name = $1 {NOTES_ORDER}", map_name)
+        return {r["note_id"]: r["description"] for r in rows}
+
+
+def create_backend(name: str, directory: str, tables: dict[str, str], database_url: str = None) -> StorageBackend:
+    """Creates the persistence backend with the given name
+
+    Parameters
+    ----------
+    name : str
+        The backend to use ("journal", "sqlite", or "postgres")
+    directory : str
+        The local storage directory
+    tables : dict[str, str]
+        The tables to keep, with the structure {table_name: snapshot_filename}
+    database_url : str, optional
+        The postgres connection string (only used by the postgres backend), by default None
+
+    Returns
+    -------
+    StorageBackend
+        The backend
+
+    Raises
+    ------
+    ValueError
+        If the backend name is unknown or postgres is selected without a database url
+    """
+    match name:
+        case "journal":
+            return JournalBackend(directory, tables)
+        case "sqlite":
+            return SQLiteBackend(directory, tables, f"{directory}/bot.sqlite3")
+        case "postgres":
+            if not database_url:
+                raise ValueError(
+                    "BOT_DATABASE_URL must be set to use the postgres storage backend")
+            return PostgresBackend(directory, tables, database_url)
+        case _:
+            raise ValueError(f"Unknown storage backend: {name}")
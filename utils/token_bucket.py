@@ -0,0 +1,64 @@
+import asyncio
+
+from time import monotonic
+
+
+class TokenBucket:
+    def __init__(self, rate: float, per: float, capacity: int = None) -> None:
+        """Initializes a token bucket that paces requests to a rate limit (like Discord's 5 event creations per minute).
+
+        Tokens refill continuously, so a burst of up to capacity requests goes out right away and the rest are spread evenly
+
+        Parameters
+        ----------
+        rate : float
+            How many tokens are refilled every `per` seconds
+        per : float
+            The refill period in seconds
+        capacity : int, optional
+            The most tokens the bucket can hold, by default rate
+        """
+        self.rate = rate / per  # tokens per second
+        self.capacity = capacity if capacity is not None else rate
+
+        self.tokens = float(self.capacity)
+        self.updated = monotonic()
+        self.blocked_until = 0.0
+        self.lock = None
+
+    def refill(self) -> None:
+        """Adds the tokens that have refilled since the last update
+        """
+        current = monotonic()
+        self.tokens = min(self.capacity, self.tokens +
+                          (current - self.updated) * self.rate)
+        self.updated = current
+
+    async def acquire(self) -> None:
+        """Waits until a token is available, then takes it. Waiters are served in order
+        """
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+
+        async with self.lock:
+            while True:
+                self.refill()
+
+                wait = self.blocked_until - monotonic()
+                if wait <= 0 and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep(max(wait, (1 - self.tokens) / self.rate))
+
+    def penalize(self, retry_after: float) -> None:
+        """Empties the bucket and blocks it for a while (when the server says the limit was hit anyway)
+
+        Parameters
+        ----------
+        retry_after : float
+            How many seconds to block the bucket for
+        """
+        self.tokens = 0.0
+        self.updated = monotonic()
+        self.blocked_until = max(self.blocked_until, monotonic() + retry_after)
@@ -0,0 +1,149 @@
+from bisect import bisect_left, insort
+
+
+class WeightLedger:
+    def __init__(self, weights: dict[str, int], values: dict[str, int]) -> None:
+        """Initializes the ledger that incrementally maintains the map weights and their ranking.
+
+        A vote only changes its own map's weight by the difference between the old and new preference, so updates never need to revisit other votes
+
+        Parameters
+        ----------
+        weights : dict[str, int]
+            The current map weights with the structure {map: weight}. Only read here, the caller owns the dict
+        values : dict[str, int]
+            How much each preference adds to a map's weight, with the structure {preference: value}
+        """
+        self.weights = weights
+        self.values = values
+        # kept sorted as (-weight, map) so the heaviest map is first
+        self.ranking = sorted((-w, m) for m, w in weights.items())
+
+    def value(self, preference: str | None) -> int:
+        """Gets how much a preference adds to a map's weight
+
+        Parameters
+        ----------
+        preference : str | None
+            The preference. None means the user has not voted on the map
+
+        Returns
+        -------
+        int
+            The preference's value
+        """
+        return self.values.get(preference, 0)
+
+    def rerank(self, map_name: str, old_weight: int | None, new_weight: int | None) -> None:
+        """Moves a map within the ranking
+
+        Parameters
+        ----------
+        map_name : str
+            The map to move
+        old_weight : int | None
+            The map's current weight. None if the map is not ranked yet
+        new_weight : int | None
+            The map's new weight. None to drop the map from the ranking
+        """
+        if old_weight is not None:
+            i = bisect_left(self.ranking, (-old_weight, map_name))
+            if i < len(self.ranking) and self.ranking[i] == (-old_weight, map_name):
+                self.ranking.pop(i)
+
+        if new_weight is not None:
+            insort(self.ranking, (-new_weight, map_name))
+
+    def apply_vote(self, map_name: str, old_preference: str | None, new_preference: str) -> int:
+        """Computes a map's new weight after a user changes their vote and updates the ranking
+
+        Parameters
+        ----------
+        map_name : str
+            The map that was voted on
+        old_preference : str | None
+            The user's previous preference for the map. None if this is their first vote
+        new_preference : str
+            The user's new preference for the map
+
+        Returns
+        -------
+        int
+            The map's new weight (the caller is responsible for storing it)
+        """
+        old_weight = self.weights.get(map_name)
+        new_weight = (old_weight or 0) + self.value(new_preference) - self.value(old_preference)
+
+        self.rerank(map_name, old_weight, new_weight)
+        return new_weight
+
+    def track(self, map_name: str, weight: int = 0) -> None:
+        """Adds a new map to the ranking
+
+        Parameters
+        ----------
+        map_name : str
+            The map to add
+        weight : int, optional
+            The map's weight, by default 0
+        """
+        self.rerank(map_name, self.weights.get(map_name), weight)
+
+    def untrack(self, map_name: str) -> None:
+        """Removes a map from the ranking
+
+        Parameters
+        ----------
+        map_name : str
+            The map to remove
+        """
+        self.rerank(map_name, self.weights.get(map_name), None)
+
+    def ranked(self) -> list[tuple[str, int]]:
+        """Gets the maps ordered by weight, heaviest first
+
+        Returns
+        -------
+        list[tuple[str, int]]
+            The ranked maps with the structure [(map, weight), ...]
+        """
+        return [(m, -w) for w, m in self.ranking]
+
+    def recompute(self, preferences: dict[str, dict[str, str]]) -> dict[str, int]:
+        """Computes every map's weight from scratch (the slow path the ledger replaces)
+
+        Parameters
+        ----------
+        preferences : dict[str, dict[str, str]]
+            Every vote with the structure {map: {user_id: preference}}
+
+        Returns
+        -------
+        dict[str, int]
+            The weights with the structure {map: weight}
+        """
+        return {map_name: sum([self.value(p) for p in votes.values()]) for map_name, votes in preferences.items()}
+
+    def verify(self, preferences: dict[str, dict[str, str]]) -> dict[str, tuple[int | None, int | None]]:
+        """Compares the incrementally maintained weights and ranking against a full recompute
+
+        Parameters
+        ----------
+        preferences : dict[str, dict[str, str]]
+            Every vote with the structure {map: {user_id: preference}}
+
+        Returns
+        -------
+        dict[str, tuple[int | None, int | None]]
+            Every map that does not match, with the structure {map: (ledger_weight, expected_weight)}. Empty if the ledger is consistent
+        """
+        expected = self.recompute(preferences)
+        ranked = dict(self.ranked())
+
+        mismatches = {}
+        for map_name in expected.keys() | self.weights.keys() | ranked.keys():
+            actual = self.weights.get(map_name)
+            if actual != expected.get(map_name) or ranked.get(map_name) != actual:
+                mismatches[map_name] = (actual, expected.get(map_name))
+
+        return mismatches